@@ -4,7 +4,7 @@ Takes user's natural language question and creates optimal RAG query
 Uses GPT-4o-mini for efficiency
 """
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from typing import Optional
 import logging
 from config.config import Config
@@ -24,6 +24,12 @@ class QueryOptimizer:
                 timeout=30.0,
                 max_retries=2
             )
+            # Same settings for the asyncio pipeline (AsyncLegalAISystem)
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                timeout=30.0,
+                max_retries=2
+            )
         except Exception as e:
             self.logger.error(f"OpenAI client creation failed: {e}")
             raise
@@ -43,28 +49,43 @@ class QueryOptimizer:
         """
         try:
             self.logger.info(f"Optimizing query for: {user_question[:100]}...")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_question}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.3,  # Lower temperature for more focused results
-                top_p=0.9
-            )
-            
-            optimized_query = response.choices[0].message.content.strip()
-            
-            self.logger.info(f"Optimized query created: {optimized_query}")
-            return optimized_query
+            response = self.client.chat.completions.create(**self._completion_request(user_question))
+            return self._optimized_query(response)
             
         except Exception as e:
             self.logger.error(f"Error in query optimization: {str(e)}")
             # Fallback: return original question if optimization fails
             return user_question
     
+    async def optimize_query_async(self, user_question: str) -> Optional[str]:
+        """Async variant of optimize_query (AsyncOpenAI client, same fallback)"""
+        try:
+            self.logger.info(f"Optimizing query for: {user_question[:100]}...")
+            response = await self.async_client.chat.completions.create(**self._completion_request(user_question))
+            return self._optimized_query(response)
+            
+        except Exception as e:
+            self.logger.error(f"Error in query optimization: {str(e)}")
+            return user_question
+    
+    def _completion_request(self, user_question: str) -> dict:
+        """Chat completion parameters shared by the sync and async calls"""
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_question}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=0.3,  # Lower temperature for more focused results
+            top_p=0.9
+        )
+    
+    def _optimized_query(self, response) -> str:
+        optimized_query = response.choices[0].message.content.strip()
+        self.logger.info(f"Optimized query created: {optimized_query}")
+        return optimized_query
+    
     def test_agent(self):
         """Test the agent with sample queries"""
         test_cases = [
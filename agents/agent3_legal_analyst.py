@@ -3,7 +3,7 @@ Agent 3: Legal Analyst
 Uses GPT-4o to read full law texts and provide comprehensive legal analysis
 """
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from typing import List, Dict, Optional
 import logging
 from config.config import Config
@@ -23,6 +23,12 @@ class LegalAnalyst:
                 timeout=30.0,
                 max_retries=2
             )
+            # Same settings for the asyncio pipeline (AsyncLegalAISystem)
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                timeout=30.0,
+                max_retries=2
+            )
         except Exception as e:
             self.logger.error(f"OpenAI client creation failed: {e}")
             raise
@@ -149,38 +155,60 @@ MADDE 20 – Çevreyi kirletenler hakkında 5.000 Türk Lirası idarî para ceza
             str: Comprehensive legal analysis with context
         """
         try:
-            # Create enriched context
-            context_info = f"""
-🔍 **Arama Bilgileri:**
-- Kullanıcı Sorusu: {user_question}
-- Optimize Edilmiş Sorgu: {optimized_query}
-- Bulunan Kanun Sayısı: {len(rag_results)}
-
-📋 **Analiz Edilen Kanunlar:**"""
-            
-            for i, result in enumerate(rag_results, 1):
-                context_info += f"\n{i}. {result['law_name']} (Relevans: {result.get('similarity', 0):.3f})"
-            
-            context_info += f"\n\n📖 **Kanun Metinleri:**\n{law_texts}"
-            
-            user_message = f"{context_info}\n\n❓ **Analiz Edilecek Soru:** {user_question}"
-            
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.1,
-                top_p=0.95
+                **self._context_request(user_question, optimized_query, rag_results, law_texts)
             )
+            return response.choices[0].message.content.strip()
             
+        except Exception as e:
+            self.logger.error(f"Error in enhanced analysis: {str(e)}")
+            return self._generate_error_response(user_question)
+    
+    async def analyze_with_context_async(self,
+                                         user_question: str,
+                                         optimized_query: str,
+                                         rag_results: List[Dict],
+                                         law_texts: str) -> str:
+        """Async variant of analyze_with_context (AsyncOpenAI client, same fallback)"""
+        try:
+            response = await self.async_client.chat.completions.create(
+                **self._context_request(user_question, optimized_query, rag_results, law_texts)
+            )
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             self.logger.error(f"Error in enhanced analysis: {str(e)}")
             return self._generate_error_response(user_question)
+    
+    def _context_request(self, user_question: str, optimized_query: str,
+                         rag_results: List[Dict], law_texts: str) -> Dict:
+        """Chat completion parameters for analyze_with_context (sync and async)"""
+        # Create enriched context
+        context_info = f"""
+🔍 **Arama Bilgileri:**
+- Kullanıcı Sorusu: {user_question}
+- Optimize Edilmiş Sorgu: {optimized_query}
+- Bulunan Kanun Sayısı: {len(rag_results)}
+
+📋 **Analiz Edilen Kanunlar:**"""
+        
+        for i, result in enumerate(rag_results, 1):
+            context_info += f"\n{i}. {result['law_name']} (Relevans: {result.get('similarity', 0):.3f})"
+        
+        context_info += f"\n\n📖 **Kanun Metinleri:**\n{law_texts}"
+        
+        user_message = f"{context_info}\n\n❓ **Analiz Edilecek Soru:** {user_question}"
+        
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=0.1,
+            top_p=0.95
+        )
 
 if __name__ == "__main__":
     # Test the agent
@@ -10,50 +10,68 @@ import json
 import numpy as np
 from typing import Optional
 
+from rag_system.manifest import build_manifest, publish_snapshot, write_manifest
+from rag_system.snapshot import LATEST_POINTER, find_local_snapshot, snapshot_version
+
+S3_PREFIX = 'embeddings/'
+
+
+def latest_local_version(embeddings_dir, version=None):
+    """Newest (or the given) complete local version"""
+    files = find_local_snapshot([embeddings_dir], version)
+    if files is None:
+        raise FileNotFoundError(f"No complete embeddings/chunks pair in {embeddings_dir}")
+    return snapshot_version(files[0])
+
 class CloudEmbeddingsLoader:
     """Load embeddings from cloud storage instead of local files"""
     
     def __init__(self, provider='aws'):
         self.provider = provider
         
-    def upload_embeddings_to_aws_s3(self, bucket_name, local_embeddings_dir):
-        """Upload embeddings to AWS S3"""
+    def upload_embeddings_to_aws_s3(self, bucket_name, local_embeddings_dir, version=None):
+        """Publish the newest (or given) local version to AWS S3 with its manifest"""
         s3 = boto3.client('s3')
-        
-        files_to_upload = [
-            'legal_embeddings_20250730_005323.npy',
-            'legal_chunks_20250730_005323.json',
-            'legal_rag_data_20250730_005323.pkl'
-        ]
-        
-        for file_name in files_to_upload:
-            local_path = os.path.join(local_embeddings_dir, file_name)
-            if os.path.exists(local_path):
-                s3.upload_file(local_path, bucket_name, f'embeddings/{file_name}')
-                print(f"✅ Uploaded {file_name} to S3")
+        version = latest_local_version(local_embeddings_dir, version)
+        publish_snapshot(s3, bucket_name, local_embeddings_dir, version, prefix=S3_PREFIX)
     
-    def download_from_s3(self, bucket_name, file_name, local_path):
-        """Download embeddings from S3"""
+    def download_from_s3(self, bucket_name, local_dir, version=None):
+        """Download a published version (default: the one latest.json points to) into local_dir"""
         s3 = boto3.client('s3')
-        s3.download_file(bucket_name, f'embeddings/{file_name}', local_path)
+        if version is None:
+            pointer = s3.get_object(Bucket=bucket_name, Key=S3_PREFIX + LATEST_POINTER)
+            version = json.loads(pointer['Body'].read())['version']
+        
+        manifest_name = f"manifest_{version}.json"
+        os.makedirs(local_dir, exist_ok=True)
+        s3.download_file(bucket_name, S3_PREFIX + manifest_name, os.path.join(local_dir, manifest_name))
+        with open(os.path.join(local_dir, manifest_name), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        for entry in manifest['artifacts'].values():
+            s3.download_file(bucket_name, S3_PREFIX + entry['file'], os.path.join(local_dir, entry['file']))
+        return version
         
-    def upload_to_google_cloud(self, bucket_name, local_embeddings_dir):
-        """Upload embeddings to Google Cloud Storage"""
+    def upload_to_google_cloud(self, bucket_name, local_embeddings_dir, version=None):
+        """Upload the newest (or given) local version to Google Cloud Storage, manifest last"""
         client = gcs.Client()
         bucket = client.bucket(bucket_name)
         
-        files_to_upload = [
-            'legal_embeddings_20250730_005323.npy',
-            'legal_chunks_20250730_005323.json',
-            'legal_rag_data_20250730_005323.pkl'
-        ]
+        version = latest_local_version(local_embeddings_dir, version)
+        manifest = build_manifest(local_embeddings_dir, version)
+        manifest_file = write_manifest(local_embeddings_dir, manifest, update_latest=False)
+        
+        files_to_upload = [entry['file'] for entry in manifest['artifacts'].values()]
+        files_to_upload.append(os.path.basename(manifest_file))
         
         for file_name in files_to_upload:
             local_path = os.path.join(local_embeddings_dir, file_name)
-            if os.path.exists(local_path):
-                blob = bucket.blob(f'embeddings/{file_name}')
-                blob.upload_from_filename(local_path)
-                print(f"✅ Uploaded {file_name} to Google Cloud")
+            blob = bucket.blob(f'{S3_PREFIX}{file_name}')
+            blob.upload_from_filename(local_path)
+            print(f"✅ Uploaded {file_name} to Google Cloud")
+        bucket.blob(f'{S3_PREFIX}{LATEST_POINTER}').upload_from_string(
+            json.dumps({'version': version, 'manifest': os.path.basename(manifest_file)}),
+            content_type='application/json'
+        )
                 
     def download_from_url(self, url, local_path):
         """Download embeddings from any URL"""
@@ -76,25 +94,14 @@ def setup_s3_bucket():
     except Exception as e:
         print(f"Bucket might already exist: {e}")
     
-    # Step 2: Upload embeddings
+    # Step 2: Upload the newest local version, its manifest and the latest.json pointer
     embeddings_dir = 'rag_system/embeddings_output'
     
-    essential_files = [
-        'legal_embeddings_20250730_005323.npy',
-        'legal_chunks_20250730_005323.json',
-        'embedding_stats_20250730_005323.json'
-    ]
-    
-    for file_name in essential_files:
-        local_path = os.path.join(embeddings_dir, file_name)
-        if os.path.exists(local_path):
-            try:
-                s3.upload_file(local_path, bucket_name, f'embeddings/{file_name}')
-                print(f"✅ Uploaded {file_name} ({os.path.getsize(local_path)/1024/1024:.1f} MB)")
-            except Exception as e:
-                print(f"❌ Failed to upload {file_name}: {e}")
-        else:
-            print(f"⚠️ File not found: {local_path}")
+    try:
+        version = latest_local_version(embeddings_dir)
+        publish_snapshot(s3, bucket_name, embeddings_dir, version, prefix=S3_PREFIX)
+    except Exception as e:
+        print(f"❌ Failed to publish embeddings: {e}")
 
 if __name__ == "__main__":
     print("🚀 Setting up cloud embeddings storage...")
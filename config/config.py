@@ -32,17 +32,44 @@ class Config:
     
     # RAG Configuration
     RAG_TOP_K = 5                # Number of laws to retrieve
+    RAG_LAW_AGGREGATION = os.getenv('RAG_LAW_AGGREGATION', 'max')  # max | mean_top_n | sum
+    RAG_LAW_AGGREGATION_TOP_N = int(os.getenv('RAG_LAW_AGGREGATION_TOP_N', 3))  # Chunks averaged by mean_top_n
+    RAG_INDEX_BACKEND = os.getenv('RAG_INDEX_BACKEND', 'exact')  # exact | ivf | hnsw | sq8 | pq | mrl
+    RAG_IVF_NPROBE = int(os.getenv('RAG_IVF_NPROBE', 8))        # IVF lists scanned per query
+    RAG_HNSW_EF_SEARCH = int(os.getenv('RAG_HNSW_EF_SEARCH', 64))  # HNSW candidate list size per query
+    RAG_QUANTIZED_RERANK = int(os.getenv('RAG_QUANTIZED_RERANK', 200))  # sq8/pq/mrl candidates re-scored in float32
+    RAG_MRL_DIMS = int(os.getenv('RAG_MRL_DIMS', 256))  # Matryoshka prefix dims kept in RAM by the mrl backend
+    RAG_ANN_CANDIDATES_PER_LAW = 20  # ANN chunk candidates fetched per requested law
+    RAG_HYBRID_FUSION = os.getenv('RAG_HYBRID_FUSION', 'rrf')  # rrf | weighted | none (vector only)
+    RAG_HYBRID_VECTOR_WEIGHT = float(os.getenv('RAG_HYBRID_VECTOR_WEIGHT', 0.7))  # Cosine weight for 'weighted'
+    RAG_RRF_K = 60                   # Reciprocal rank fusion offset
+    RAG_FILTER_EXACT_MAX_ROWS = 50000  # Filtered searches over at most this many chunks are scored exactly
+    EMBEDDING_MODEL = "text-embedding-3-small"  # Must match the model used for the corpus
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 2048))  # Query vectors kept in memory
+    LAW_NAME_MIN_SIMILARITY = float(os.getenv('LAW_NAME_MIN_SIMILARITY', 0.3))  # Trigram similarity needed to accept a fuzzy law-name match
+    LAW_NAME_CANDIDATES = 5      # Closest law names reported when a name does not match exactly
+    LAW_RECORD_CACHE_SIZE = int(os.getenv('LAW_RECORD_CACHE_SIZE', 64))  # Resolved laws (with full text) kept across requests
+    CONTEXT_MAX_TOKENS = int(os.getenv('CONTEXT_MAX_TOKENS', 6000))  # Law-text tokens sent to Agent 3
+    CONTEXT_TOKEN_ENCODING = os.getenv('CONTEXT_TOKEN_ENCODING', 'o200k_base')  # gpt-4o tokenizer; cl100k_base as fallback
     MAX_TOKENS_AGENT1 = 500      # Max tokens for query optimization
     MAX_TOKENS_AGENT3 = 4000     # Max tokens for legal analysis
     
     # Production optimizations
     SKIP_RAG_IN_PRODUCTION = IS_PRODUCTION  # Skip heavy RAG loading in production for now
+    INIT_WAIT_SECONDS = int(os.getenv('INIT_WAIT_SECONDS', 30))  # /api/ask waits this long for a loading worker, then 503
     
     # Data Paths (ensure they work in Railway deployment)
     PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATA_DIR = os.path.join(PROJECT_ROOT, "data")
     LEGAL_DATASET = "mevzuat_combined_final.xlsx"
     RAG_EMBEDDINGS_DIR = "rag_system/embeddings_output"
+    RAG_SNAPSHOT_VERSION = os.getenv('RAG_SNAPSHOT_VERSION', '')  # Pin an embeddings version (timestamp); "" = newest
+    RAG_SNAPSHOT_POLL_SECONDS = int(os.getenv('RAG_SNAPSHOT_POLL_SECONDS', 0))  # Check for newer snapshots; 0 = off
+    RAG_RELOAD_TOKEN = os.getenv('RAG_RELOAD_TOKEN', '')  # Bearer token for POST /api/admin/reload; "" = endpoint disabled
+    RAG_ARTIFACT_CACHE_DIR = os.getenv('RAG_ARTIFACT_CACHE_DIR', os.path.join(PROJECT_ROOT, ".artifact_cache"))  # Downloaded S3 artifacts
+    RAG_DOWNLOAD_CONCURRENCY = int(os.getenv('RAG_DOWNLOAD_CONCURRENCY', 8))  # Parallel ranged GETs per S3 artifact
+    RAG_DOWNLOAD_PART_SIZE_MB = int(os.getenv('RAG_DOWNLOAD_PART_SIZE_MB', 8))  # Range size; match the upload part size
+    EMBEDDING_CACHE_DB = os.getenv('EMBEDDING_CACHE_DB', os.path.join(RAG_ARTIFACT_CACHE_DIR, "query_embeddings.sqlite3"))  # "" = memory only
     
     # Web Interface - Auto-adjusts for environment
     FLASK_HOST = "0.0.0.0" if IS_PRODUCTION else "localhost"
@@ -7,6 +7,9 @@ from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 import sys
 import os
+import hmac
+import threading
+import time
 import logging
 import numpy as np
 import pandas as pd
@@ -23,13 +26,15 @@ print(f"App file directory: {current_dir}")
 print(f"Static folder path: {os.path.join(current_dir, 'static')}")
 
 try:
-    from main import LegalAISystem
+    from main import LegalAISystem, INIT_STAGES
     FULL_SYSTEM_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Full system not available: {e}")
     FULL_SYSTEM_AVAILABLE = False
     LegalAISystem = None
+    INIT_STAGES = ()
 from config.config import Config
+from rag_system.metadata_filters import normalize_filters
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -50,6 +55,18 @@ print(f"Static folder exists: {os.path.exists(static_folder_path)}")
 # Global variable to hold the AI system
 legal_ai_system = None
 
+# Background initialization state of this worker process
+init_lock = threading.Lock()
+system_ready = threading.Event()
+init_state = {
+    'pid': None,
+    'status': 'not_started',  # not_started | loading | ready | demo
+    'current_stage': None,
+    'completed_stages': [],
+    'started_at': None,
+    'finished_at': None,
+}
+
 def convert_to_json_serializable(obj):
     """Convert numpy/pandas types to JSON serializable types"""
     if isinstance(obj, dict):
@@ -67,14 +84,14 @@ def convert_to_json_serializable(obj):
     else:
         return obj
 
-def initialize_system():
+def initialize_system(progress=None):
     """Initialize the Legal AI System"""
     global legal_ai_system
     try:
         if legal_ai_system is None:
             if FULL_SYSTEM_AVAILABLE:
                 logger.info("Initializing Legal AI System...")
-                legal_ai_system = LegalAISystem()
+                legal_ai_system = LegalAISystem(progress=progress)
                 logger.info("✅ System initialized successfully")
             else:
                 logger.warning("⚠️ Running in demo mode - RAG system not available")
@@ -84,42 +101,53 @@ def initialize_system():
         logger.warning("⚠️ Falling back to demo mode")
         legal_ai_system = None
 
-@app.route('/')
-def index():
-    """Main chat interface"""
-    return render_template('chat.html')
+def system_is_serving():
+    """A fully loaded system; None or limited mode (no API key, failed component) is demo mode"""
+    return legal_ai_system is not None and not getattr(legal_ai_system, 'limited_mode', False)
 
-@app.route('/favicon.ico')
-def favicon():
-    """Serve favicon"""
-    return app.send_static_file('images/logo1.png')
+def _record_stage(stage):
+    """Progress callback: a component finished loading"""
+    init_state['completed_stages'].append(stage)
+    remaining = [name for name in INIT_STAGES if name not in init_state['completed_stages']]
+    init_state['current_stage'] = remaining[0] if remaining else None
 
-@app.route('/api/ask', methods=['POST'])
-def ask_question():
-    """API endpoint to process legal questions"""
+def _run_initialization():
+    """Load the system, then open the readiness gate (also when falling back to demo mode)"""
     try:
-        data = request.get_json()
-        user_question = data.get('question', '').strip()
-        
-        if not user_question:
-            return jsonify({
-                'status': 'error',
-                'message': 'Lütfen bir soru yazın'
-            }), 400
-        
-        # Ensure system is initialized
-        if legal_ai_system is None:
-            initialize_system()
-        
-        # Process the question
-        if legal_ai_system is not None:
-            response = legal_ai_system.process_legal_question(user_question)
-        else:
-            # Demo mode response - Fixed format for frontend compatibility
-            response = {
-                'status': 'success',  # Frontend expects 'success' status
-                'user_question': user_question,
-                'legal_analysis': f"""🏛️ **Demo Mode - Sistem Çalışıyor**
+        initialize_system(progress=_record_stage)
+    finally:
+        init_state['status'] = 'ready' if system_is_serving() else 'demo'
+        init_state['finished_at'] = time.time()
+        system_ready.set()
+        logger.info(f"🚦 Initialization finished in {init_state['finished_at'] - init_state['started_at']:.1f}s ({init_state['status']})")
+
+def start_background_initialization():
+    """Start loading the system in a daemon thread, once per worker process"""
+    with init_lock:
+        if init_state['pid'] == os.getpid():
+            return
+        init_state.update(pid=os.getpid(), status='loading', current_stage=INIT_STAGES[0] if INIT_STAGES else None,
+                          completed_stages=[], started_at=time.time(), finished_at=None)
+        system_ready.clear()
+        threading.Thread(target=_run_initialization, name='legal-ai-init', daemon=True).start()
+
+def initialization_progress():
+    """Loading status for the liveness/readiness endpoints"""
+    started_at, finished_at = init_state['started_at'], init_state['finished_at']
+    return {
+        'status': init_state['status'],
+        'current_stage': init_state['current_stage'],
+        'completed_stages': list(init_state['completed_stages']),
+        'total_stages': len(INIT_STAGES),
+        'elapsed_seconds': round((finished_at or time.time()) - started_at, 1) if started_at else 0.0,
+    }
+
+def demo_response(user_question):
+    """Demo mode response - Fixed format for frontend compatibility"""
+    return {
+        'status': 'success',  # Frontend expects 'success' status
+        'user_question': user_question,
+        'legal_analysis': f"""🏛️ **Demo Mode - Sistem Çalışıyor**
 
 **Sorunuz:** "{user_question}"
 
@@ -143,15 +171,82 @@ def ask_question():
 - **Versiyon:** Beta M1.1
 
 ⚠️ **Not:** Sistem şu anda demo modunda çalışıyor. Tam kapasiteli hukuki analiz için sistem optimize ediliyor.""",
-                'found_laws': [],
-                'optimized_query': f'Demo optimizasyonu: "{user_question}"',
-                'pipeline_steps': {
-                    'step1_query_optimization': 'Demo mode',
-                    'step2_rag_results': 0,
-                    'step3_laws_found': 0,
-                    'step4_analysis_complete': True  # Mark as complete for demo
-                }
-            }
+        'found_laws': [],
+        'optimized_query': f'Demo optimizasyonu: "{user_question}"',
+        'pipeline_steps': {
+            'step1_query_optimization': 'Demo mode',
+            'step2_rag_results': 0,
+            'step3_laws_found': 0,
+            'step4_analysis_complete': True  # Mark as complete for demo
+        }
+    }
+
+def ask_filters(data):
+    """
+    Validated search filters of an /api/ask body, e.g. {"law_types": ["Kanun"], "date_from": "2010"}
+    
+    Raises:
+        ValueError: With a message for the user if a filter is malformed
+    """
+    try:
+        return normalize_filters(data.get('law_types'), data.get('date_from'), data.get('date_to'))
+    except ValueError as e:
+        raise ValueError(f'Geçersiz arama filtresi: {str(e)}')
+
+@app.before_request
+def ensure_initialization_started():
+    """Covers processes forked after import (e.g. gunicorn --preload)"""
+    start_background_initialization()
+
+@app.route('/')
+def index():
+    """Main chat interface"""
+    return render_template('chat.html')
+
+@app.route('/favicon.ico')
+def favicon():
+    """Serve favicon"""
+    return app.send_static_file('images/logo1.png')
+
+@app.route('/api/ask', methods=['POST'])
+def ask_question():
+    """API endpoint to process legal questions"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'status': 'error',
+                'message': 'Geçersiz istek'
+            }), 400
+        user_question = str(data.get('question', '')).strip()
+        
+        if not user_question:
+            return jsonify({
+                'status': 'error',
+                'message': 'Lütfen bir soru yazın'
+            }), 400
+        
+        try:
+            filters = ask_filters(data)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Wait (bounded) for background initialization instead of loading on this request
+        if not system_ready.wait(timeout=Config.INIT_WAIT_SECONDS):
+            return jsonify({
+                'status': 'error',
+                'message': 'Sistem başlatılıyor, lütfen birkaç saniye sonra tekrar deneyin',
+                'initialization': initialization_progress()
+            }), 503, {'Retry-After': '10'}
+        
+        # Process the question
+        if legal_ai_system is not None:
+            response = legal_ai_system.process_legal_question(user_question, filters=filters)
+        else:
+            response = demo_response(user_question)
         
         # Convert numpy/pandas types to JSON serializable types
         clean_response = convert_to_json_serializable(response)
@@ -168,13 +263,32 @@ def ask_question():
             'message': f'Sistem hatası: {str(e)}'
         }), 500
 
+@app.route('/api/live', methods=['GET'])
+def liveness_check():
+    """Liveness: the process serves requests (never waits for initialization)"""
+    return jsonify({'status': 'alive', 'initialization': initialization_progress()}), 200
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: 200 once initialization has finished, 503 with progress while loading"""
+    progress = initialization_progress()
+    if not system_ready.is_set():
+        return jsonify({'status': 'starting', 'initialization': progress}), 503, {'Retry-After': '5'}
+    return jsonify({'status': 'ready', 'mode': 'full' if progress['status'] == 'ready' else 'demo',
+                    'initialization': progress}), 200
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Enhanced health check endpoint for deployment monitoring"""
     try:
-        # Initialize system if not already done
-        if legal_ai_system is None:
-            initialize_system()
+        # Loading happens in the background; report progress until it is done
+        if not system_ready.is_set():
+            return jsonify({
+                'status': 'starting',
+                'timestamp': pd.Timestamp.now().isoformat(),
+                'environment': Config.ENVIRONMENT,
+                'initialization': initialization_progress()
+            }), 503
         
         # Check system status
         system_status = {
@@ -182,6 +296,7 @@ def health_check():
             'timestamp': pd.Timestamp.now().isoformat(),
             'environment': Config.ENVIRONMENT,
             'production_mode': Config.IS_PRODUCTION,
+            'initialization': initialization_progress(),
             'components': {
                 'flask_app': True,
                 'config_loaded': bool(Config.OPENAI_API_KEY),
@@ -201,7 +316,9 @@ def health_check():
                     system_status['components']['rag_system'] = {
                         'available': True,
                         'embeddings_loaded': legal_ai_system.rag_system.embeddings is not None,
-                        'chunks_loaded': bool(legal_ai_system.rag_system.chunks)
+                        'chunks_loaded': bool(legal_ai_system.rag_system.chunks),
+                        'snapshot': legal_ai_system.rag_system.snapshot.describe() if legal_ai_system.rag_system.snapshot else None,
+                        'embedding_cache': legal_ai_system.rag_system.embedding_cache.stats()
                     }
                 else:
                     system_status['components']['rag_system'] = {
@@ -215,7 +332,7 @@ def health_check():
                 }
         
         # Return appropriate HTTP status
-        if legal_ai_system is None or not Config.OPENAI_API_KEY:
+        if not system_is_serving() or not Config.OPENAI_API_KEY:
             system_status['status'] = 'degraded'
             return jsonify(system_status), 503
         
@@ -233,10 +350,31 @@ def health_check():
             }
         }), 500
 
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_snapshot():
+    """Load the newest embeddings snapshot in the background and swap it in (this worker only)"""
+    token = request.headers.get('Authorization', '').replace('Bearer ', '', 1)
+    if not Config.RAG_RELOAD_TOKEN or not hmac.compare_digest(token, Config.RAG_RELOAD_TOKEN):
+        return jsonify({'status': 'error', 'message': 'Unauthorized'}), 403
+    
+    rag_system = getattr(legal_ai_system, 'rag_system', None)
+    if rag_system is None or not hasattr(rag_system, 'reload'):
+        return jsonify({'status': 'error', 'message': 'RAG system not available'}), 503
+    
+    started = rag_system.reload()
+    return jsonify({
+        'status': 'reloading' if started else 'already_reloading',
+        'current_version': rag_system.version
+    }), 202
+
+# Gunicorn workers import this module: start loading now rather than on the first request
+if __name__ != '__main__':
+    start_background_initialization()
+
 if __name__ == '__main__':
     try:
-        # Initialize system on startup
-        initialize_system()
+        # Initialize system on startup, in the background
+        start_background_initialization()
         
         # Log environment info
         logger.info(f"🌍 Environment: {Config.ENVIRONMENT}")
@@ -0,0 +1,132 @@
+"""
+ASGI Entry Point for Legal AI System
+POST /api/ask runs the async pipeline (AsyncOpenAI) on the event loop, so one
+worker keeps many questions in flight; every other route is the Flask app.
+
+Run: uvicorn asgi:app --app-dir frontend --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as flask_app_module
+from config.config import Config
+
+try:
+    from main import AsyncLegalAISystem
+except ImportError as e:
+    print(f"Warning: Async pipeline not available: {e}")
+    AsyncLegalAISystem = None
+
+logger = logging.getLogger(__name__)
+
+# Interval for polling the (threading) readiness gate without blocking the loop
+READY_POLL_SECONDS = 0.25
+
+flask_asgi = WsgiToAsgi(flask_app_module.app)
+_async_system = None
+
+def get_async_system():
+    """Async pipeline over the worker's loaded LegalAISystem (None in demo mode)"""
+    global _async_system
+    system = flask_app_module.legal_ai_system
+    if system is None or AsyncLegalAISystem is None:
+        return None
+    if _async_system is None or _async_system.system is not system:
+        _async_system = AsyncLegalAISystem(system)
+    return _async_system
+
+async def wait_until_ready(timeout):
+    """Wait (bounded) for background initialization without blocking other requests"""
+    deadline = time.monotonic() + timeout
+    while not flask_app_module.system_ready.is_set():
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(READY_POLL_SECONDS)
+    return True
+
+async def read_body(receive):
+    """Full request body of an HTTP scope"""
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+async def send_json(send, payload, status=200, headers=None):
+    """JSON response with the same CORS header Flask-CORS sets"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    response_headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        (b'access-control-allow-origin', b'*'),
+    ]
+    response_headers += [(key.lower().encode(), str(value).encode()) for key, value in (headers or {}).items()]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def ask_question(receive, send):
+    """Async /api/ask: same request and response format as the Flask route"""
+    try:
+        try:
+            data = json.loads(await read_body(receive) or b'null')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return await send_json(send, {'status': 'error', 'message': 'Geçersiz istek'}, 400)
+        user_question = str(data.get('question', '')).strip()
+
+        if not user_question:
+            return await send_json(send, {'status': 'error', 'message': 'Lütfen bir soru yazın'}, 400)
+
+        try:
+            filters = flask_app_module.ask_filters(data)
+        except ValueError as e:
+            return await send_json(send, {'status': 'error', 'message': str(e)}, 400)
+
+        flask_app_module.start_background_initialization()
+        if not await wait_until_ready(Config.INIT_WAIT_SECONDS):
+            return await send_json(send, {
+                'status': 'error',
+                'message': 'Sistem başlatılıyor, lütfen birkaç saniye sonra tekrar deneyin',
+                'initialization': flask_app_module.initialization_progress()
+            }, 503, {'Retry-After': '10'})
+
+        async_system = get_async_system()
+        if async_system is not None:
+            response = await async_system.process_legal_question(user_question, filters=filters)
+        else:
+            response = flask_app_module.demo_response(user_question)
+
+        await send_json(send, {
+            'status': 'success',
+            'response': flask_app_module.convert_to_json_serializable(response)
+        })
+
+    except Exception as e:
+        logger.error(f"Error processing question: {str(e)}")
+        await send_json(send, {'status': 'error', 'message': f'Sistem hatası: {str(e)}'}, 500)
+
+async def lifespan(receive, send):
+    """Start loading the system when the worker boots (the Flask adapter has no lifespan support)"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            flask_app_module.start_background_initialization()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'http' and scope['path'] == '/api/ask' and scope['method'] == 'POST':
+        return await ask_question(receive, send)
+    return await flask_asgi(scope, receive, send)
@@ -3,10 +3,11 @@ Main Application - 3-Agent Legal AI System
 Orchestrates the complete pipeline: Query Optimization -> RAG Search -> Legal Analysis
 """
 
+import asyncio
 import logging
 import sys
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List, Tuple
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -25,10 +26,12 @@ except ImportError as e:
     class QueryOptimizer:
         def optimize_query(self, query): return query
     class RAGSystem:
-        def search_laws(self, query, top_k=5): return []
+        def search_laws(self, query, top_k=5, **filters): return []
     class LawMatcher:
+        def resolve_laws(self, names, **kwargs): return names
+        def get_by_numbers(self, numbers, fallback_names=None, **kwargs): return fallback_names or []
         def get_laws_summary(self, names): return []
-        def get_combined_law_text(self, names): return ""
+        def get_combined_law_text(self, names, **kwargs): return ""
     class LegalAnalyst:
         def analyze_with_context(self, **kwargs): return "System temporarily unavailable"
     from config.config import Config
@@ -40,11 +43,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Components built by LegalAISystem, in load order (reported through the progress callback)
+INIT_STAGES = ("query_optimizer", "rag_system", "law_matcher", "legal_analyst")
+
 class LegalAISystem:
     """Main class that orchestrates the 3-agent system"""
     
-    def __init__(self):
-        """Initialize all agents and systems"""
+    def __init__(self, progress: Callable[[str], None] = None):
+        """
+        Initialize all agents and systems
+        
+        Args:
+            progress (Callable[[str], None]): Called with each INIT_STAGES name once that component is ready
+        """
+        progress = progress or (lambda stage: None)
         try:
             # Check if imports were successful
             if not IMPORTS_SUCCESSFUL:
@@ -61,15 +73,19 @@ class LegalAISystem:
             
             self.agent1 = QueryOptimizer()
             logger.info("✅ Agent 1 (Query Optimizer) initialized")
+            progress("query_optimizer")
             
             self.rag_system = RAGSystem()
             logger.info("✅ RAG System initialized")
+            progress("rag_system")
             
             self.law_matcher = LawMatcher()
             logger.info("✅ Law Matcher initialized")
+            progress("law_matcher")
             
             self.agent3 = LegalAnalyst()
             logger.info("✅ Agent 3 (Legal Analyst) initialized")
+            progress("legal_analyst")
             
             if self.limited_mode:
                 logger.info("🚧 Legal AI System ready (LIMITED MODE)")
@@ -89,12 +105,13 @@ class LegalAISystem:
             
             logger.info("🚧 Running in limited/demo mode - agents disabled")
     
-    def process_legal_question(self, user_question: str) -> Dict[str, Any]:
+    def process_legal_question(self, user_question: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Process a legal question through the complete 3-agent pipeline
         
         Args:
             user_question (str): User's legal question in natural language
+            filters (Dict): Optional search filters - law_types, date_from, date_to
             
         Returns:
             Dict: Complete response with all pipeline steps
@@ -115,16 +132,14 @@ class LegalAISystem:
             
             # Step 2: RAG Search
             logger.info("🔍 Step 2: RAG search...")
-            rag_results = self.rag_system.search_laws(optimized_query, top_k=Config.RAG_TOP_K)
+            rag_results = self.rag_system.search_laws(optimized_query, top_k=Config.RAG_TOP_K, **(filters or {}))
             
             if not rag_results:
                 return self._create_error_response("No relevant laws found")
             
             # Step 3: Law Matching
             logger.info("📋 Step 3: Finding full law texts...")
-            law_names = [result['law_name'] for result in rag_results]
-            law_summaries = self.law_matcher.get_laws_summary(law_names)
-            combined_law_text = self.law_matcher.get_combined_law_text(law_names)
+            law_summaries, combined_law_text = self._match_laws(user_question, optimized_query, rag_results)
             
             if not combined_law_text:
                 return self._create_error_response("Could not retrieve law texts")
@@ -138,28 +153,45 @@ class LegalAISystem:
                 law_texts=combined_law_text
             )
             
-            # Compile complete response
-            response = {
-                'status': 'success',
-                'user_question': user_question,
-                'optimized_query': optimized_query,
-                'found_laws': law_summaries,
-                'legal_analysis': legal_analysis,
-                'pipeline_steps': {
-                    'step1_query_optimization': optimized_query,
-                    'step2_rag_results': len(rag_results),
-                    'step3_laws_found': len(law_summaries),
-                    'step4_analysis_complete': True
-                }
-            }
-            
             logger.info("✅ Legal question processed successfully")
-            return response
+            return self._create_success_response(user_question, optimized_query, rag_results,
+                                                 law_summaries, legal_analysis)
             
         except Exception as e:
             logger.error(f"Error processing question: {str(e)}")
             return self._create_error_response(str(e))
     
+    def _match_laws(self, user_question: str, optimized_query: str, rag_results: List[Dict]) -> Tuple[List[Dict], str]:
+        """Step 3: law summaries and the token-budgeted law context for Agent 3"""
+        # Joined by (law_type, mevzuatNo) from the chunk metadata; names only as a fallback
+        resolved_laws = self.law_matcher.get_by_numbers(
+            [(result.get('law_type'), result.get('law_number')) for result in rag_results],
+            fallback_names=[result['law_name'] for result in rag_results],
+            weights=[result.get('law_score', result.get('similarity', 1.0)) for result in rag_results]
+        )
+        law_summaries = self.law_matcher.get_laws_summary(resolved_laws)
+        combined_law_text = self.law_matcher.get_combined_law_text(
+            resolved_laws, query=f"{user_question}\n{optimized_query}"
+        )
+        return law_summaries, combined_law_text
+    
+    def _create_success_response(self, user_question: str, optimized_query: str, rag_results: List[Dict],
+                                 law_summaries: List[Dict], legal_analysis: str) -> Dict[str, Any]:
+        """Compile the complete pipeline response"""
+        return {
+            'status': 'success',
+            'user_question': user_question,
+            'optimized_query': optimized_query,
+            'found_laws': law_summaries,
+            'legal_analysis': legal_analysis,
+            'pipeline_steps': {
+                'step1_query_optimization': optimized_query,
+                'step2_rag_results': len(rag_results),
+                'step3_laws_found': len(law_summaries),
+                'step4_analysis_complete': True
+            }
+        }
+    
     def _create_error_response(self, error_message: str) -> Dict[str, Any]:
         """Create a standardized error response"""
         return {
@@ -246,6 +278,81 @@ class LegalAISystem:
             
             print("\n" + "="*60)
 
+class AsyncLegalAISystem:
+    """
+    asyncio front end to a loaded LegalAISystem
+    
+    The OpenAI calls (Agent 1, the query embedding, Agent 3) are awaited on
+    AsyncOpenAI clients; law matching and vector scoring run in worker threads.
+    One process can therefore keep many LLM-bound requests in flight. The
+    components (snapshot, law store, caches) are shared with the wrapped system.
+    """
+    
+    def __init__(self, system: LegalAISystem = None):
+        """
+        Initialize the async pipeline
+        
+        Args:
+            system (LegalAISystem): Already initialized system to reuse (default: build one)
+        """
+        self.system = system or LegalAISystem()
+    
+    async def process_legal_question(self, user_question: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Process a legal question through the complete 3-agent pipeline without blocking the event loop
+        
+        Args:
+            user_question (str): User's legal question in natural language
+            filters (Dict): Optional search filters - law_types, date_from, date_to
+            
+        Returns:
+            Dict: Complete response with all pipeline steps (same format as LegalAISystem)
+        """
+        system = self.system
+        try:
+            logger.info(f"Processing question: {user_question}")
+            
+            if system.limited_mode or getattr(system, 'agent1', None) is None:
+                return system._create_demo_response(user_question)
+            
+            logger.info("🤖 Step 1: Query optimization...")
+            optimized_query = await system.agent1.optimize_query_async(user_question)
+            
+            if not optimized_query:
+                return system._create_error_response("Query optimization failed")
+            
+            logger.info("🔍 Step 2: RAG search...")
+            rag_results = await system.rag_system.search_laws_async(
+                optimized_query, top_k=Config.RAG_TOP_K, **(filters or {})
+            )
+            
+            if not rag_results:
+                return system._create_error_response("No relevant laws found")
+            
+            logger.info("📋 Step 3: Finding full law texts...")
+            law_summaries, combined_law_text = await asyncio.to_thread(
+                system._match_laws, user_question, optimized_query, rag_results
+            )
+            
+            if not combined_law_text:
+                return system._create_error_response("Could not retrieve law texts")
+            
+            logger.info("⚖️ Step 4: Legal analysis...")
+            legal_analysis = await system.agent3.analyze_with_context_async(
+                user_question=user_question,
+                optimized_query=optimized_query,
+                rag_results=rag_results,
+                law_texts=combined_law_text
+            )
+            
+            logger.info("✅ Legal question processed successfully")
+            return system._create_success_response(user_question, optimized_query, rag_results,
+                                                   law_summaries, legal_analysis)
+            
+        except Exception as e:
+            logger.error(f"Error processing question: {str(e)}")
+            return system._create_error_response(str(e))
+
 def main():
     """Main function for command line interface"""
     try:
@@ -0,0 +1,226 @@
+"""
+Artifact Cache
+Persistent local copies of S3 artifacts keyed by S3 key and ETag: a HEAD request
+decides whether the cached file is still current, so restarts and additional
+workers reuse the files instead of downloading them again. Cold downloads are
+split into parallel byte-range GETs written in place and checked against the ETag
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: downloads are not serialized across processes
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+PART_RETRIES = 3
+
+
+class S3ArtifactCache:
+    """Download-once cache of S3 objects in a local directory shared by all workers"""
+
+    def __init__(self, s3, bucket_name: str, cache_dir: str,
+                 part_size: int = 8 * 1024 * 1024, concurrency: int = 8):
+        """
+        Initialize the cache
+
+        Args:
+            s3: boto3 S3 client (thread-safe, shared by the part downloads)
+            bucket_name (str): Bucket holding the artifacts
+            cache_dir (str): Local directory for cached files (created if missing)
+            part_size (int): Bytes per ranged GET; matching the upload part size lets
+                multipart ETags be verified
+            concurrency (int): Parallel ranged GETs per object
+        """
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.cache_dir = cache_dir
+        self.part_size = max(int(part_size), STREAM_CHUNK_SIZE)
+        self.concurrency = max(int(concurrency), 1)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        """Cached file path: the S3 key mirrored under cache_dir, so equal file names under different prefixes stay apart"""
+        parts = [part for part in key.split('/') if part not in ('', '.', '..')]
+        if not parts:
+            raise ValueError(f"Invalid S3 key: '{key}'")
+        return os.path.join(self.cache_dir, *parts)
+
+    def fetch(self, key: str, sha256: str = None) -> str:
+        """
+        Return a local copy of an S3 object, downloading it only if missing or stale
+
+        The cached copy is current when its recorded ETag and size match a HEAD
+        of the object. If S3 cannot be reached, an existing copy is used as is.
+
+        Args:
+            key (str): S3 object key
+            sha256 (str): Expected SHA-256 (from the manifest); checked once per
+                downloaded file and remembered in the cache metadata
+
+        Returns:
+            str: Path of the local file
+        """
+        local_file = self.local_path(key)
+        os.makedirs(os.path.dirname(local_file), exist_ok=True)
+        try:
+            remote = self._head(key)
+        except Exception as e:
+            if self._read_meta(local_file) is not None and os.path.exists(local_file):
+                logger.warning(f"⚠️ Could not check s3://{self.bucket_name}/{key} ({str(e)}), using cached copy")
+                return local_file
+            raise
+
+        if self._is_current(local_file, key, remote):
+            logger.info(f"📦 Cache hit: {key} ({remote['etag']})")
+            self._check_sha256(local_file, key, sha256)
+            return local_file
+
+        # One worker downloads; the others wait for the lock and then find the file current
+        with self._lock(local_file):
+            if self._is_current(local_file, key, remote):
+                logger.info(f"📦 Cache hit: {key} ({remote['etag']})")
+                self._check_sha256(local_file, key, sha256)
+                return local_file
+
+            logger.info(f"⬇️ Downloading s3://{self.bucket_name}/{key} ({remote['size'] / 1e6:.1f} MB)")
+            temp_file = f"{local_file}.{os.getpid()}.tmp"
+            try:
+                self._download(key, temp_file, remote)
+                if sha256 and file_digest(temp_file, 'sha256') != sha256:
+                    raise IOError(f"SHA-256 mismatch for {key}: manifest says {sha256}")
+                # Readers that already mapped the old file keep its inode; new opens see the new one
+                os.replace(temp_file, local_file)
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            self._write_meta(local_file, {'key': key, **remote, 'sha256': sha256})
+        return local_file
+
+    def _check_sha256(self, local_file: str, key: str, sha256: Optional[str]):
+        """Hash a cached file once against the expected SHA-256 and record the result"""
+        meta = self._read_meta(local_file) or {}
+        if not sha256 or meta.get('sha256') == sha256:
+            return
+        if file_digest(local_file, 'sha256') != sha256:
+            raise IOError(f"SHA-256 mismatch for cached {key}: manifest says {sha256}")
+        self._write_meta(local_file, {**meta, 'sha256': sha256})
+
+    def _download(self, key: str, temp_file: str, remote: Dict):
+        """Parallel ranged GETs, each streamed into its slice of a preallocated file, then verified"""
+        size = remote['size']
+        ranges = [(start, min(start + self.part_size, size)) for start in range(0, size, self.part_size)]
+        with open(temp_file, 'wb') as f:
+            f.truncate(size)
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, max(len(ranges), 1))) as pool:
+            part_digests = list(pool.map(
+                lambda part: self._download_part(key, temp_file, part[0], part[1], remote['etag']), ranges
+            ))
+        self._verify(key, temp_file, remote['etag'], part_digests)
+
+    def _download_part(self, key: str, temp_file: str, start: int, end: int, etag: str) -> bytes:
+        """Write bytes [start, end) at their offset; returns the part's MD5 digest"""
+        for attempt in range(1, PART_RETRIES + 1):
+            digest = hashlib.md5()
+            try:
+                # IfMatch: fail instead of mixing parts if the object is replaced mid-download
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=key,
+                                              Range=f"bytes={start}-{end - 1}", IfMatch=etag)
+                written = 0
+                with open(temp_file, 'r+b') as f:
+                    f.seek(start)
+                    for data in response['Body'].iter_chunks(STREAM_CHUNK_SIZE):
+                        f.write(data)
+                        digest.update(data)
+                        written += len(data)
+                if written != end - start:
+                    raise IOError(f"Got {written} bytes of range {start}-{end - 1}, expected {end - start}")
+                return digest.digest()
+            except Exception as e:
+                if attempt == PART_RETRIES:
+                    raise
+                logger.warning(f"⚠️ Retrying {key} bytes {start}-{end - 1} ({str(e)})")
+
+    def _verify(self, key: str, temp_file: str, etag: str, part_digests: List[bytes]):
+        """
+        Check the download against the ETag
+
+        A plain ETag is the MD5 of the object. A multipart ETag ("<md5>-<n>") is the
+        MD5 of the part MD5s and can be checked when the object was uploaded with
+        the same part size; otherwise only the size is known to match.
+        """
+        if '-' not in etag:
+            if len(part_digests) == 1:
+                actual = part_digests[0].hex()
+            else:
+                actual = file_digest(temp_file, 'md5')
+        elif int(etag.rsplit('-', 1)[1]) == len(part_digests):
+            actual = f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+        else:
+            logger.info(f"ℹ️ {key} was uploaded with another part size, ETag not verified")
+            return
+        if actual != etag:
+            raise IOError(f"Checksum mismatch for {key}: ETag {etag}, downloaded {actual}")
+
+    def _head(self, key: str) -> Dict:
+        response = self.s3.head_object(Bucket=self.bucket_name, Key=key)
+        return {'etag': response['ETag'].strip('"'), 'size': int(response['ContentLength'])}
+
+    def _is_current(self, local_file: str, key: str, remote: Dict) -> bool:
+        meta = self._read_meta(local_file)
+        return (
+            meta is not None
+            and meta.get('key') == key
+            and meta.get('etag') == remote['etag']
+            and os.path.exists(local_file)
+            and os.path.getsize(local_file) == remote['size']
+        )
+
+    @staticmethod
+    def _read_meta(local_file: str) -> Optional[Dict]:
+        try:
+            with open(f"{local_file}.meta.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_meta(local_file: str, meta: Dict):
+        meta_file = f"{local_file}.meta.json"
+        temp_file = f"{meta_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp_file, meta_file)
+
+    @contextmanager
+    def _lock(self, local_file: str):
+        """Exclusive per-file lock across processes (no-op without fcntl)"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(f"{local_file}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def file_digest(path: str, algorithm: str = 'sha256') -> str:
+    """Hex digest of a file, read in STREAM_CHUNK_SIZE blocks"""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(data)
+    return digest.hexdigest()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+ANN Index Builder
+Builds an approximate nearest-neighbour or quantized index next to the latest
+embeddings .npy file and reports its recall against exact search
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag_system.vector_index import ExactIndex, index_artifact_path, recall_at_k, sample_queries
+from rag_system.ivf_index import IVFIndex
+from rag_system.hnsw_index import HNSWIndex
+from rag_system.quantized_index import ScalarQuantizedIndex, ProductQuantizedIndex, MatryoshkaIndex
+
+
+def find_latest_embeddings(embeddings_dir: str) -> str:
+    """Return the most recent legal_embeddings_*.npy file"""
+    embedding_files = sorted(glob.glob(os.path.join(embeddings_dir, "legal_embeddings_*.npy")))
+    if not embedding_files:
+        raise FileNotFoundError(f"No legal_embeddings_*.npy found in {embeddings_dir}")
+    return embedding_files[-1]
+
+
+def report_recall(index, exact: ExactIndex, queries: np.ndarray, k: int, param: str, values) -> dict:
+    """Print recall@k and mean latency for each value of a search parameter"""
+    recalls = {}
+    for value in values:
+        setattr(index, param, value)
+        start = time.perf_counter()
+        recall = recall_at_k(index, exact, queries, k)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+        recalls[value] = recall
+        print(f"  {param}={value:<5} recall@{k}={recall:.3f}  ({elapsed_ms:.2f} ms/query incl. exact)")
+    return recalls
+
+
+def build_ivf(vectors: np.ndarray, exact: ExactIndex, queries: np.ndarray, args) -> IVFIndex:
+    """Train the IVF index and pick the reported nprobe"""
+    start = time.perf_counter()
+    index = IVFIndex.build(vectors, n_lists=args.n_lists, nprobe=args.nprobe)
+    print(f"✅ Trained {index.n_lists} lists in {time.perf_counter() - start:.1f}s")
+
+    sweep = sorted({1, 2, 4, 8, 16, 32, args.nprobe} & set(range(1, index.n_lists + 1)))
+    recalls = report_recall(index, exact, queries, args.k, "nprobe", sweep)
+    index.nprobe = args.nprobe
+    index.metadata = {'nprobe': args.nprobe, 'recall_k': args.k, 'recall': recalls[args.nprobe]}
+    return index
+
+
+def build_hnsw(vectors: np.ndarray, exact: ExactIndex, queries: np.ndarray, args) -> HNSWIndex:
+    """Build (or incrementally extend) the HNSW graph and pick the reported ef_search"""
+    start = time.perf_counter()
+    if args.base_index:
+        # Graph built for an earlier, shorter embeddings file: insert only the new rows
+        index = HNSWIndex.load(args.base_index, vectors, ef_search=args.ef_search)
+        added = index.add_missing()
+        print(f"✅ Extended {args.base_index} by {added} to {len(index)} nodes in {time.perf_counter() - start:.1f}s")
+    else:
+        index = HNSWIndex.build(vectors, M=args.M, ef_construction=args.ef_construction, ef_search=args.ef_search)
+        print(f"✅ Built graph with {len(index)} nodes, {index.max_level + 1} layers in {time.perf_counter() - start:.1f}s")
+
+    sweep = sorted({16, 32, 64, 128, 256, args.ef_search})
+    recalls = report_recall(index, exact, queries, args.k, "ef_search", sweep)
+    index.ef_search = args.ef_search
+    index.metadata = {'ef_search': args.ef_search, 'recall_k': args.k, 'recall': recalls[args.ef_search]}
+    return index
+
+
+def build_quantized(vectors: np.ndarray, raw_vectors: np.ndarray, exact: ExactIndex,
+                    queries: np.ndarray, args):
+    """Encode int8 / PQ codes or the Matryoshka prefix and pick the reported re-rank depth"""
+    start = time.perf_counter()
+    if args.backend == "sq8":
+        index = ScalarQuantizedIndex.build(vectors, rerank_vectors=raw_vectors, rerank=args.rerank)
+    elif args.backend == "mrl":
+        index = MatryoshkaIndex.build(raw_vectors, prefix_dims=args.mrl_dims, rerank_vectors=raw_vectors, rerank=args.rerank)
+    else:
+        index = ProductQuantizedIndex.build(vectors, m=args.pq_m, rerank_vectors=raw_vectors, rerank=args.rerank)
+    print(f"✅ Encoded {len(index)} chunks in {time.perf_counter() - start:.1f}s: "
+          f"{index.code_bytes / 1e6:.1f} MB codes vs {vectors.nbytes / 1e6:.1f} MB float32")
+
+    # rerank=0 is the overlap of the compressed scan alone with full-dimension search
+    sweep = sorted({0, 50, 100, 200, 500, args.rerank})
+    recalls = report_recall(index, exact, queries, args.k, "rerank", sweep)
+    index.rerank = args.rerank
+    index.metadata = {'rerank': args.rerank, 'recall_k': args.k, 'recall': recalls[args.rerank]}
+    if args.backend == "mrl":
+        index.metadata['prefix_dims'] = args.mrl_dims
+    return index
+
+
+def main():
+    """Main function with command line arguments"""
+    parser = argparse.ArgumentParser(description="Build an ANN index for the legal chunk embeddings")
+    parser.add_argument("--embeddings", type=str, default=None,
+                        help="Embeddings .npy file (default: latest in --embeddings-dir)")
+    parser.add_argument("--embeddings-dir", type=str, default="rag_system/embeddings_output",
+                        help="Directory searched for the latest embeddings")
+    parser.add_argument("--backend", choices=["ivf", "hnsw", "sq8", "pq", "mrl"], default="ivf",
+                        help="Index type to build (default: ivf)")
+    parser.add_argument("--n-lists", type=int, default=None,
+                        help="IVF: number of k-means lists (default: 4 * sqrt(n))")
+    parser.add_argument("--nprobe", type=int, default=8,
+                        help="IVF: lists scanned per query (default: 8)")
+    parser.add_argument("--M", type=int, default=16,
+                        help="HNSW: links per node, 2*M on the base layer (default: 16)")
+    parser.add_argument("--ef-construction", type=int, default=100,
+                        help="HNSW: candidate list size while inserting (default: 100)")
+    parser.add_argument("--ef-search", type=int, default=64,
+                        help="HNSW: candidate list size while searching (default: 64)")
+    parser.add_argument("--base-index", type=str, default=None,
+                        help="HNSW: existing graph to extend with the new rows instead of rebuilding")
+    parser.add_argument("--pq-m", type=int, default=96,
+                        help="PQ: sub-vectors per embedding, must divide the dimension (default: 96)")
+    parser.add_argument("--mrl-dims", type=int, default=256,
+                        help="mrl: leading embedding dimensions kept in RAM (default: 256)")
+    parser.add_argument("--rerank", type=int, default=200,
+                        help="sq8/pq/mrl: candidates re-scored with full vectors (default: 200)")
+    parser.add_argument("--k", type=int, default=10,
+                        help="Neighbourhood size for the recall report (default: 10)")
+    parser.add_argument("--queries", type=int, default=200,
+                        help="Number of sampled queries for the recall report (default: 200)")
+
+    args = parser.parse_args()
+
+    embeddings_file = args.embeddings or find_latest_embeddings(args.embeddings_dir)
+    print(f"📂 Loading embeddings from: {embeddings_file}")
+    raw_vectors = np.load(embeddings_file, mmap_mode='r')
+    exact = ExactIndex(raw_vectors)
+    vectors = exact.vectors
+    print(f"✅ {len(vectors)} chunks x {vectors.shape[1]} dims")
+
+    queries = sample_queries(vectors, n=args.queries)
+
+    if args.backend == "hnsw":
+        index = build_hnsw(vectors, exact, queries, args)
+    elif args.backend in ("sq8", "pq", "mrl"):
+        index = build_quantized(vectors, raw_vectors, exact, queries, args)
+    else:
+        index = build_ivf(vectors, exact, queries, args)
+
+    output_file = index_artifact_path(embeddings_file, args.backend)
+    index.save(output_file, **index.metadata)
+    print(f"💾 Saved {args.backend} index: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,6 @@ except ImportError:
 
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
@@ -34,6 +33,7 @@ class LegalRAGDatabase:
         self.conn = sqlite3.connect(db_path)
         self.embedding_model = None
         self.embedding_type = None
+        self.embedding_index = None  # Normalized embedding matrix + filter columns, loaded on first search
         self.setup_database()
         
     def setup_database(self):
@@ -194,6 +194,7 @@ class LegalRAGDatabase:
             ))
         
         self.conn.commit()
+        self.embedding_index = None
         print("✅ Data loaded into database")
         
         return len(chunks_df), len(metadata_df)
@@ -232,6 +233,7 @@ class LegalRAGDatabase:
             self.conn.commit()
             print(f"✅ Processed batch {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1}")
         
+        self.embedding_index = None
         print("🎉 All embeddings generated successfully!")
     
     def search(self, query: str, top_k: int = 5, law_type_filter: str = None, 
@@ -243,39 +245,33 @@ class LegalRAGDatabase:
         # Generate query embedding
         query_embedding = self.get_embeddings([query])[0]
         
-        # Build SQL query with filters
-        sql_conditions = ["embedding IS NOT NULL"]
-        params = []
-        
+        # Score against the cached matrix; only the top_k rows are read back from SQLite
+        index = self.get_embedding_index()
+        mask = np.ones(len(index['ids']), dtype=bool)
         if law_type_filter:
-            sql_conditions.append("law_type = ?")
-            params.append(law_type_filter)
-            
+            mask &= index['law_types'] == law_type_filter
         if chunk_type_filter:
-            sql_conditions.append("chunk_type = ?")
-            params.append(chunk_type_filter)
-        
-        sql_query = f"""
-            SELECT chunk_id, law_name, law_type, chunk_type, chunk_index, 
-                   text, char_count, word_count, embedding
-            FROM chunks 
-            WHERE {' AND '.join(sql_conditions)}
-        """
+            mask &= index['chunk_types'] == chunk_type_filter
+        rows = np.flatnonzero(mask)
         
+        top_results = []
         cursor = self.conn.cursor()
-        cursor.execute(sql_query, params)
-        results = cursor.fetchall()
-        
-        # Calculate similarities
-        similarities = []
-        for result in results:
-            embedding = pickle.loads(result[8])  # embedding is the 9th column (index 8)
-            similarity = cosine_similarity([query_embedding], [embedding])[0][0]
-            similarities.append((similarity, result))
-        
-        # Sort by similarity and take top_k
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        top_results = similarities[:top_k]
+        if len(rows) and top_k > 0:
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)  # never normalize the caller's array
+            scores = index['matrix'][rows] @ query_vector if len(rows) < len(mask) else index['matrix'] @ query_vector
+            
+            # Sort by similarity and take top_k
+            order = np.argsort(-scores, kind='stable')[:top_k]
+            top_ids = [int(index['ids'][rows[i]]) for i in order]
+            cursor.execute(f"""
+                SELECT id, chunk_id, law_name, law_type, chunk_type, chunk_index, 
+                       text, char_count, word_count
+                FROM chunks 
+                WHERE id IN ({', '.join('?' * len(top_ids))})
+            """, top_ids)
+            by_id = {row[0]: row[1:] for row in cursor.fetchall()}
+            top_results = [(float(scores[i]), by_id[chunk_id]) for i, chunk_id in zip(order, top_ids)]
         
         # Format results
         formatted_results = []
@@ -304,6 +300,35 @@ class LegalRAGDatabase:
         
         return formatted_results
     
+    def get_embedding_index(self) -> Dict:
+        """
+        Row ids, filter columns and the normalized float32 embedding matrix
+        
+        Unpickled once and kept until the chunks or embeddings change, so a
+        search is a single matrix-vector product instead of N deserializations.
+        """
+        if self.embedding_index is None:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT id, law_type, chunk_type, embedding
+                FROM chunks
+                WHERE embedding IS NOT NULL
+                ORDER BY id
+            """)
+            rows = cursor.fetchall()
+            if rows:
+                matrix = np.array([pickle.loads(row[3]) for row in rows], dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+            else:
+                matrix = np.empty((0, 0), dtype=np.float32)
+            self.embedding_index = {
+                'ids': np.array([row[0] for row in rows], dtype=np.int64),
+                'law_types': np.array([row[1] for row in rows], dtype=object),
+                'chunk_types': np.array([row[2] for row in rows], dtype=object),
+                'matrix': matrix,
+            }
+        return self.embedding_index
+    
     def get_law_metadata(self, law_name: str) -> Dict:
         """Get metadata for a specific law"""
         cursor = self.conn.cursor()
@@ -0,0 +1,182 @@
+"""
+Chunk Store
+Columnar chunk metadata: per-law fields held once in a law table, chunks reduced
+to integer columns plus offsets into a UTF-8 text blob that is read lazily
+"""
+
+import json
+import os
+import numpy as np
+from typing import Dict, Iterator, List
+
+# Per-chunk fields; every other field is law-level and lives in the law table
+CHUNK_FIELDS = ("chunk_id", "text", "tokens", "chunk_index")
+CHUNK_INT_FIELDS = ("tokens", "chunk_index")
+
+
+def chunk_store_paths(chunks_file: str):
+    """Column (.npz) and text blob (.bin) paths stored next to legal_chunks_<timestamp>.json"""
+    directory, file_name = os.path.split(chunks_file)
+    stem = os.path.splitext(file_name)[0].replace("legal_chunks_", "legal_chunkstore_")
+    return os.path.join(directory, stem + ".npz"), os.path.join(directory, stem + ".bin")
+
+
+class ChunkStore:
+    """Read-only sequence of chunk dicts backed by columns and a text blob"""
+
+    def __init__(self, fields: List[str], laws: List[Dict], chunk_law_ids: np.ndarray,
+                 text_offsets: np.ndarray, text_blob, chunk_ids: np.ndarray, int_columns: Dict[str, np.ndarray]):
+        """
+        Initialize the store
+
+        Args:
+            fields (List[str]): Chunk dict keys in their original order
+            laws (List[Dict]): Law table, one metadata dict per distinct law
+            chunk_law_ids (np.ndarray): Law table row of every chunk
+            text_offsets (np.ndarray): Start of every chunk's text in the blob (n_chunks + 1)
+            text_blob: UTF-8 bytes or memory-mapped uint8 array
+            chunk_ids (np.ndarray): Chunk identifiers
+            int_columns (Dict[str, np.ndarray]): Integer per-chunk fields
+        """
+        self.fields = list(fields)
+        self.laws = laws
+        self.chunk_law_ids = np.asarray(chunk_law_ids, dtype=np.int32)
+        self.text_offsets = np.asarray(text_offsets, dtype=np.int64)
+        self.text_blob = text_blob
+        self.chunk_ids = chunk_ids
+        self.int_columns = int_columns
+
+        # Law number (mevzuatNo) -> law table rows, for citation lookups
+        self.law_number_ids = {}
+        for law_id, law in enumerate(laws):
+            self.law_number_ids.setdefault(str(law.get('law_number', '')), []).append(law_id)
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict]) -> "ChunkStore":
+        """Columnarize a list of chunk dicts (as written by create_embeddings.py)"""
+        fields = list(chunks[0].keys()) if chunks else list(CHUNK_FIELDS)
+        law_fields = [field for field in fields if field not in CHUNK_FIELDS]
+
+        law_to_id, laws = {}, []
+        chunk_law_ids = np.empty(len(chunks), dtype=np.int32)
+        text_offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        texts = []
+        for i, chunk in enumerate(chunks):
+            law = tuple(chunk.get(field) for field in law_fields)
+            if law not in law_to_id:
+                law_to_id[law] = len(laws)
+                laws.append(dict(zip(law_fields, law)))
+            chunk_law_ids[i] = law_to_id[law]
+
+            text = chunk.get('text', '').encode('utf-8')
+            texts.append(text)
+            text_offsets[i + 1] = text_offsets[i] + len(text)
+
+        chunk_ids = np.array([str(chunk.get('chunk_id', '')) for chunk in chunks])
+        int_columns = {
+            field: np.array([chunk.get(field, 0) for chunk in chunks], dtype=np.int32)
+            for field in CHUNK_INT_FIELDS
+        }
+        return cls(fields, laws, chunk_law_ids, text_offsets, b"".join(texts), chunk_ids, int_columns)
+
+    def __len__(self) -> int:
+        return len(self.chunk_law_ids)
+
+    def __getitem__(self, chunk_idx) -> Dict:
+        """Rebuild one chunk dict; only this chunk's text is read from the blob"""
+        chunk_idx = int(chunk_idx)
+        if chunk_idx < 0:
+            chunk_idx += len(self)
+        if not 0 <= chunk_idx < len(self):
+            raise IndexError(f"chunk index {chunk_idx} out of range")
+
+        law = self.laws[self.chunk_law_ids[chunk_idx]]
+        chunk = {}
+        for field in self.fields:
+            if field == 'text':
+                chunk[field] = self.text(chunk_idx)
+            elif field == 'chunk_id':
+                chunk[field] = str(self.chunk_ids[chunk_idx])
+            elif field in self.int_columns:
+                chunk[field] = int(self.int_columns[field][chunk_idx])
+            else:
+                chunk[field] = law.get(field)
+        return chunk
+
+    def __iter__(self) -> Iterator[Dict]:
+        for chunk_idx in range(len(self)):
+            yield self[chunk_idx]
+
+    def text(self, chunk_idx: int) -> str:
+        """Decode a single chunk's text"""
+        start, end = self.text_offsets[chunk_idx], self.text_offsets[chunk_idx + 1]
+        return bytes(self.text_blob[start:end]).decode('utf-8')
+
+    def law(self, chunk_idx: int) -> Dict:
+        """Law-level metadata of a chunk (shared dict, do not modify)"""
+        return self.laws[self.chunk_law_ids[chunk_idx]]
+
+    def laws_by_number(self, law_numbers) -> np.ndarray:
+        """Law table rows of the laws with any of the given numbers"""
+        ids = [law_id for number in law_numbers for law_id in self.law_number_ids.get(str(number), ())]
+        return np.array(ids, dtype=np.int32)
+
+    def save(self, chunks_file: str):
+        """Write the columns and text blob next to the source JSON (atomically renamed into place)"""
+        columns_file, text_file = chunk_store_paths(chunks_file)
+        suffix = f".{os.getpid()}.tmp"
+
+        with open(text_file + suffix, 'wb') as f:
+            f.write(bytes(self.text_blob))
+        with open(columns_file + suffix, 'wb') as f:
+            np.savez(
+                f,
+                header=np.frombuffer(json.dumps({'fields': self.fields, 'laws': self.laws},
+                                                ensure_ascii=False).encode('utf-8'), dtype=np.uint8),
+                chunk_law_ids=self.chunk_law_ids,
+                text_offsets=self.text_offsets,
+                chunk_ids=self.chunk_ids,
+                **self.int_columns
+            )
+
+        # Text first, so a visible column file always has its blob
+        os.replace(text_file + suffix, text_file)
+        os.replace(columns_file + suffix, columns_file)
+
+    @classmethod
+    def load(cls, chunks_file: str) -> "ChunkStore":
+        """Open a saved store; the text blob is memory-mapped, not read"""
+        columns_file, text_file = chunk_store_paths(chunks_file)
+        with np.load(columns_file) as data:
+            header = json.loads(data['header'].tobytes().decode('utf-8'))
+            int_columns = {field: data[field] for field in CHUNK_INT_FIELDS if field in data.files}
+            chunk_law_ids, text_offsets, chunk_ids = data['chunk_law_ids'], data['text_offsets'], data['chunk_ids']
+
+        text_blob = np.memmap(text_file, dtype=np.uint8, mode='r') if os.path.getsize(text_file) else b""
+        return cls(header['fields'], header['laws'], chunk_law_ids, text_offsets, text_blob, chunk_ids, int_columns)
+
+
+def load_chunk_store(chunks_file: str) -> ChunkStore:
+    """
+    Open the columnar store for a chunks JSON file, converting it on first use
+
+    The store is rebuilt when the JSON is newer. If it cannot be written next to
+    the JSON, the in-memory columnar store is returned instead.
+
+    Args:
+        chunks_file (str): legal_chunks_<timestamp>.json
+
+    Returns:
+        ChunkStore: Columnar chunk store
+    """
+    columns_file, _ = chunk_store_paths(chunks_file)
+    if os.path.exists(columns_file) and os.path.getmtime(columns_file) >= os.path.getmtime(chunks_file):
+        return ChunkStore.load(chunks_file)
+
+    with open(chunks_file, 'r', encoding='utf-8') as f:
+        store = ChunkStore.from_chunks(json.load(f))
+    try:
+        store.save(chunks_file)
+    except OSError:
+        return store
+    return ChunkStore.load(chunks_file)
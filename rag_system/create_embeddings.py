@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import openai
 import os
+import sys
 import time
 import json
 import pickle
@@ -10,6 +11,11 @@ from datetime import datetime
 import tiktoken
 from tqdm import tqdm
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag_system.manifest import build_manifest, write_manifest
+
 class LegalDocumentEmbedder:
     def __init__(self, api_key: str = None, model: str = "text-embedding-3-small"):
         """
@@ -266,11 +272,15 @@ class LegalDocumentEmbedder:
         with open(stats_file, 'w', encoding='utf-8') as f:
             json.dump(stats, f, ensure_ascii=False, indent=2)
         
+        # 5. Manifest (shapes, checksums) and the latest.json pointer loaders resolve
+        manifest_file = write_manifest(output_dir, build_manifest(output_dir, timestamp, self.model))
+        
         print(f"✅ Results saved to {output_dir}/")
         print(f"  📄 Chunks: {chunks_file}")
         print(f"  🔢 Embeddings: {embeddings_file}")
         print(f"  💾 Complete data: {complete_file}")
         print(f"  📊 Statistics: {stats_file}")
+        print(f"  🧾 Manifest: {manifest_file}")
 
 def main():
     print("🚀 Legal Document Embedding Generator")
@@ -0,0 +1,122 @@
+"""
+Embedding Cache
+Two-tier cache for query embeddings: a bounded in-process LRU in front of a
+SQLite table that survives restarts and is shared by all worker processes
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from utils.turkish_text import turkish_casefold
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query_text(query: str) -> str:
+    """Cache key text: Turkish case-folded (as in BM25 and LawMatcher) with collapsed whitespace"""
+    return " ".join(turkish_casefold(query).split())
+
+
+class EmbeddingCache:
+    """LRU (memory) + SQLite (disk) cache of float32 query vectors keyed by (model, query)"""
+
+    def __init__(self, db_path: str = None, max_entries: int = 2048):
+        """
+        Initialize the cache
+
+        Args:
+            db_path (str): SQLite file for the persistent tier (None or "" = memory only)
+            max_entries (int): Maximum vectors kept in the in-process LRU
+        """
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self.conn = None
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self.conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute('''
+                    CREATE TABLE IF NOT EXISTS query_embeddings (
+                        model TEXT NOT NULL,
+                        query TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        PRIMARY KEY (model, query)
+                    )
+                ''')
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Embedding cache disk tier disabled ({str(e)})")
+                self.conn = None
+
+    def get(self, query: str, model: str) -> Optional[np.ndarray]:
+        """Return the cached vector for a query, or None on a miss"""
+        key = (model, normalize_query_text(query))
+        with self.lock:
+            vector = self.memory.get(key)
+            if vector is not None:
+                self.memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+
+            if self.conn is not None:
+                try:
+                    row = self.conn.execute(
+                        "SELECT vector FROM query_embeddings WHERE model = ? AND query = ?", key
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Embedding cache read failed: {str(e)}")
+                    row = None
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.hits_disk += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, model: str, vector) -> np.ndarray:
+        """Store a vector as float32 in both tiers and return the stored array"""
+        key = (model, normalize_query_text(query))
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        vector.flags.writeable = False  # shared between callers
+        with self.lock:
+            self._remember(key, vector)
+            if self.conn is not None:
+                try:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO query_embeddings (model, query, vector) VALUES (?, ?, ?)",
+                        (*key, vector.tobytes())
+                    )
+                    self.conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Embedding cache write failed: {str(e)}")
+        return vector
+
+    def _remember(self, key, vector: np.ndarray):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and hit rate since start"""
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            'memory_entries': len(self.memory),
+            'hits_memory': self.hits_memory,
+            'hits_disk': self.hits_disk,
+            'misses': self.misses,
+            'hit_rate': (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,284 @@
+"""
+HNSW Index
+Pure NumPy hierarchical navigable small-world graph over the normalized chunk
+vectors, with incremental insertion and on-disk serialization
+"""
+
+import heapq
+import logging
+import numpy as np
+from typing import Dict, List, Tuple
+
+from rag_system.vector_index import normalize_embeddings, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+class HNSWIndex:
+    """Multi-layer proximity graph searched greedily from a single entry point"""
+
+    backend = "hnsw"
+    exhaustive = False
+
+    def __init__(self, vectors: np.ndarray, M: int = 16, ef_construction: int = 100,
+                 ef_search: int = 64, seed: int = 0):
+        """
+        Initialize an empty graph over a vector matrix
+
+        Args:
+            vectors (np.ndarray): Normalized float32 chunk vectors (shared, not copied)
+            M (int): Links per node on upper layers (2 * M on layer 0)
+            ef_construction (int): Candidate list size while inserting
+            ef_search (int): Candidate list size while searching
+            seed (int): Random seed for level assignment
+        """
+        self.vectors = vectors
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1 / np.log(max(M, 2))
+        self.rng = np.random.default_rng(seed)
+
+        # Layer 0 links as a fixed-width matrix padded with -1; upper layers are sparse
+        self.level0 = np.full((len(vectors), self.M0), -1, dtype=np.int32)
+        self.upper: List[Dict[int, List[int]]] = []
+        self.node_levels = np.zeros(len(vectors), dtype=np.int8)
+        self.n_nodes = 0
+        self.entry_point = None
+        self.max_level = -1
+        self.metadata = {}
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, M: int = 16, ef_construction: int = 100,
+              ef_search: int = 64, seed: int = 0) -> "HNSWIndex":
+        """Insert every row of `vectors` into a new graph"""
+        index = cls(vectors, M=M, ef_construction=ef_construction, ef_search=ef_search, seed=seed)
+        index.add_missing()
+        return index
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    @property
+    def dims(self) -> int:
+        return self.vectors.shape[1]
+
+    def add(self, new_vectors: np.ndarray) -> np.ndarray:
+        """
+        Insert new chunk vectors without rebuilding the graph
+
+        Args:
+            new_vectors (np.ndarray): Raw or normalized embeddings of the new chunks
+
+        Returns:
+            np.ndarray: Row ids assigned to the new chunks
+        """
+        start = len(self.vectors)
+        self.vectors = np.concatenate([np.asarray(self.vectors, dtype=np.float32), normalize_embeddings(new_vectors)])
+        self.add_missing()
+        return np.arange(start, len(self.vectors))
+
+    def add_missing(self) -> int:
+        """Insert rows of `vectors` that are not in the graph yet (e.g. after the matrix grew)"""
+        missing = len(self.vectors) - self.n_nodes
+        if missing <= 0:
+            return 0
+
+        if len(self.level0) < len(self.vectors):
+            capacity = max(len(self.vectors), 2 * len(self.level0))
+            level0 = np.full((capacity, self.M0), -1, dtype=np.int32)
+            level0[:self.n_nodes] = self.level0[:self.n_nodes]
+            node_levels = np.zeros(capacity, dtype=np.int8)
+            node_levels[:self.n_nodes] = self.node_levels[:self.n_nodes]
+            self.level0, self.node_levels = level0, node_levels
+
+        for node in range(self.n_nodes, len(self.vectors)):
+            self._insert(node)
+        return missing
+
+    def _links(self, node: int, layer: int) -> List[int]:
+        if layer == 0:
+            row = self.level0[node]
+            return row[row >= 0].tolist()
+        return self.upper[layer - 1].get(node, [])
+
+    def _set_links(self, node: int, layer: int, links: List[int]):
+        if layer == 0:
+            self.level0[node] = -1
+            self.level0[node, :len(links)] = links
+        else:
+            self.upper[layer - 1][node] = list(links)
+
+    def _search_layer(self, query: np.ndarray, entry_points: List[int], ef: int, layer: int) -> List[Tuple[float, int]]:
+        """Best-first search of one layer; returns up to ef (score, node) pairs"""
+        visited = set(entry_points)
+        entry_scores = (self.vectors[entry_points] @ query).tolist()
+        candidates = [(-score, node) for score, node in zip(entry_scores, entry_points)]
+        heapq.heapify(candidates)
+        results = [(score, node) for score, node in zip(entry_scores, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_score < results[0][0]:
+                break
+
+            neighbors = [n for n in self._links(node, layer) if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+
+            for neighbor, score in zip(neighbors, (self.vectors[neighbors] @ query).tolist()):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    heapq.heappush(results, (score, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return results
+
+    def _select_neighbors(self, scored: List[Tuple[float, int]], m: int) -> List[int]:
+        """Diversity heuristic: keep a candidate only if it is closer to the base than to any kept link"""
+        ordered = sorted(scored, reverse=True)
+        if len(ordered) <= m:
+            return [node for _, node in ordered]
+
+        selected, discarded = [], []
+        for score, node in ordered:
+            if len(selected) >= m:
+                break
+            if not selected or np.max(self.vectors[selected] @ self.vectors[node]) < score:
+                selected.append(node)
+            else:
+                discarded.append(node)
+
+        # Top up with the closest discarded candidates to keep the graph connected
+        for node in discarded[:m - len(selected)]:
+            selected.append(node)
+        return selected
+
+    def _insert(self, node: int):
+        """Insert one row of `vectors` into the graph"""
+        level = int(-np.log(1.0 - self.rng.random()) * self.level_mult)
+        self.node_levels[node] = level
+        self.n_nodes = node + 1
+        while len(self.upper) < level:
+            self.upper.append({})
+        for layer in range(1, level + 1):
+            self.upper[layer - 1].setdefault(node, [])
+
+        if self.entry_point is None:
+            self.entry_point, self.max_level = node, level
+            return
+
+        query = self.vectors[node]
+        entry_points = [self.entry_point]
+        for layer in range(self.max_level, level, -1):
+            entry_points = [max(self._search_layer(query, entry_points, 1, layer))[1]]
+
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, entry_points, self.ef_construction, layer)
+            neighbors = self._select_neighbors(found, self.M)
+            self._set_links(node, layer, neighbors)
+
+            m_max = self.M0 if layer == 0 else self.M
+            for neighbor in neighbors:
+                links = self._links(neighbor, layer) + [node]
+                if len(links) > m_max:
+                    scores = (self.vectors[links] @ self.vectors[neighbor]).tolist()
+                    links = self._select_neighbors(list(zip(scores, links)), m_max)
+                self._set_links(neighbor, layer, links)
+
+            entry_points = [n for _, n in found]
+
+        if level > self.max_level:
+            self.entry_point, self.max_level = node, level
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the k most similar chunks
+
+        Args:
+            query (np.ndarray): Normalized float32 query vector
+            k (int): Number of chunks to return
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Chunk indices and their similarities, best first
+        """
+        found = []
+        if self.entry_point is not None:
+            entry_points = [self.entry_point]
+            for layer in range(self.max_level, 0, -1):
+                entry_points = [max(self._search_layer(query, entry_points, 1, layer))[1]]
+            found = sorted(self._search_layer(query, entry_points, max(self.ef_search, k), 0), reverse=True)[:k]
+
+        nodes = np.array([node for _, node in found], dtype=np.int64)
+        scores = np.array([score for score, _ in found], dtype=np.float32)
+        if self.n_nodes < len(self.vectors):
+            # Rows the saved graph does not cover yet are scored exactly and merged
+            tail_scores = np.asarray(self.vectors[self.n_nodes:] @ query, dtype=np.float32)
+            nodes = np.concatenate([nodes, np.arange(self.n_nodes, len(self.vectors), dtype=np.int64)])
+            scores = np.concatenate([scores, tail_scores])
+            top = top_k_indices(scores, k)
+            nodes, scores = nodes[top], scores[top]
+        return nodes, scores
+
+    def save(self, path: str, **metadata):
+        """Persist the graph (vectors stay in the .npy file)"""
+        arrays = {
+            'level0': self.level0[:self.n_nodes],
+            'node_levels': self.node_levels[:self.n_nodes],
+            'params': np.array([self.M, self.ef_construction,
+                                -1 if self.entry_point is None else self.entry_point, self.max_level]),
+        }
+        for layer, links in enumerate(self.upper, 1):
+            nodes = np.array(sorted(links), dtype=np.int32)
+            counts = [len(links[n]) for n in nodes]
+            arrays[f'upper{layer}_nodes'] = nodes
+            arrays[f'upper{layer}_offsets'] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            arrays[f'upper{layer}_links'] = np.array([l for n in nodes for l in links[n]], dtype=np.int32)
+        arrays.update({key: np.asarray(value) for key, value in metadata.items()})
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str, vectors: np.ndarray, ef_search: int = 64) -> "HNSWIndex":
+        """
+        Load a saved graph and attach it to the chunk vectors
+
+        Rows of `vectors` beyond the saved graph are not inserted here (that is an
+        offline job: build_ann_index.py --base-index); search scores them exactly
+        until the graph is rebuilt or extended.
+
+        Raises:
+            ValueError: If the graph has more nodes than there are embeddings
+        """
+        with np.load(path) as data:
+            M, ef_construction, entry_point, max_level = data['params'].tolist()
+            index = cls(vectors, M=M, ef_construction=ef_construction, ef_search=ef_search)
+            level0 = data['level0']
+            if len(level0) > len(vectors):
+                raise ValueError(f"HNSW graph covers {len(level0)} chunks but {len(vectors)} embeddings are loaded")
+
+            index.level0[:len(level0)] = level0
+            index.node_levels[:len(level0)] = data['node_levels']
+            index.n_nodes = len(level0)
+            index.entry_point = None if entry_point < 0 else entry_point
+            index.max_level = max_level
+            for layer in range(1, max_level + 1):
+                nodes = data[f'upper{layer}_nodes']
+                offsets = data[f'upper{layer}_offsets']
+                links = data[f'upper{layer}_links']
+                index.upper.append({
+                    int(node): links[offsets[i]:offsets[i + 1]].tolist() for i, node in enumerate(nodes)
+                })
+            index.metadata = {key: data[key].item() for key in data.files
+                              if key not in ('level0', 'node_levels', 'params') and not key.startswith('upper')}
+
+        missing = len(vectors) - index.n_nodes
+        if missing > 0:
+            logger.warning(f"⚠️ HNSW graph {path} lacks {missing} of {len(vectors)} chunks; they are searched exactly "
+                           f"until the graph is extended with build_ann_index.py --base-index")
+        return index
@@ -0,0 +1,91 @@
+"""
+Index Backends
+Selects and loads the configured search index over normalized chunk vectors
+"""
+
+import logging
+import numpy as np
+from typing import Tuple
+
+from config.config import Config
+from rag_system.vector_index import ExactIndex, index_artifact_path
+from rag_system.ivf_index import IVFIndex
+from rag_system.hnsw_index import HNSWIndex
+from rag_system.quantized_index import ScalarQuantizedIndex, ProductQuantizedIndex, MatryoshkaIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_BACKENDS = ("exact", "ivf", "hnsw", "sq8", "pq", "mrl")
+QUANTIZED_BACKENDS = ("sq8", "pq", "mrl")
+
+
+def uses_quantized_storage(backend: str = None) -> bool:
+    """True if the backend keeps only compressed codes resident (full vectors stay memory-mapped)"""
+    return (backend or Config.RAG_INDEX_BACKEND) in QUANTIZED_BACKENDS
+
+
+def load_search_index(vectors: np.ndarray, embeddings_file: str = None, backend: str = None,
+                      normalized: bool = True):
+    """
+    Attach the configured index backend to the chunk vectors
+
+    ANN artifacts are read from next to the embeddings file. If the artifact
+    is missing or was built for other embeddings, exact search is used (the
+    Matryoshka prefix is instead cut from the vectors at load time).
+
+    Args:
+        vectors (np.ndarray): Chunk vectors; raw (e.g. memory-mapped) for quantized backends
+        embeddings_file (str): Path of the loaded embeddings .npy
+        backend (str): One of INDEX_BACKENDS (default: Config.RAG_INDEX_BACKEND)
+        normalized (bool): Whether `vectors` is already normalized float32
+
+    Returns:
+        Search index exposing search(query, k)
+    """
+    backend = backend or Config.RAG_INDEX_BACKEND
+
+    def exact():
+        return ExactIndex(vectors, normalized=normalized)
+
+    if backend == "exact":
+        return exact()
+    if backend not in INDEX_BACKENDS:
+        logger.warning(f"⚠️ Unknown index backend '{backend}', using exact search")
+        return exact()
+    if not embeddings_file:
+        logger.warning(f"⚠️ No embeddings file to locate the {backend} index, using exact search")
+        return exact()
+
+    path = index_artifact_path(embeddings_file, backend)
+    source = path
+    try:
+        if backend == "ivf":
+            index = IVFIndex.load(path, vectors, nprobe=Config.RAG_IVF_NPROBE)
+        elif backend == "hnsw":
+            index = HNSWIndex.load(path, vectors, ef_search=Config.RAG_HNSW_EF_SEARCH)
+        elif backend == "mrl":
+            index, built = _load_matryoshka(path, vectors)
+            if built:
+                source = f"{Config.RAG_MRL_DIMS}-dim prefix matrix built at load time"
+        elif backend == "sq8":
+            index = ScalarQuantizedIndex.load(path, rerank_vectors=vectors, rerank=Config.RAG_QUANTIZED_RERANK)
+        else:
+            index = ProductQuantizedIndex.load(path, rerank_vectors=vectors, rerank=Config.RAG_QUANTIZED_RERANK)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load {backend} index ({str(e)}), using exact search")
+        return exact()
+
+    logger.info(f"✅ {backend.upper()} index loaded: {source} (build recall={index.metadata.get('recall', 'n/a')})")
+    return index
+
+
+def _load_matryoshka(path: str, vectors: np.ndarray) -> Tuple[MatryoshkaIndex, bool]:
+    """Load the prefix matrix, or cut it from the raw vectors when no artifact matches; True if it was built"""
+    try:
+        index = MatryoshkaIndex.load(path, rerank_vectors=vectors, rerank=Config.RAG_QUANTIZED_RERANK)
+        if index.prefix_dims == Config.RAG_MRL_DIMS:
+            return index, False
+    except (OSError, ValueError) as e:
+        logger.info(f"ℹ️ No usable Matryoshka artifact ({str(e)}), building the prefix matrix")
+    return MatryoshkaIndex.build(vectors, prefix_dims=Config.RAG_MRL_DIMS,
+                                 rerank_vectors=vectors, rerank=Config.RAG_QUANTIZED_RERANK), True
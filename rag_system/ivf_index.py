@@ -0,0 +1,173 @@
+"""
+IVF Index
+Inverted-file approximate nearest-neighbour index: coarse spherical k-means
+centroids plus per-cluster posting lists over the normalized chunk vectors
+"""
+
+import numpy as np
+from typing import Tuple
+
+from rag_system.vector_index import normalize_embeddings, top_k_indices
+
+ASSIGN_BATCH_SIZE = 4096
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by inner product) for every row, in batches"""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BATCH_SIZE):
+        batch = np.asarray(vectors[start:start + ASSIGN_BATCH_SIZE], dtype=np.float32)
+        assignments[start:start + len(batch)] = np.argmax(batch @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 20,
+                     sample_size: int = 100000, seed: int = 0) -> np.ndarray:
+    """
+    Train unit-length centroids on (a sample of) normalized vectors
+
+    Args:
+        vectors (np.ndarray): Normalized float32 training vectors
+        n_clusters (int): Number of centroids
+        n_iter (int): Lloyd iterations
+        sample_size (int): Maximum number of training rows
+        seed (int): Random seed
+
+    Returns:
+        np.ndarray: Normalized float32 centroids (n_clusters x dims)
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        rows = np.sort(rng.choice(len(vectors), size=sample_size, replace=False))
+        data = np.asarray(vectors[rows], dtype=np.float32)
+    else:
+        data = np.asarray(vectors, dtype=np.float32)
+
+    n_clusters = min(n_clusters, len(data))
+    centroids = data[rng.choice(len(data), size=n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = _assign(data, centroids)
+
+        # Sum members per cluster with one sort + reduceat
+        order = np.argsort(assignments, kind='stable')
+        sorted_assignments = assignments[order]
+        starts = np.flatnonzero(np.r_[True, sorted_assignments[1:] != sorted_assignments[:-1]])
+        sums = np.add.reduceat(data[order], starts, axis=0)
+
+        new_centroids = data[rng.choice(len(data), size=n_clusters, replace=False)].copy()  # re-seed empty clusters
+        new_centroids[sorted_assignments[starts]] = sums
+        centroids = normalize_embeddings(new_centroids)
+
+    return centroids
+
+
+class IVFIndex:
+    """Coarse-quantized index that only scans the nprobe closest posting lists"""
+
+    backend = "ivf"
+    exhaustive = False
+
+    def __init__(self, vectors: np.ndarray, centroids: np.ndarray,
+                 list_offsets: np.ndarray, list_ids: np.ndarray, nprobe: int = 8):
+        """
+        Initialize the index
+
+        Args:
+            vectors (np.ndarray): Normalized float32 chunk vectors (shared, not copied)
+            centroids (np.ndarray): Normalized coarse centroids
+            list_offsets (np.ndarray): Start of each posting list in list_ids (n_lists + 1)
+            list_ids (np.ndarray): Chunk rows grouped by cluster
+            nprobe (int): Number of posting lists scanned per query
+        """
+        self.vectors = vectors
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.list_offsets = np.asarray(list_offsets, dtype=np.int64)
+        self.list_ids = np.asarray(list_ids, dtype=np.int64)
+        self.nprobe = nprobe
+        self.metadata = {}
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: int = None, nprobe: int = 8,
+              n_iter: int = 20, seed: int = 0) -> "IVFIndex":
+        """
+        Train centroids and fill posting lists
+
+        Args:
+            vectors (np.ndarray): Normalized float32 chunk vectors
+            n_lists (int): Number of clusters (default: 4 * sqrt(n))
+            nprobe (int): Default number of lists scanned per query
+            n_iter (int): k-means iterations
+            seed (int): Random seed
+
+        Returns:
+            IVFIndex: Ready-to-search index
+        """
+        if n_lists is None:
+            n_lists = int(4 * np.sqrt(len(vectors)))
+        n_lists = max(1, min(n_lists, len(vectors)))
+
+        centroids = spherical_kmeans(vectors, n_lists, n_iter=n_iter, seed=seed)
+        assignments = _assign(vectors, centroids)
+
+        list_ids = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=len(centroids))
+        list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(vectors, centroids, list_offsets, list_ids, nprobe=nprobe)
+
+    def __len__(self) -> int:
+        return len(self.list_ids)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def dims(self) -> int:
+        return self.centroids.shape[1]
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the k most similar chunks
+
+        Args:
+            query (np.ndarray): Normalized float32 query vector
+            k (int): Number of chunks to return
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Chunk indices and their similarities, best first
+        """
+        probes = top_k_indices(self.centroids @ query, self.nprobe)
+        candidates = np.concatenate([
+            self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probes
+        ])
+        scores = self.vectors[candidates] @ query
+        top = top_k_indices(scores, k)
+        return candidates[top], scores[top]
+
+    def save(self, path: str, **metadata):
+        """Persist centroids and posting lists (vectors stay in the .npy file)"""
+        np.savez(
+            path,
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_ids=self.list_ids,
+            **{key: np.asarray(value) for key, value in metadata.items()}
+        )
+
+    @classmethod
+    def load(cls, path: str, vectors: np.ndarray, nprobe: int = 8) -> "IVFIndex":
+        """
+        Load a saved index and attach it to the chunk vectors
+
+        Raises:
+            ValueError: If the index was built for a different number of chunks
+        """
+        with np.load(path) as data:
+            index = cls(vectors, data['centroids'], data['list_offsets'], data['list_ids'], nprobe=nprobe)
+            index.metadata = {key: data[key].item() for key in data.files
+                              if key not in ('centroids', 'list_offsets', 'list_ids')}
+
+        if len(index) != len(vectors):
+            raise ValueError(f"IVF index covers {len(index)} chunks but {len(vectors)} embeddings are loaded")
+        return index
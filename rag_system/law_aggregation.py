@@ -0,0 +1,181 @@
+"""
+Law Aggregation
+Maps chunks to laws and aggregates chunk similarities into per-law scores
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+AGGREGATIONS = ("max", "mean_top_n", "sum")
+
+
+def _group_argmax(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Position of the first maximum inside each contiguous group"""
+    maxima = np.maximum.reduceat(values, starts)
+    counts = np.diff(np.append(starts, len(values)))
+    positions = np.arange(len(values))
+    hits = values == np.repeat(maxima, counts)
+    return np.minimum.reduceat(np.where(hits, positions, len(values)), starts)
+
+
+class ChunkLawIndex:
+    """Precomputed chunk -> law id array with a law-grouped chunk ordering"""
+
+    def __init__(self, chunk_law_ids: np.ndarray, law_keys: List[str]):
+        """
+        Initialize the index
+
+        Args:
+            chunk_law_ids (np.ndarray): Law id for every chunk row
+            law_keys (List[str]): Law key (name) for every law id
+        """
+        self.chunk_law_ids = np.asarray(chunk_law_ids, dtype=np.int32)
+        self.law_keys = law_keys
+
+        # Chunks sorted by law so aggregation is a set of reduceat calls
+        self.order = np.argsort(self.chunk_law_ids, kind='stable')
+        sorted_ids = self.chunk_law_ids[self.order]
+        self.starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]) if len(sorted_ids) else np.empty(0, dtype=np.int64)
+        self.present = sorted_ids[self.starts]
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict]) -> "ChunkLawIndex":
+        """Build the index from chunk metadata, keyed by law name"""
+        key_to_id = {}
+        chunk_law_ids = np.empty(len(chunks), dtype=np.int32)
+        for i, chunk in enumerate(chunks):
+            key = chunk.get('law_name', 'Unknown')
+            chunk_law_ids[i] = key_to_id.setdefault(key, len(key_to_id))
+        return cls(chunk_law_ids, list(key_to_id))
+
+    @classmethod
+    def from_store(cls, store) -> "ChunkLawIndex":
+        """Build the index from a ChunkStore's law table without touching chunk text"""
+        key_to_id = {}
+        law_to_key = np.array([key_to_id.setdefault(law.get('law_name', 'Unknown'), len(key_to_id))
+                               for law in store.laws], dtype=np.int32)
+        return cls(law_to_key[store.chunk_law_ids] if len(store.laws) else np.empty(0, dtype=np.int32),
+                   list(key_to_id))
+
+    @property
+    def n_laws(self) -> int:
+        return len(self.law_keys)
+
+    def aggregate(self,
+                  scores: np.ndarray,
+                  method: str = "max",
+                  top_n: int = 3,
+                  indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Aggregate chunk similarities into law scores
+
+        Args:
+            scores (np.ndarray): Chunk similarities (for every chunk, or aligned with `indices`)
+            method (str): 'max', 'mean_top_n' or 'sum'
+            top_n (int): Number of best chunks averaged by 'mean_top_n'
+            indices (np.ndarray): Candidate chunk rows when only a subset was scored
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Per-law score (-inf for laws
+            without candidates), the best chunk row of each law (-1 if none) and
+            that chunk's similarity
+        """
+        if method not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{method}', expected one of {AGGREGATIONS}")
+
+        law_scores = np.full(self.n_laws, -np.inf, dtype=np.float32)
+        best_chunks = np.full(self.n_laws, -1, dtype=np.int64)
+        best_similarities = np.full(self.n_laws, -np.inf, dtype=np.float32)
+
+        if indices is None:
+            grouped = np.array(scores[self.order], dtype=np.float32)
+            grouped_rows = self.order
+            starts, present = self.starts, self.present
+        else:
+            indices = np.asarray(indices)
+            ids = self.chunk_law_ids[indices]
+            local = np.argsort(ids, kind='stable')
+            grouped = np.array(np.asarray(scores)[local], dtype=np.float32)
+            grouped_rows = indices[local]
+            sorted_ids = ids[local]
+            starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]) if len(sorted_ids) else np.empty(0, dtype=np.int64)
+            present = sorted_ids[starts]
+
+        if len(grouped) == 0:
+            return law_scores, best_chunks, best_similarities
+
+        best_pos = _group_argmax(grouped, starts)
+        best = grouped[best_pos]
+
+        if method == "max":
+            aggregated = best
+        elif method == "sum":
+            aggregated = np.add.reduceat(grouped, starts)
+        else:
+            # Peel off one maximum per law per round; top_n is small
+            total = best.astype(np.float64)
+            taken = np.ones(len(starts), dtype=np.int64)
+            pos = best_pos
+            for _ in range(max(top_n, 1) - 1):
+                grouped[pos] = -np.inf
+                pos = _group_argmax(grouped, starts)
+                values = grouped[pos]
+                valid = np.isfinite(values)
+                total += np.where(valid, values, 0.0)
+                taken += valid
+            aggregated = total / taken
+
+        law_scores[present] = aggregated
+        best_chunks[present] = grouped_rows[best_pos]
+        best_similarities[present] = best
+        return law_scores, best_chunks, best_similarities
+
+
+FUSIONS = ("rrf", "weighted", "none")
+
+
+def fuse_law_scores(vector_scores: np.ndarray, lexical_scores: np.ndarray, method: str = "rrf",
+                    depth: int = 100, rrf_k: int = 60, vector_weight: float = 0.7) -> np.ndarray:
+    """
+    Combine per-law vector and lexical scores
+
+    Args:
+        vector_scores (np.ndarray): Per-law cosine scores (-inf where not scored)
+        lexical_scores (np.ndarray): Per-law BM25 scores (-inf or 0 where no term matched)
+        method (str): 'rrf' (reciprocal rank fusion), 'weighted' (blend of cosine and
+            max-scaled BM25) or 'none' (vector scores only)
+        depth (int): Laws taken from each ranking for 'rrf'
+        rrf_k (int): RRF rank offset
+        vector_weight (float): Weight of the cosine score for 'weighted'
+
+    Returns:
+        np.ndarray: Fused per-law scores (-inf for laws in neither list)
+    """
+    if method not in FUSIONS:
+        raise ValueError(f"Unknown fusion '{method}', expected one of {FUSIONS}")
+    if method == "none":
+        return vector_scores
+
+    vector_hit = np.isfinite(vector_scores)
+    lexical_hit = np.isfinite(lexical_scores) & (lexical_scores > 0)
+    fused = np.full(len(vector_scores), -np.inf, dtype=np.float32)
+
+    if method == "rrf":
+        fused[vector_hit | lexical_hit] = 0.0
+        for scores, hit in ((vector_scores, vector_hit), (lexical_scores, lexical_hit)):
+            ranked = top_k_law_ids(np.where(hit, scores, -np.inf), depth)
+            fused[ranked] += 1.0 / (rrf_k + np.arange(1, len(ranked) + 1))
+        return fused
+
+    lexical_max = lexical_scores[lexical_hit].max() if lexical_hit.any() else 1.0
+    either = vector_hit | lexical_hit
+    fused[either] = (vector_weight * np.where(vector_hit, vector_scores, 0.0)[either]
+                     + (1 - vector_weight) * np.where(lexical_hit, lexical_scores / lexical_max, 0.0)[either])
+    return fused
+
+
+def top_k_law_ids(scores: np.ndarray, k: int) -> np.ndarray:
+    """Ids of the k best finite scores, best first"""
+    finite = np.flatnonzero(np.isfinite(scores))
+    order = np.argsort(-scores[finite], kind='stable')[:k]
+    return finite[order]
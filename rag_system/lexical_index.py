@@ -0,0 +1,177 @@
+"""
+Lexical Index
+BM25 inverted index over chunk text with Turkish case folding and light
+stemming, plus statute-citation parsing ("4857 sayılı", "MADDE 17")
+"""
+
+import os
+import re
+import numpy as np
+from collections import Counter
+from typing import List, Tuple
+
+from utils.turkish_text import analyze, turkish_casefold
+from rag_system.vector_index import top_k_indices
+
+_LAW_NUMBER_PATTERN = re.compile(r"\b(\d{1,5})\s+sayılı\b")
+_ARTICLE_PATTERN = re.compile(r"\b(?:madde|md\.?)\s*(\d{1,4})\b|\b(\d{1,4})\s*\.?\s*madde")
+# Words that may accompany a citation without adding any topic
+_CITATION_WORDS = {
+    "sayılı", "kanun", "kanunu", "kanunun", "kanununun", "kanunda", "kanununda",
+    "madde", "maddesi", "maddesinde", "maddesine", "md", "fıkra", "fıkrası", "bent", "bendi",
+    "kararname", "kararnamesi", "cumhurbaşkanlığı", "yönetmelik", "yönetmeliği", "tüzük", "tüzüğü",
+}
+
+
+def bm25_index_path(chunks_file: str) -> str:
+    """legal_bm25_<timestamp>.npz stored next to legal_chunks_<timestamp>.json"""
+    directory, file_name = os.path.split(chunks_file)
+    stem = os.path.splitext(file_name)[0].replace("legal_chunks_", "legal_bm25_")
+    return os.path.join(directory, stem + ".npz")
+
+
+def parse_citation(query: str) -> Tuple[List[int], List[int], bool]:
+    """
+    Extract statute references from a query
+
+    Returns:
+        Tuple[List[int], List[int], bool]: Cited law numbers, cited article numbers,
+        and whether the query is nothing but a citation (no topical words)
+    """
+    folded = turkish_casefold(query)
+    law_numbers = [int(n) for n in _LAW_NUMBER_PATTERN.findall(folded)]
+    articles = [int(a or b) for a, b in _ARTICLE_PATTERN.findall(folded)]
+
+    remainder = _ARTICLE_PATTERN.sub(" ", _LAW_NUMBER_PATTERN.sub(" ", folded))
+    topical = [w for w in re.findall(r"\w+", remainder) if w not in _CITATION_WORDS and not w.isdigit()]
+    return law_numbers, articles, bool(law_numbers) and not topical
+
+
+class BM25Index:
+    """Term -> (chunk, term frequency) posting lists scored with Okapi BM25"""
+
+    def __init__(self, vocabulary: List[str], term_offsets: np.ndarray, doc_ids: np.ndarray,
+                 term_freqs: np.ndarray, doc_lengths: np.ndarray, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the index
+
+        Args:
+            vocabulary (List[str]): Stemmed terms; position is the term id
+            term_offsets (np.ndarray): Start of each term's postings (n_terms + 1)
+            doc_ids (np.ndarray): Chunk rows of all postings, grouped by term
+            term_freqs (np.ndarray): Term frequency of each posting
+            doc_lengths (np.ndarray): Token count of every chunk
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 length normalization
+        """
+        self.vocabulary = vocabulary
+        self.term_ids = {term: i for i, term in enumerate(vocabulary)}
+        self.term_offsets = np.asarray(term_offsets, dtype=np.int64)
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self.term_freqs = np.asarray(term_freqs, dtype=np.float32)
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+        self.k1 = k1
+        self.b = b
+
+        n_docs = len(self.doc_lengths)
+        doc_freqs = np.diff(self.term_offsets)
+        self.idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = self.doc_lengths.mean() if n_docs else 1.0
+        self.length_norm = (k1 * (1 - b + b * self.doc_lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+    @classmethod
+    def build(cls, texts) -> "BM25Index":
+        """Tokenize every chunk text and build posting lists"""
+        term_ids = {}
+        postings_terms, postings_docs, postings_freqs = [], [], []
+        doc_lengths = []
+        for doc_id, text in enumerate(texts):
+            terms = analyze(text)
+            doc_lengths.append(len(terms))
+            for term, freq in Counter(terms).items():
+                postings_terms.append(term_ids.setdefault(term, len(term_ids)))
+                postings_docs.append(doc_id)
+                postings_freqs.append(freq)
+
+        postings_terms = np.array(postings_terms, dtype=np.int64)
+        order = np.argsort(postings_terms, kind='stable')
+        counts = np.bincount(postings_terms, minlength=len(term_ids))
+        return cls(
+            list(term_ids),
+            np.concatenate([[0], np.cumsum(counts)]),
+            np.array(postings_docs, dtype=np.int32)[order],
+            np.array(postings_freqs, dtype=np.float32)[order],
+            np.array(doc_lengths, dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def score(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for a query (0 for chunks sharing no term)"""
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in set(analyze(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end]
+            scores[docs] += self.idf[term_id] * freqs * (self.k1 + 1) / (freqs + self.length_norm[docs])
+        return scores
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k chunks with a positive BM25 score, best first"""
+        scores = self.score(query)
+        top = top_k_indices(scores, k)
+        top = top[scores[top] > 0]
+        return top, scores[top]
+
+    def save(self, path: str):
+        """Persist the posting lists (vocabulary as one UTF-8 blob)"""
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as f:
+            np.savez(
+                f,
+                vocabulary=np.frombuffer("\n".join(self.vocabulary).encode('utf-8'), dtype=np.uint8),
+                term_offsets=self.term_offsets,
+                doc_ids=self.doc_ids,
+                term_freqs=self.term_freqs,
+                doc_lengths=self.doc_lengths,
+                params=np.array([self.k1, self.b]),
+            )
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as data:
+            vocabulary = data['vocabulary'].tobytes().decode('utf-8')
+            k1, b = data['params'].tolist()
+            return cls(vocabulary.split("\n") if vocabulary else [], data['term_offsets'], data['doc_ids'],
+                       data['term_freqs'], data['doc_lengths'], k1=k1, b=b)
+
+
+def load_bm25_index(chunks_file: str, store) -> BM25Index:
+    """
+    Open the BM25 index for a chunks file, building it from the chunk store on first use
+
+    Args:
+        chunks_file (str): legal_chunks_<timestamp>.json the store was built from
+        store: ChunkStore (or list of chunk dicts) providing the text
+
+    Returns:
+        BM25Index: Lexical index aligned with the chunk rows
+    """
+    path = bm25_index_path(chunks_file)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(chunks_file):
+        index = BM25Index.load(path)
+        if len(index) == len(store):
+            return index
+
+    texts = (store.text(i) for i in range(len(store))) if hasattr(store, 'text') else (c.get('text', '') for c in store)
+    index = BM25Index.build(texts)
+    try:
+        index.save(path)
+    except OSError:
+        pass
+    return index
@@ -0,0 +1,169 @@
+"""
+Artifact Manifest
+Versioned JSON description of one published corpus (file names, shapes, dtypes,
+checksums) and the `latest.json` pointer loaders resolve instead of guessing
+file names
+"""
+
+import json
+import os
+import time
+import numpy as np
+from typing import Dict
+
+from rag_system.artifact_cache import file_digest
+from rag_system.index_backends import INDEX_BACKENDS
+from rag_system.snapshot import LATEST_POINTER, snapshot_file_names
+from rag_system.vector_index import index_artifact_path
+
+MANIFEST_FORMAT = 1
+SUPPORTED_COMPRESSION = ("none",)
+
+
+def manifest_file_name(version: str) -> str:
+    return f"manifest_{version}.json"
+
+
+def describe_artifact(path: str) -> Dict:
+    """Manifest entry for one file: name, size, SHA-256 and, for .npy arrays, shape and dtype"""
+    entry = {
+        'file': os.path.basename(path),
+        'bytes': os.path.getsize(path),
+        'sha256': file_digest(path, 'sha256'),
+        'compression': 'none',
+    }
+    if path.endswith('.npy'):
+        array = np.load(path, mmap_mode='r')  # header only
+        entry.update(rows=int(array.shape[0]), dims=int(array.shape[1]) if array.ndim > 1 else 1,
+                     dtype=str(array.dtype))
+    return entry
+
+
+def build_manifest(directory: str, version: str, embedding_model: str = None) -> Dict:
+    """
+    Describe every artifact of a version found in a directory
+
+    Args:
+        directory (str): Directory holding legal_embeddings_<version>.npy and friends
+        version (str): Snapshot version (the file timestamp)
+        embedding_model (str): Model the embeddings were created with
+
+    Returns:
+        Dict: Manifest with an `artifacts` map (embeddings, chunks, stats, index backends)
+    """
+    embeddings_name, chunks_name = snapshot_file_names(version)
+    embeddings_file = os.path.join(directory, embeddings_name)
+    artifacts = {
+        'embeddings': describe_artifact(embeddings_file),
+        'chunks': describe_artifact(os.path.join(directory, chunks_name)),
+    }
+    with open(os.path.join(directory, chunks_name), 'r', encoding='utf-8') as f:
+        artifacts['chunks']['rows'] = len(json.load(f))
+    if artifacts['chunks']['rows'] != artifacts['embeddings']['rows']:
+        raise ValueError(f"{chunks_name} has {artifacts['chunks']['rows']} chunks but "
+                         f"{embeddings_name} has {artifacts['embeddings']['rows']} vectors")
+
+    stats_file = os.path.join(directory, f"embedding_stats_{version}.json")
+    if os.path.exists(stats_file):
+        artifacts['stats'] = describe_artifact(stats_file)
+    for backend in INDEX_BACKENDS:
+        index_file = index_artifact_path(embeddings_file, backend)
+        if os.path.exists(index_file):
+            artifacts[backend] = describe_artifact(index_file)
+
+    return {
+        'format': MANIFEST_FORMAT,
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'embedding_model': embedding_model,
+        'artifacts': artifacts,
+    }
+
+
+def _write_json(path: str, data: Dict):
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_file, path)
+
+
+def write_manifest(directory: str, manifest: Dict, update_latest: bool = True) -> str:
+    """Write manifest_<version>.json, then point latest.json at it; returns the manifest path"""
+    manifest_file = os.path.join(directory, manifest_file_name(manifest['version']))
+    _write_json(manifest_file, manifest)
+    if update_latest:
+        _write_json(os.path.join(directory, LATEST_POINTER),
+                    {'version': manifest['version'], 'manifest': manifest_file_name(manifest['version'])})
+    return manifest_file
+
+
+def check_artifact(path: str, entry: Dict):
+    """
+    Cheap pre-swap validation of a local file against its manifest entry
+
+    Size, compression and (for .npy) shape and dtype are compared; the SHA-256
+    is checked by the artifact cache when the file is downloaded.
+
+    Raises:
+        ValueError: If the file does not match the manifest
+    """
+    if entry.get('compression', 'none') not in SUPPORTED_COMPRESSION:
+        raise ValueError(f"{entry['file']}: unsupported compression '{entry['compression']}'")
+    if os.path.getsize(path) != entry['bytes']:
+        raise ValueError(f"{entry['file']}: {os.path.getsize(path)} bytes, manifest says {entry['bytes']}")
+    if 'rows' in entry and path.endswith('.npy'):
+        array = np.load(path, mmap_mode='r')
+        actual = (int(array.shape[0]), int(array.shape[1]) if array.ndim > 1 else 1, str(array.dtype))
+        expected = (entry['rows'], entry['dims'], entry['dtype'])
+        if actual != expected:
+            raise ValueError(f"{entry['file']}: (rows, dims, dtype) {actual}, manifest says {expected}")
+
+
+def publish_snapshot(s3, bucket_name: str, directory: str, version: str, prefix: str = "embeddings/",
+                     part_size: int = 8 * 1024 * 1024, embedding_model: str = None) -> Dict:
+    """
+    Upload a version and then its manifest; latest.json is replaced last
+
+    Artifacts whose S3 copy already carries the same SHA-256 (object metadata)
+    are skipped, so republishing uploads only what changed. Uploads use
+    `part_size` parts so downloaders with the same part size can verify the
+    multipart ETag. Readers see the new version only once latest.json changes.
+
+    Args:
+        s3: boto3 S3 client
+        bucket_name (str): Target bucket
+        directory (str): Local directory holding the version's files
+        version (str): Snapshot version to publish
+        prefix (str): Key prefix
+        part_size (int): Multipart upload part size in bytes
+        embedding_model (str): Recorded in the manifest
+
+    Returns:
+        Dict: The published manifest
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    transfer_config = TransferConfig(multipart_threshold=part_size, multipart_chunksize=part_size)
+    manifest = build_manifest(directory, version, embedding_model)
+    write_manifest(directory, manifest, update_latest=False)
+
+    for entry in manifest['artifacts'].values():
+        key = prefix + entry['file']
+        try:
+            existing = s3.head_object(Bucket=bucket_name, Key=key).get('Metadata', {})
+        except Exception:
+            existing = {}
+        if existing.get('sha256') == entry['sha256']:
+            print(f"⏭️ {entry['file']} unchanged, skipped")
+            continue
+        print(f"📤 Uploading {entry['file']} ({entry['bytes'] / 1024 / 1024:.1f} MB)...")
+        s3.upload_file(os.path.join(directory, entry['file']), bucket_name, key,
+                       ExtraArgs={'Metadata': {'sha256': entry['sha256']}}, Config=transfer_config)
+
+    manifest_name = manifest_file_name(version)
+    s3.upload_file(os.path.join(directory, manifest_name), bucket_name, prefix + manifest_name)
+    pointer = {'version': version, 'manifest': manifest_name}
+    s3.put_object(Bucket=bucket_name, Key=prefix + LATEST_POINTER, Body=json.dumps(pointer).encode('utf-8'),
+                  ContentType='application/json')
+    print(f"✅ Published {version}: s3://{bucket_name}/{prefix}{LATEST_POINTER}")
+    return manifest
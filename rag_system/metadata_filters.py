@@ -0,0 +1,181 @@
+"""
+Metadata Filters
+Precomputed chunk masks per law_type and a date-sorted row partition for
+gazette-date ranges, combined before any scoring happens
+"""
+
+import threading
+import numpy as np
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+from utils.turkish_text import turkish_casefold
+
+DateLike = Union[str, int, date, None]
+MASK_CACHE_SIZE = 64
+GAZETTE_DATE_FORMATS = ("%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d")
+
+
+def parse_gazette_date(value) -> Optional[date]:
+    """Parse 'dd.mm.yyyy' / 'dd/mm/yyyy' (both occur in the dataset); None if missing or malformed"""
+    text = str(value).strip()
+    for date_format in GAZETTE_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _bound(value: DateLike, end: bool) -> Optional[int]:
+    """Filter bound as a date ordinal; a bare year covers the whole year"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.toordinal()
+    text = str(value).strip()
+    if text.isdigit() and len(text) == 4:
+        return date(int(text), 12, 31).toordinal() if end else date(int(text), 1, 1).toordinal()
+    parsed = parse_gazette_date(text)
+    if parsed is None:
+        raise ValueError(f"Unrecognized date '{value}', expected dd.mm.yyyy, yyyy-mm-dd or a year")
+    return parsed.toordinal()
+
+
+def _law_type_list(law_types) -> Optional[List[str]]:
+    """law_types as a list of non-empty strings; None if unset"""
+    if law_types is None or law_types == "" or law_types == []:
+        return None
+    if isinstance(law_types, str):
+        law_types = [law_types]
+    if not isinstance(law_types, (list, tuple, set)) or not all(isinstance(t, str) and t.strip() for t in law_types):
+        raise ValueError("law_types must be a law type name or a list of law type names")
+    return [t.strip() for t in law_types]
+
+
+def normalize_filters(law_types=None, date_from: DateLike = None, date_to: DateLike = None) -> Dict:
+    """
+    Validate search filters from untrusted input (e.g. a request body)
+
+    Args:
+        law_types: One law type or a list of law types
+        date_from: Earliest gazette date ('dd.mm.yyyy', 'yyyy-mm-dd' or a year)
+        date_to: Latest gazette date
+
+    Returns:
+        Dict: The filters that are set, as search_laws keyword arguments
+
+    Raises:
+        ValueError: A filter has the wrong type, a date is malformed or the range is empty
+    """
+    filters = {}
+    law_type_list = _law_type_list(law_types)
+    if law_type_list:
+        filters['law_types'] = law_type_list
+    for name, value, end in (('date_from', date_from, False), ('date_to', date_to, True)):
+        if value is None or value == "":
+            continue
+        if not isinstance(value, (str, int, date)) or isinstance(value, bool):
+            raise ValueError(f"{name} must be a date string or a year")
+        _bound(value, end=end)
+        filters[name] = value.strip() if isinstance(value, str) else value
+    start = _bound(filters.get('date_from'), end=False)
+    end = _bound(filters.get('date_to'), end=True)
+    if start is not None and end is not None and start > end:
+        raise ValueError("date_from is later than date_to")
+    return filters
+
+
+class MetadataFilterIndex:
+    """Boolean chunk masks for law_type and gazette-date filters"""
+
+    def __init__(self, store):
+        """
+        Build the masks from a ChunkStore's law table
+
+        Args:
+            store: ChunkStore with `laws` and `chunk_law_ids`
+        """
+        self.n_chunks = len(store)
+        law_ids = store.chunk_law_ids
+
+        # One mask per law type (keyed case-insensitively)
+        law_types = [turkish_casefold(str(law.get('law_type', ''))) for law in store.laws]
+        self.law_type_names = {}
+        self.law_type_masks = {}
+        for law_type, raw in zip(law_types, (law.get('law_type', '') for law in store.laws)):
+            self.law_type_names.setdefault(law_type, raw)
+        type_ids = {law_type: i for i, law_type in enumerate(self.law_type_names)}
+        chunk_types = np.array([type_ids[t] for t in law_types], dtype=np.int32)[law_ids] if law_types else np.empty(0, dtype=np.int32)
+        for law_type, type_id in type_ids.items():
+            self.law_type_masks[law_type] = chunk_types == type_id
+
+        # Chunk rows sorted by gazette date: any date range is one contiguous slice
+        ordinals = np.array([
+            (parse_gazette_date(law.get('gazette_date')) or date.min).toordinal() for law in store.laws
+        ], dtype=np.int64)
+        chunk_dates = ordinals[law_ids] if len(ordinals) else np.empty(0, dtype=np.int64)
+        self.date_order = np.argsort(chunk_dates, kind='stable')
+        self.sorted_dates = chunk_dates[self.date_order]
+        self.undated = date.min.toordinal()
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def law_types(self):
+        """Law type names as they appear in the data"""
+        return list(self.law_type_names.values())
+
+    def mask(self, law_types: Union[str, Iterable[str], None] = None,
+             date_from: DateLike = None, date_to: DateLike = None) -> Optional[np.ndarray]:
+        """
+        Combined chunk mask for the given filters
+
+        Args:
+            law_types: One law type or several (matched case-insensitively); None = all
+            date_from: Earliest gazette date ('dd.mm.yyyy', 'yyyy-mm-dd', a year or a date)
+            date_to: Latest gazette date (a bare year includes the whole year)
+
+        Returns:
+            Optional[np.ndarray]: Boolean mask over chunk rows, or None when no filter is set
+        """
+        law_types = _law_type_list(law_types)
+        type_key = tuple(sorted(turkish_casefold(t) for t in law_types)) if law_types else None
+        start, end = _bound(date_from, end=False), _bound(date_to, end=True)
+        if type_key is None and start is None and end is None:
+            return None
+
+        key = (type_key, start, end)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        if type_key is None:
+            mask = np.ones(self.n_chunks, dtype=bool)
+        else:
+            mask = np.zeros(self.n_chunks, dtype=bool)
+            for law_type in type_key:
+                if law_type in self.law_type_masks:
+                    mask |= self.law_type_masks[law_type]
+
+        if start is not None or end is not None:
+            # Undated chunks never match a date filter
+            low = np.searchsorted(self.sorted_dates, max(start or 0, self.undated + 1), 'left')
+            high = np.searchsorted(self.sorted_dates, end, 'right') if end is not None else self.n_chunks
+            in_range = np.zeros(self.n_chunks, dtype=bool)
+            in_range[self.date_order[low:high]] = True
+            mask &= in_range
+
+        mask.flags.writeable = False
+        with self._cache_lock:
+            self._cache[key] = mask
+            self._cache.move_to_end(key)
+            while len(self._cache) > MASK_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return mask
@@ -0,0 +1,293 @@
+"""
+Quantized Index
+Compressed chunk-vector storage (scalar int8, product quantization or a
+truncated Matryoshka prefix) searched for candidates and re-ranked with exact
+float vectors
+"""
+
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+from rag_system.vector_index import top_k_indices
+
+SCORE_BLOCK_SIZE = 16384
+
+
+class _QuantizedIndex(ABC):
+    """Shared ADC candidate scan + exact re-rank of the best candidates"""
+
+    exhaustive = False
+
+    def __init__(self, rerank_vectors: np.ndarray = None, rerank: int = 200):
+        """
+        Args:
+            rerank_vectors (np.ndarray): Full-precision chunk vectors (may be memory-mapped
+                and unnormalized); only the re-ranked rows are read
+            rerank (int): Number of ADC candidates re-scored exactly
+        """
+        self.rerank_vectors = rerank_vectors
+        self.rerank = rerank
+        self.metadata = {}
+
+    @abstractmethod
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate similarity of every chunk to a normalized query, computed from the codes"""
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the k most similar chunks
+
+        Args:
+            query (np.ndarray): Normalized float32 query vector
+            k (int): Number of chunks to return
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Chunk indices and their similarities, best first
+        """
+        approximate = self.approximate_scores(query)
+        candidates = top_k_indices(approximate, max(k, self.rerank))
+        if self.rerank_vectors is None:
+            candidates = candidates[:k]
+            return candidates, approximate[candidates]
+
+        # Sorted row order keeps reads from a memory-mapped file sequential
+        candidates = np.sort(candidates)
+        rows = np.asarray(self.rerank_vectors[candidates], dtype=np.float32)
+        norms = np.linalg.norm(rows, axis=1)
+        norms[norms == 0] = 1.0
+        exact = (rows @ query) / norms
+        top = top_k_indices(exact, k)
+        return candidates[top], exact[top]
+
+    @property
+    def code_bytes(self) -> int:
+        return self.codes.nbytes
+
+
+class ScalarQuantizedIndex(_QuantizedIndex):
+    """Symmetric int8 codes with one scale per dimension"""
+
+    backend = "sq8"
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray,
+                 rerank_vectors: np.ndarray = None, rerank: int = 200):
+        super().__init__(rerank_vectors, rerank)
+        self.codes = codes
+        self.scales = np.asarray(scales, dtype=np.float32)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, rerank_vectors: np.ndarray = None, rerank: int = 200) -> "ScalarQuantizedIndex":
+        """Quantize normalized float32 vectors to int8"""
+        scales = np.abs(vectors).max(axis=0).astype(np.float32) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for start in range(0, len(vectors), SCORE_BLOCK_SIZE):
+            block = vectors[start:start + SCORE_BLOCK_SIZE] / scales
+            codes[start:start + len(block)] = np.clip(np.rint(block), -127, 127)
+        return cls(codes, scales, rerank_vectors, rerank)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def dims(self) -> int:
+        return self.codes.shape[1]
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """q . (codes * scales) computed as codes . (q * scales), block by block"""
+        scaled_query = query * self.scales
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_SIZE):
+            block = self.codes[start:start + SCORE_BLOCK_SIZE]
+            scores[start:start + len(block)] = block.astype(np.float32) @ scaled_query
+        return scores
+
+    def save(self, path: str, **metadata):
+        np.savez(path, codes=self.codes, scales=self.scales,
+                 **{key: np.asarray(value) for key, value in metadata.items()})
+
+    @classmethod
+    def load(cls, path: str, rerank_vectors: np.ndarray = None, rerank: int = 200) -> "ScalarQuantizedIndex":
+        with np.load(path) as data:
+            index = cls(data['codes'], data['scales'], rerank_vectors, rerank)
+            index.metadata = {key: data[key].item() for key in data.files if key not in ('codes', 'scales')}
+        _check_rows(index, rerank_vectors)
+        return index
+
+
+def _kmeans(data: np.ndarray, n_clusters: int, n_iter: int, rng) -> np.ndarray:
+    """Euclidean k-means for one PQ subspace"""
+    n_clusters = min(n_clusters, len(data))
+    centroids = data[rng.choice(len(data), size=n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = _assign_codes(data, centroids)
+        counts = np.bincount(assignments, minlength=n_clusters)
+
+        # Sum members per cluster with one sort + reduceat
+        order = np.argsort(assignments, kind='stable')
+        sorted_assignments = assignments[order]
+        starts = np.flatnonzero(np.r_[True, sorted_assignments[1:] != sorted_assignments[:-1]])
+        filled = sorted_assignments[starts]
+        centroids[filled] = np.add.reduceat(data[order], starts, axis=0) / counts[filled, None]
+
+        # Re-seed empty clusters with random points
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = data[rng.choice(len(data), size=len(empty), replace=False)]
+    return centroids
+
+
+def _assign_codes(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid: argmax of x.c - |c|^2 / 2"""
+    half_norms = 0.5 * np.einsum('ij,ij->i', centroids, centroids)
+    assignments = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), SCORE_BLOCK_SIZE):
+        block = data[start:start + SCORE_BLOCK_SIZE]
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T - half_norms, axis=1)
+    return assignments
+
+
+class ProductQuantizedIndex(_QuantizedIndex):
+    """m sub-vector codebooks of 256 centroids each; one uint8 code per subspace"""
+
+    backend = "pq"
+
+    def __init__(self, codebooks: np.ndarray, codes: np.ndarray,
+                 rerank_vectors: np.ndarray = None, rerank: int = 200):
+        super().__init__(rerank_vectors, rerank)
+        self.codebooks = np.asarray(codebooks, dtype=np.float32)  # (m, 256, dims / m)
+        self.codes = codes                                        # (n, m) uint8
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, m: int = 96, n_iter: int = 15, sample_size: int = 20000,
+              rerank_vectors: np.ndarray = None, rerank: int = 200, seed: int = 0) -> "ProductQuantizedIndex":
+        """
+        Train per-subspace codebooks and encode every vector
+
+        Args:
+            vectors (np.ndarray): Normalized float32 chunk vectors
+            m (int): Number of subspaces (must divide the dimension)
+            n_iter (int): k-means iterations per subspace
+            sample_size (int): Maximum number of training rows
+            seed (int): Random seed
+        """
+        n, dims = vectors.shape
+        if dims % m:
+            raise ValueError(f"PQ subspaces ({m}) must divide the embedding dimension ({dims})")
+        sub_dims = dims // m
+
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+        sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+
+        codebooks = np.zeros((m, 256, sub_dims), dtype=np.float32)
+        codes = np.empty((n, m), dtype=np.uint8)
+        for j in range(m):
+            columns = slice(j * sub_dims, (j + 1) * sub_dims)
+            centroids = _kmeans(sample[:, columns], 256, n_iter, rng)
+            codebooks[j, :len(centroids)] = centroids
+            codes[:, j] = _assign_codes(np.asarray(vectors[:, columns], dtype=np.float32), centroids)
+        return cls(codebooks, codes, rerank_vectors, rerank)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def dims(self) -> int:
+        return self.codebooks.shape[0] * self.codebooks.shape[2]
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Sum of per-subspace lookup-table entries (asymmetric distance computation)"""
+        m, n_centroids, sub_dims = self.codebooks.shape
+        lookup = np.einsum('jcd,jd->jc', self.codebooks, query.reshape(m, sub_dims)).ravel()
+        offsets = np.arange(m, dtype=np.int64) * n_centroids
+
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_SIZE):
+            block = self.codes[start:start + SCORE_BLOCK_SIZE]
+            scores[start:start + len(block)] = lookup[block + offsets].sum(axis=1)
+        return scores
+
+    def save(self, path: str, **metadata):
+        np.savez(path, codebooks=self.codebooks, codes=self.codes,
+                 **{key: np.asarray(value) for key, value in metadata.items()})
+
+    @classmethod
+    def load(cls, path: str, rerank_vectors: np.ndarray = None, rerank: int = 200) -> "ProductQuantizedIndex":
+        with np.load(path) as data:
+            index = cls(data['codebooks'], data['codes'], rerank_vectors, rerank)
+            index.metadata = {key: data[key].item() for key in data.files if key not in ('codebooks', 'codes')}
+        _check_rows(index, rerank_vectors)
+        return index
+
+
+class MatryoshkaIndex(_QuantizedIndex):
+    """
+    Normalized prefix of every embedding (text-embedding-3 vectors are trained so
+    their leading dimensions stand on their own); candidates from the prefix scan
+    are re-ranked with the full vectors
+    """
+
+    backend = "mrl"
+
+    def __init__(self, prefix: np.ndarray, rerank_vectors: np.ndarray = None, rerank: int = 200):
+        super().__init__(rerank_vectors, rerank)
+        self.prefix = np.ascontiguousarray(prefix, dtype=np.float32)  # (n, prefix_dims)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, prefix_dims: int = 256,
+              rerank_vectors: np.ndarray = None, rerank: int = 200) -> "MatryoshkaIndex":
+        """
+        Cut and re-normalize the leading dimensions of every vector
+
+        Args:
+            vectors (np.ndarray): Chunk vectors (raw or normalized, may be memory-mapped)
+            prefix_dims (int): Leading dimensions kept resident
+        """
+        n, dims = vectors.shape
+        if not 0 < prefix_dims <= dims:
+            raise ValueError(f"Prefix of {prefix_dims} dims does not fit {dims}-dim embeddings")
+        prefix = np.empty((n, prefix_dims), dtype=np.float32)
+        for start in range(0, n, SCORE_BLOCK_SIZE):
+            block = np.asarray(vectors[start:start + SCORE_BLOCK_SIZE, :prefix_dims], dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            prefix[start:start + len(block)] = block / norms
+        return cls(prefix, rerank_vectors, rerank)
+
+    def __len__(self) -> int:
+        return len(self.prefix)
+
+    @property
+    def dims(self) -> int:
+        return self.rerank_vectors.shape[1] if self.rerank_vectors is not None else self.prefix_dims
+
+    @property
+    def prefix_dims(self) -> int:
+        return self.prefix.shape[1]
+
+    @property
+    def code_bytes(self) -> int:
+        return self.prefix.nbytes
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity between the query prefix and every chunk prefix"""
+        query = query[:self.prefix_dims]
+        return self.prefix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+
+    def save(self, path: str, **metadata):
+        np.savez(path, prefix=self.prefix, **{key: np.asarray(value) for key, value in metadata.items()})
+
+    @classmethod
+    def load(cls, path: str, rerank_vectors: np.ndarray = None, rerank: int = 200) -> "MatryoshkaIndex":
+        with np.load(path) as data:
+            index = cls(data['prefix'], rerank_vectors, rerank)
+            index.metadata = {key: data[key].item() for key in data.files if key != 'prefix'}
+        _check_rows(index, rerank_vectors)
+        return index
+
+
+def _check_rows(index, rerank_vectors):
+    if rerank_vectors is not None and len(index) != len(rerank_vectors):
+        raise ValueError(f"{index.backend} index covers {len(index)} chunks but {len(rerank_vectors)} embeddings are loaded")
@@ -2,6 +2,10 @@
 """
 Legal RAG Query System
 Interactive query interface for searching Turkish legal documents
+
+The search backend is RAG_INDEX_BACKEND: 'exact', the approximate 'ivf' / 'hnsw'
+graphs, or the compressed 'sq8' / 'pq' / 'mrl' (Matryoshka prefix) indexes with
+exact re-rank; see rag_system/index_backends.py
 """
 
 import numpy as np
@@ -10,15 +14,30 @@ import json
 import pickle
 import openai
 import os
+import sys
 from typing import List, Dict, Tuple
 import glob
-from sklearn.metrics.pairwise import cosine_similarity
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag_system.vector_index import normalize_query, open_normalized_store
+from rag_system.chunk_store import load_chunk_store
+from rag_system.index_backends import load_search_index, uses_quantized_storage
 
 class LegalRAGQuerySystem:
-    def __init__(self):
-        """Initialize the query system with latest embeddings"""
+    def __init__(self, index_backend: str = None):
+        """
+        Initialize the query system with latest embeddings
+        
+        Args:
+            index_backend (str): One of INDEX_BACKENDS - 'exact', 'ivf', 'hnsw', 'sq8', 'pq' or 'mrl'
+                (default: Config.RAG_INDEX_BACKEND)
+        """
         self.chunks = None
         self.embeddings = None
+        self.index = None
+        self.index_backend = index_backend
         self.chunk_metadata = None
         self.load_latest_embeddings()
         
@@ -40,14 +59,19 @@ class LegalRAGQuerySystem:
         print(f"📂 Loading embeddings from: {latest_embedding_file}")
         print(f"📂 Loading chunks from: {latest_chunk_file}")
         
-        # Load embeddings
-        self.embeddings = np.load(latest_embedding_file)
+        # Map the normalized float32 copy of the embeddings for inner-product search;
+        # quantized backends only memory-map them for re-ranking
+        if uses_quantized_storage(self.index_backend):
+            self.embeddings = np.load(latest_embedding_file, mmap_mode='r')
+            self.index = load_search_index(self.embeddings, latest_embedding_file, self.index_backend, normalized=False)
+        else:
+            self.embeddings = open_normalized_store(latest_embedding_file)
+            self.index = load_search_index(self.embeddings, latest_embedding_file, self.index_backend)
         
         # Load chunks
-        with open(latest_chunk_file, 'r', encoding='utf-8') as f:
-            self.chunks = json.load(f)
+        self.chunks = load_chunk_store(latest_chunk_file)
         
-        print(f"✅ Loaded {len(self.chunks)} chunks with {self.embeddings.shape[1]}-dimensional embeddings")
+        print(f"✅ Loaded {len(self.chunks)} chunks with {self.embeddings.shape[1]}-dimensional embeddings ({self.index.backend} search)")
         
     def get_query_embedding(self, query: str) -> np.ndarray:
         """Generate embedding for user query"""
@@ -70,17 +94,12 @@ class LegalRAGQuerySystem:
         if query_embedding is None:
             return []
         
-        # Calculate similarities
-        query_embedding = query_embedding.reshape(1, -1)
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
-        
         # Get top-k most similar chunks
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        top_indices, top_scores = self.index.search(normalize_query(query_embedding), top_k)
         
         results = []
-        for i, idx in enumerate(top_indices):
+        for i, (idx, similarity) in enumerate(zip(top_indices, top_scores)):
             chunk = self.chunks[idx]
-            similarity = similarities[idx]
             
             result = {
                 'rank': i + 1,
@@ -3,26 +3,29 @@ RAG System Integration
 Loads embeddings and performs semantic search to find top 10 relevant laws
 """
 
+import asyncio
 import numpy as np
 import json
-import glob
-from openai import OpenAI
-from typing import List, Dict, Optional
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, AsyncOpenAI
+from typing import List, Dict, Optional, Set, Union
 import logging
 from config.config import Config
+from rag_system.vector_index import index_artifact_path, normalize_embeddings, top_k_indices
+from rag_system.law_aggregation import fuse_law_scores
+from rag_system.lexical_index import parse_citation
+from rag_system.snapshot import LATEST_POINTER, IndexSnapshot, find_local_snapshot, snapshot_file_names, snapshot_version
+from rag_system.embedding_cache import EmbeddingCache
+from rag_system.artifact_cache import S3ArtifactCache
+from rag_system.manifest import check_artifact, manifest_file_name
 
-# Import sklearn with fallback
-try:
-    from sklearn.metrics.pairwise import cosine_similarity
-    SKLEARN_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ scikit-learn not available: {e}")
-    SKLEARN_AVAILABLE = False
-    # Simple cosine similarity fallback
-    def cosine_similarity(a, b):
-        """Simple cosine similarity fallback"""
-        import numpy as np
-        return np.dot(a, b.T) / (np.linalg.norm(a) * np.linalg.norm(b, axis=1))
+# Queries scored per matrix product (bounds the query x chunk score matrix)
+SCORE_BATCH_SIZE = 64
+# S3 key prefix of published snapshots
+S3_EMBEDDINGS_PREFIX = "embeddings/"
 
 class RAGSystem:
     def __init__(self, api_key: str = None):
@@ -39,44 +42,159 @@ class RAGSystem:
                 timeout=30.0,
                 max_retries=2
             )
+            # Used by search_laws_async (AsyncLegalAISystem)
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                timeout=30.0,
+                max_retries=2
+            )
         except Exception as e:
             self.logger.error(f"OpenAI client creation failed: {e}")
             # Don't raise in RAG system, just disable embeddings
             self.client = None
+            self.async_client = None
+        
+        # Query embeddings seen before skip the API round-trip
+        self.embedding_cache = EmbeddingCache(Config.EMBEDDING_CACHE_DB, Config.EMBEDDING_CACHE_SIZE)
         
-        self.chunks = None
-        self.embeddings = None
+        # Current corpus version; replaced as a whole by reload(), never mutated
+        self.snapshot = None
+        self._reload_lock = threading.Lock()
         
         # Load embeddings and chunks
         self.load_embeddings()
+        
+        # Optionally poll for newly published snapshots
+        if Config.RAG_SNAPSHOT_POLL_SECONDS > 0:
+            threading.Thread(target=self._watch_snapshots, name="rag-snapshot-watch", daemon=True).start()
+    
+    @property
+    def chunks(self):
+        return self.snapshot.chunks if self.snapshot is not None else None
+    
+    @property
+    def embeddings(self):
+        return self.snapshot.embeddings if self.snapshot is not None else None
+    
+    @property
+    def index(self):
+        return self.snapshot.index if self.snapshot is not None else None
     
-    def load_embeddings(self):
-        """Load embeddings from local files or cloud storage"""
+    @property
+    def version(self) -> Optional[str]:
+        return self.snapshot.version if self.snapshot is not None else None
+    
+    def load_embeddings(self) -> bool:
+        """
+        Load the newest snapshot from cloud storage or local files and swap it in
+        
+        Does nothing if that version is already loaded. On failure the current
+        snapshot stays in place (demo mode if there is none). In production,
+        local files are only a fallback for the initial load: a reload whose
+        cloud fetch fails keeps the current snapshot rather than swapping in an
+        older one left on disk.
+        
+        Returns:
+            bool: True if a new snapshot was swapped in
+        """
         try:
+            snapshot = None
             # Try cloud storage first (for production)
-            if Config.IS_PRODUCTION and self._try_load_from_cloud():
-                return
+            if Config.IS_PRODUCTION:
+                snapshot = self._try_load_from_cloud()
+                if snapshot is None and self.snapshot is not None:
+                    self.logger.warning(f"⚠️ Cloud snapshot unavailable - keeping {self.version}")
+                    return False
             
-            # Fall back to local files (for development)
-            if self._try_load_from_local():
-                return
-                
-            # If both fail, use demo mode
-            self.logger.warning("🚧 No embeddings found - running in demo mode")
-            self.chunks = []
-            self.embeddings = None
+            # Fall back to local files (for development, or a first load without cloud access)
+            if snapshot is None:
+                snapshot = self._try_load_from_local()
+            
+            if snapshot is None:
+                if self.snapshot is None:
+                    self.logger.warning("🚧 No embeddings found - running in demo mode")
+                return False
+            if snapshot is self.snapshot:
+                return False
+            
+            # Single reference assignment: searches already running keep the old snapshot
+            previous, self.snapshot = self.version, snapshot
+            self.logger.info(f"🔄 Serving snapshot {snapshot.version} (previous: {previous or 'none'})")
+            return True
             
         except Exception as e:
-            self.logger.warning(f"🚧 Error loading embeddings: {str(e)} - using demo mode")
-            self.chunks = []
-            self.embeddings = None
+            self.logger.warning(f"🚧 Error loading embeddings: {str(e)}"
+                                + (" - using demo mode" if self.snapshot is None else f" - keeping {self.version}"))
+            return False
+    
+    def reload(self, wait: bool = False) -> bool:
+        """
+        Load the newest snapshot and swap it in without interrupting searches
+        
+        Args:
+            wait (bool): Block until done instead of loading in a background thread
+            
+        Returns:
+            bool: False if a reload is already running
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        
+        def run():
+            try:
+                self.load_embeddings()
+            finally:
+                self._reload_lock.release()
+        
+        if wait:
+            run()
+        else:
+            threading.Thread(target=run, name="rag-snapshot-reload", daemon=True).start()
+        return True
+    
+    def _watch_snapshots(self):
+        """Poll for a newer snapshot every RAG_SNAPSHOT_POLL_SECONDS (each worker swaps on its own)"""
+        while True:
+            time.sleep(Config.RAG_SNAPSHOT_POLL_SECONDS)
+            self.reload(wait=True)
     
-    def _try_load_from_cloud(self):
-        """Try to load embeddings from S3"""
+    def _load_snapshot(self, embeddings_file: str, chunks_file: str) -> IndexSnapshot:
+        """Reuse the current snapshot if it is this version, otherwise build a new one"""
+        if self.snapshot is not None and snapshot_version(embeddings_file) == self.version:
+            return self.snapshot
+        return IndexSnapshot.load(embeddings_file, chunks_file)
+    
+    def _cloud_versions(self, s3, bucket_name: str) -> Set[str]:
+        """Versions with both embeddings and chunks published under S3_EMBEDDINGS_PREFIX"""
+        keys = set()
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, Prefix=S3_EMBEDDINGS_PREFIX):
+            keys.update(item['Key'] for item in page.get('Contents', []))
+        versions = {snapshot_version(key) for key in keys} - {None}
+        return {version for version in versions
+                if S3_EMBEDDINGS_PREFIX + snapshot_file_names(version)[1] in keys}
+    
+    def _cloud_latest_version(self, s3, bucket_name: str) -> Optional[str]:
+        """Version named by the published latest.json (newest listed version for buckets without one)"""
+        try:
+            response = s3.get_object(Bucket=bucket_name, Key=S3_EMBEDDINGS_PREFIX + LATEST_POINTER)
+            return json.loads(response['Body'].read())['version']
+        except s3.exceptions.NoSuchKey:
+            versions = self._cloud_versions(s3, bucket_name)
+            return max(versions) if versions else None
+    
+    def _fetch_manifest(self, cache: S3ArtifactCache, version: str) -> Optional[Dict]:
+        """The version's manifest, or None for versions published without one"""
+        try:
+            with open(cache.fetch(S3_EMBEDDINGS_PREFIX + manifest_file_name(version)), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.info(f"No manifest for {version} ({str(e)}), artifacts are not validated")
+            return None
+    
+    def _try_load_from_cloud(self) -> Optional[IndexSnapshot]:
+        """Try to load the latest (or pinned) snapshot from S3, resolved through latest.json"""
         try:
             import boto3
-            import tempfile
-            import os
             
             bucket_name = os.getenv('S3_EMBEDDINGS_BUCKET', 'mevzuat-ai-embeddings')
             
@@ -86,151 +204,404 @@ class RAGSystem:
                 region_name=os.getenv('AWS_REGION', 'us-east-1')
             )
             
-            # Download to temp files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                embeddings_file = os.path.join(temp_dir, 'embeddings.npy')
-                chunks_file = os.path.join(temp_dir, 'chunks.json')
-                
-                # Download embeddings
-                s3.download_file(bucket_name, 'embeddings/legal_embeddings_20250730_005323.npy', embeddings_file)
-                s3.download_file(bucket_name, 'embeddings/legal_chunks_20250730_005323.json', chunks_file)
-                
-                # Load into memory
-                self.embeddings = np.load(embeddings_file)
-                with open(chunks_file, 'r', encoding='utf-8') as f:
-                    self.chunks = json.load(f)
-                
-                self.logger.info(f"✅ Loaded {len(self.chunks)} chunks from S3")
-                return True
-                
-        except Exception as e:
-            self.logger.info(f"Could not load from cloud: {str(e)}")
-            return False
-    
-    def _try_load_from_local(self):
-        """Try to load embeddings from local files"""
-        try:
-            embeddings_dir = Config.RAG_EMBEDDINGS_DIR
+            version = Config.RAG_SNAPSHOT_VERSION or self._cloud_latest_version(s3, bucket_name)
+            if not version:
+                self.logger.info(f"No snapshots under s3://{bucket_name}/{S3_EMBEDDINGS_PREFIX}")
+                return None
+            if version == self.version:
+                return self.snapshot
             
-            search_paths = [
-                f"{embeddings_dir}/legal_embeddings_*.npy",
-                "../rag_system/embeddings_output/legal_embeddings_*.npy",
-                "rag_system/embeddings_output/legal_embeddings_*.npy"
-            ]
+            # Persistent cache validated by ETag: restarts and other workers map the same files
+            cache = S3ArtifactCache(s3, bucket_name, Config.RAG_ARTIFACT_CACHE_DIR,
+                                    part_size=Config.RAG_DOWNLOAD_PART_SIZE_MB * 1024 * 1024,
+                                    concurrency=Config.RAG_DOWNLOAD_CONCURRENCY)
+            manifest = self._fetch_manifest(cache, version)
+            artifacts = manifest['artifacts'] if manifest else {}
+            embeddings_name, chunks_name = snapshot_file_names(version)
             
-            embedding_files = []
-            chunk_files = []
+            def fetch(name: str, file_name: str) -> str:
+                entry = artifacts.get(name, {})
+                return cache.fetch(S3_EMBEDDINGS_PREFIX + entry.get('file', file_name), sha256=entry.get('sha256'))
             
-            for path in search_paths:
-                embedding_files.extend(glob.glob(path))
-                chunk_path = path.replace("legal_embeddings_", "legal_chunks_").replace(".npy", ".json")
-                chunk_files.extend(glob.glob(chunk_path))
+            # Both artifacts (and the optional ANN index next to them) download concurrently
+            backend = Config.RAG_INDEX_BACKEND
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                embeddings_future = pool.submit(fetch, 'embeddings', embeddings_name)
+                chunks_future = pool.submit(fetch, 'chunks', chunks_name)
+                index_future = None
+                if backend != "exact" and (manifest is None or backend in artifacts):
+                    index_name = os.path.basename(index_artifact_path(embeddings_name, backend))
+                    index_future = pool.submit(fetch, backend, index_name)
+                embeddings_file = embeddings_future.result()
+                chunks_file = chunks_future.result()
             
-            if not embedding_files or not chunk_files:
-                return False
+            if index_future is not None:
+                try:
+                    index_future.result()
+                except Exception as e:
+                    self.logger.info(f"No {backend} index in S3: {str(e)}")
             
-            # Get the latest files
-            latest_embedding_file = sorted(embedding_files)[-1]
-            latest_chunk_file = sorted(chunk_files)[-1]
+            # Validate against the manifest before anything is swapped in
+            for name, path in (('embeddings', embeddings_file), ('chunks', chunks_file)):
+                if name in artifacts:
+                    check_artifact(path, artifacts[name])
             
-            # Load embeddings
-            self.embeddings = np.load(latest_embedding_file)
+            snapshot = self._load_snapshot(embeddings_file, chunks_file)
+            self.logger.info(f"✅ Loaded {len(snapshot.chunks)} chunks from S3 ({version})")
+            return snapshot
+            
+        except Exception as e:
+            self.logger.info(f"Could not load from cloud: {str(e)}")
+            return None
+    
+    def _try_load_from_local(self) -> Optional[IndexSnapshot]:
+        """Try to load the newest (or pinned) snapshot from local files"""
+        try:
+            search_dirs = [
+                Config.RAG_EMBEDDINGS_DIR,
+                "../rag_system/embeddings_output",
+                "rag_system/embeddings_output"
+            ]
             
-            # Load chunks
-            with open(latest_chunk_file, 'r', encoding='utf-8') as f:
-                self.chunks = json.load(f)
+            files = find_local_snapshot(search_dirs, Config.RAG_SNAPSHOT_VERSION or None)
+            if files is None:
+                return None
             
-            self.logger.info(f"✅ Loaded {len(self.chunks)} chunks from local files")
-            return True
+            # Chunks are read through the columnar store, converted from the JSON on first use
+            snapshot = self._load_snapshot(*files)
+            self.logger.info(f"✅ Loaded {len(snapshot.chunks)} chunks from local files ({snapshot.version})")
+            return snapshot
             
         except Exception as e:
             self.logger.info(f"Could not load from local: {str(e)}")
-            return False
+            return None
     
     def get_query_embedding(self, query: str) -> Optional[np.ndarray]:
-        """Generate embedding for the search query"""
+        """Generate embedding for the search query (cached as float32)"""
+        return self.get_query_embeddings([query])[0]
+    
+    def get_query_embeddings(self, queries: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Embed several queries with one API request (cached queries are not re-sent)
+        
+        Args:
+            queries (List[str]): Search queries
+            
+        Returns:
+            List[Optional[np.ndarray]]: float32 embedding per query (None on failure)
+        """
+        embeddings, missing, unique_queries = self._cached_embeddings(queries)
+        if not missing:
+            return embeddings
+        
         try:
             if self.client is None:
                 self.logger.error("OpenAI client not available")
-                return None
-                
+                return embeddings
+            
             response = self.client.embeddings.create(
-                model="text-embedding-3-small",
-                input=query
+                model=Config.EMBEDDING_MODEL,
+                input=unique_queries
             )
-            return np.array(response.data[0].embedding)
+            self._store_embeddings(queries, embeddings, missing, unique_queries, response)
         except Exception as e:
-            self.logger.error(f"Error generating query embedding: {str(e)}")
-            return None
+            self.logger.error(f"Error generating query embeddings: {str(e)}")
+        return embeddings
     
-    def search_laws(self, query: str, top_k: int = 10) -> List[Dict]:
+    async def get_query_embeddings_async(self, queries: List[str]) -> List[Optional[np.ndarray]]:
+        """Async variant of get_query_embeddings (AsyncOpenAI client, same cache)"""
+        embeddings, missing, unique_queries = self._cached_embeddings(queries)
+        if not missing:
+            return embeddings
+        
+        try:
+            if self.async_client is None:
+                self.logger.error("OpenAI client not available")
+                return embeddings
+            
+            response = await self.async_client.embeddings.create(
+                model=Config.EMBEDDING_MODEL,
+                input=unique_queries
+            )
+            self._store_embeddings(queries, embeddings, missing, unique_queries, response)
+        except Exception as e:
+            self.logger.error(f"Error generating query embeddings: {str(e)}")
+        return embeddings
+    
+    def _cached_embeddings(self, queries: List[str]):
+        """Cached vector per query (None if missing), the missing positions and their distinct queries"""
+        embeddings = [self.embedding_cache.get(query, Config.EMBEDDING_MODEL) for query in queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        # Duplicate queries are sent once
+        unique_queries = list(dict.fromkeys(queries[i] for i in missing))
+        return embeddings, missing, unique_queries
+    
+    def _store_embeddings(self, queries: List[str], embeddings: List, missing: List[int],
+                          unique_queries: List[str], response):
+        """Cache the API vectors and fill them into `embeddings`"""
+        vectors = {
+            unique_queries[item.index]: self.embedding_cache.put(unique_queries[item.index], Config.EMBEDDING_MODEL, item.embedding)
+            for item in response.data
+        }
+        for i in missing:
+            embeddings[i] = vectors.get(queries[i])
+    
+    def search_laws(self, query: str, top_k: int = 10,
+                    aggregation: str = None, aggregation_top_n: int = None,
+                    fusion: str = None, law_types: Union[str, List[str]] = None,
+                    date_from=None, date_to=None) -> List[Dict]:
+        """
+        Search for relevant laws using semantic similarity fused with BM25
+        
+        Chunk similarities are aggregated per law, so exactly top_k distinct
+        laws are returned whenever the corpus has that many.
+        
+        Args:
+            query (str): Search query (optimized by Agent 1)
+            top_k (int): Number of laws to return
+            aggregation (str): Per-law aggregation - 'max', 'mean_top_n' or 'sum'
+            aggregation_top_n (int): Chunks averaged per law for 'mean_top_n'
+            fusion (str): Vector/lexical fusion - 'rrf', 'weighted' or 'none'
+            law_types (Union[str, List[str]]): Only laws of these types (e.g. "Kanun")
+            date_from: Earliest gazette date ('dd.mm.yyyy', 'yyyy-mm-dd' or a year)
+            date_to: Latest gazette date
+            
+        Returns:
+            List[Dict]: List of relevant law information
         """
-        Search for relevant laws using semantic similarity
+        return self.search_laws_batch([query], top_k, aggregation, aggregation_top_n, fusion,
+                                      law_types=law_types, date_from=date_from, date_to=date_to)[0]
+    
+    async def search_laws_async(self, query: str, top_k: int = 10, **kwargs) -> List[Dict]:
+        """
+        Async variant of search_laws
+        
+        The query embedding is awaited on the AsyncOpenAI client and cached;
+        the search itself (a cache hit, then numpy scoring) runs in a worker
+        thread so the event loop stays free.
         
         Args:
             query (str): Search query (optimized by Agent 1)
             top_k (int): Number of laws to return
+            **kwargs: Any other search_laws argument (aggregation, fusion, filters)
             
         Returns:
             List[Dict]: List of relevant law information
         """
+        if not parse_citation(query)[2]:  # Citation-only queries are answered without an embedding
+            await self.get_query_embeddings_async([query])
+        return await asyncio.to_thread(self.search_laws, query, top_k, **kwargs)
+    
+    def search_laws_batch(self, queries: List[str], top_k: int = 10,
+                          aggregation: str = None, aggregation_top_n: int = None,
+                          fusion: str = None, law_types: Union[str, List[str]] = None,
+                          date_from=None, date_to=None) -> List[List[Dict]]:
+        """
+        Search several queries at once
+        
+        All queries are embedded in one API request and, with exact search,
+        scored against the corpus with a single matrix-matrix product.
+        
+        Args:
+            queries (List[str]): Search queries
+            top_k (int): Number of laws to return per query
+            aggregation (str): Per-law aggregation - 'max', 'mean_top_n' or 'sum'
+            aggregation_top_n (int): Chunks averaged per law for 'mean_top_n'
+            fusion (str): Vector/lexical fusion - 'rrf', 'weighted' or 'none'
+            law_types (Union[str, List[str]]): Only laws of these types (e.g. "Kanun")
+            date_from: Earliest gazette date ('dd.mm.yyyy', 'yyyy-mm-dd' or a year)
+            date_to: Latest gazette date
+            
+        Returns:
+            List[List[Dict]]: Law results for each query, in input order
+            
+        Raises:
+            ValueError: A filter has the wrong type or a malformed date
+        """
+        results = [[] for _ in queries]
+        # Pinned for the whole request: a concurrent reload cannot change the corpus mid-search
+        snapshot = self.snapshot
+        # Precomputed metadata masks restrict the rows before anything is scored; invalid
+        # filters raise ValueError to the caller instead of reading as "no results"
+        mask = None
+        if snapshot is not None and snapshot.chunks:
+            mask = snapshot.filter_index.mask(law_types, date_from, date_to)
         try:
             # Check if RAG system is available
-            if self.embeddings is None or not self.chunks:
+            if snapshot is None or not snapshot.chunks:
                 self.logger.warning("🚧 RAG system not available, returning empty results")
-                return []
+                return results
             
-            self.logger.info(f"Searching for: '{query}'")
+            method = aggregation or Config.RAG_LAW_AGGREGATION
+            top_n = aggregation_top_n or Config.RAG_LAW_AGGREGATION_TOP_N
+            fusion = fusion or Config.RAG_HYBRID_FUSION
             
-            # Generate query embedding
-            query_embedding = self.get_query_embedding(query)
-            if query_embedding is None:
-                return []
+            rows = None if mask is None else np.flatnonzero(mask)
+            if rows is not None and len(rows) == 0:
+                self.logger.info("No chunks match the filters")
+                return results
             
-            # Calculate similarities
-            query_embedding = query_embedding.reshape(1, -1)
-            similarities = cosine_similarity(query_embedding, self.embeddings)[0]
+            # Pure statute references ("4857 sayılı", "MADDE 17") need no embedding call
+            pending = []
+            for i, query in enumerate(queries):
+                self.logger.info(f"Searching for: '{query}'")
+                law_numbers, _, citation_only = parse_citation(query)
+                if citation_only and snapshot.lexical_index is not None:
+                    results[i] = self._search_citation(snapshot, query, law_numbers, top_k, mask)
+                    if results[i]:
+                        self.logger.info(f"Found {len(results[i])} cited laws")
+                        continue
+                pending.append(i)
+            if not pending:
+                return results
             
-            # Get top-k most similar chunks
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            # Generate query embeddings in one request
+            embeddings = self.get_query_embeddings([queries[i] for i in pending])
+            embedded = [(i, embedding) for i, embedding in zip(pending, embeddings) if embedding is not None]
+            if not embedded:
+                return results
+            query_vectors = normalize_embeddings(np.stack([embedding for _, embedding in embedded]))
             
-            results = []
-            seen_laws = set()  # To avoid duplicate laws
+            # Filtered rows are gathered once and scored exactly when the subset is small enough
+            score_rows = rows is not None and (snapshot.index.exhaustive or len(rows) <= Config.RAG_FILTER_EXACT_MAX_ROWS)
+            row_vectors = self._row_vectors(snapshot, rows) if score_rows else None
             
-            for idx in top_indices:
-                chunk = self.chunks[idx]
-                law_name = chunk.get('law_name', 'Unknown')
+            for block_start in range(0, len(embedded), SCORE_BATCH_SIZE):
+                block = query_vectors[block_start:block_start + SCORE_BATCH_SIZE]
+                # Exact search: a block of queries against every (filtered) chunk in one product
+                if score_rows:
+                    chunk_scores = block @ row_vectors.T
+                elif snapshot.index.exhaustive:
+                    chunk_scores = snapshot.index.score_batch(block)
+                else:
+                    chunk_scores = None
                 
-                # Skip if we already have this law (to get diverse laws)
-                if law_name in seen_laws:
-                    continue
-                seen_laws.add(law_name)
-                
-                similarity = similarities[idx]
-                
-                result = {
-                    'rank': len(results) + 1,
-                    'law_name': law_name,
-                    'law_type': chunk.get('law_type', 'Unknown'),
-                    'similarity': float(similarity),
-                    'law_number': chunk.get('law_number', ''),
-                    'acceptance_date': chunk.get('acceptance_date', ''),
-                    'gazette_date': chunk.get('gazette_date', ''),
-                    'detail_url': chunk.get('detail_url', ''),
-                    'relevant_text': chunk.get('text', '')[:300] + "..."  # Preview
-                }
-                results.append(result)
-                
-                # Stop when we have enough unique laws
-                if len(results) >= top_k:
-                    break
-            
-            self.logger.info(f"Found {len(results)} relevant laws")
+                for row in range(len(block)):
+                    i = embedded[block_start + row][0]
+                    results[i] = self._rank_laws(
+                        snapshot, queries[i], block[row], top_k, method, top_n, fusion,
+                        chunk_scores=None if chunk_scores is None else chunk_scores[row],
+                        rows=rows if score_rows else None, mask=mask
+                    )
+                    self.logger.info(f"Found {len(results[i])} relevant laws")
             return results
             
         except Exception as e:
             self.logger.error(f"Error in law search: {str(e)}")
+            return results
+    
+    def _rank_laws(self, snapshot: IndexSnapshot, query: str, query_vector: np.ndarray, top_k: int, method: str, top_n: int,
+                   fusion: str, chunk_scores: np.ndarray = None, rows: np.ndarray = None,
+                   mask: np.ndarray = None) -> List[Dict]:
+        """
+        Aggregate, fuse with BM25 and format the top laws for one query
+        
+        `chunk_scores` are aligned with `rows` when given (filtered exact scoring);
+        `mask` post-filters ANN candidates and lexical hits.
+        """
+        law_scores, best_chunks, best_similarities = self._score_laws(
+            snapshot, query_vector, top_k, method, top_n, chunk_scores=chunk_scores, rows=rows, mask=mask
+        )
+        
+        # Blend in BM25 so exact terms and references are not missed
+        if fusion != "none" and snapshot.lexical_index is not None:
+            lexical_scores, lexical_chunks, _ = self._score_laws_lexical(snapshot, query, mask=mask)
+            law_scores = fuse_law_scores(law_scores, lexical_scores, fusion,
+                                         depth=max(top_k * Config.RAG_ANN_CANDIDATES_PER_LAW, 100),
+                                         rrf_k=Config.RAG_RRF_K, vector_weight=Config.RAG_HYBRID_VECTOR_WEIGHT)
+            lexical_only = (best_chunks < 0) & (lexical_chunks >= 0)
+            best_chunks = np.where(lexical_only, lexical_chunks, best_chunks)
+            for law_id in np.flatnonzero(lexical_only):
+                best_similarities[law_id] = self._chunk_similarity(snapshot, best_chunks[law_id], query_vector)
+        
+        top_laws = [law_id for law_id in top_k_indices(law_scores, top_k) if np.isfinite(law_scores[law_id])]
+        return [
+            self._format_result(snapshot, rank, best_chunks[law_id], best_similarities[law_id], law_scores[law_id])
+            for rank, law_id in enumerate(top_laws, 1)
+        ]
+    
+    def _score_laws(self, snapshot: IndexSnapshot, query_vector: np.ndarray, top_k: int, method: str, top_n: int,
+                    chunk_scores: np.ndarray = None, rows: np.ndarray = None, mask: np.ndarray = None):
+        """
+        Per-law scores for a normalized query
+        
+        Exact search scores every chunk with one mat-vec product (or uses
+        precomputed `chunk_scores` from a batch, aligned with `rows` when the
+        search is filtered). ANN backends return a candidate pool, restricted to
+        `mask`, that is widened until it covers top_k laws.
+        """
+        law_index, index = snapshot.law_index, snapshot.index
+        if chunk_scores is not None:
+            return law_index.aggregate(chunk_scores, method, top_n, indices=rows)
+        if rows is not None:
+            return law_index.aggregate(self._row_vectors(snapshot, rows) @ query_vector, method, top_n, indices=rows)
+        if index.exhaustive:
+            return law_index.aggregate(index.score(query_vector), method, top_n)
+        
+        n_candidates = top_k * Config.RAG_ANN_CANDIDATES_PER_LAW
+        while True:
+            indices, scores = index.search(query_vector, n_candidates)
+            if mask is not None:
+                keep = mask[indices]
+                law_scores, best_chunks, best_similarities = law_index.aggregate(
+                    scores[keep], method, top_n, indices=indices[keep])
+            else:
+                law_scores, best_chunks, best_similarities = law_index.aggregate(scores, method, top_n, indices=indices)
+            if np.isfinite(law_scores).sum() >= top_k or len(indices) < n_candidates or n_candidates >= len(snapshot.embeddings):
+                return law_scores, best_chunks, best_similarities
+            n_candidates *= 2
+    
+    def _score_laws_lexical(self, snapshot: IndexSnapshot, query: str, rows: np.ndarray = None, mask: np.ndarray = None):
+        """Per-law BM25 scores (max over matching chunks), optionally restricted to some chunk rows"""
+        scores = snapshot.lexical_index.score(query)
+        if rows is None:
+            matched = scores > 0
+            rows = np.flatnonzero(matched if mask is None else matched & mask)
+        return snapshot.law_index.aggregate(scores[rows], "max", indices=rows)
+    
+    def _row_vectors(self, snapshot: IndexSnapshot, rows: np.ndarray) -> np.ndarray:
+        """Normalized float32 vectors of selected chunk rows (raw memory-mapped rows are normalized on the fly)"""
+        if snapshot.quantized:
+            return normalize_embeddings(snapshot.embeddings[rows])
+        return np.asarray(snapshot.embeddings[rows], dtype=np.float32)
+    
+    def _search_citation(self, snapshot: IndexSnapshot, query: str, law_numbers: List[int], top_k: int,
+                         mask: np.ndarray = None) -> List[Dict]:
+        """Laws cited by number, each represented by its best BM25 chunk (e.g. the cited MADDE)"""
+        cited_laws = snapshot.chunks.laws_by_number(law_numbers)
+        cited = np.isin(snapshot.chunks.chunk_law_ids, cited_laws)
+        rows = np.flatnonzero(cited if mask is None else cited & mask)
+        if len(rows) == 0:
             return []
+        
+        law_scores, best_chunks, _ = self._score_laws_lexical(snapshot, query, rows)
+        top_laws = [law_id for law_id in top_k_indices(law_scores, top_k) if np.isfinite(law_scores[law_id])]
+        return [
+            self._format_result(snapshot, rank, best_chunks[law_id], 1.0, law_scores[law_id])
+            for rank, law_id in enumerate(top_laws, 1)
+        ]
+    
+    def _chunk_similarity(self, snapshot: IndexSnapshot, chunk_idx: int, query_vector: np.ndarray) -> float:
+        """Cosine similarity of one chunk (raw or normalized rows) with a normalized query"""
+        row = np.asarray(snapshot.embeddings[chunk_idx], dtype=np.float32)
+        norm = np.linalg.norm(row)
+        return float(row @ query_vector / norm) if norm > 0 else 0.0
+    
+    def _format_result(self, snapshot: IndexSnapshot, rank: int, chunk_idx: int, similarity: float, law_score: float) -> Dict:
+        """Build a law result from its best-matching chunk"""
+        law = snapshot.chunks.law(chunk_idx)
+        return {
+            'rank': rank,
+            'law_name': law.get('law_name', 'Unknown'),
+            'law_type': law.get('law_type', 'Unknown'),
+            'similarity': float(similarity),
+            'law_score': float(law_score),
+            'law_number': law.get('law_number', ''),
+            'acceptance_date': law.get('acceptance_date', ''),
+            'gazette_date': law.get('gazette_date', ''),
+            'detail_url': law.get('detail_url', ''),
+            'relevant_text': snapshot.chunks.text(chunk_idx)[:300] + "..."  # Preview
+        }
     
     def get_law_names(self, query: str, top_k: int = 10) -> List[str]:
         """
@@ -0,0 +1,161 @@
+"""
+Index Snapshots
+One corpus version (chunk store, vectors, search/lexical/filter indexes) loaded
+as an immutable bundle, so a newer version can be built in the background and
+swapped in with a single reference assignment
+"""
+
+import glob
+import json
+import logging
+import os
+import re
+import time
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+
+from rag_system.vector_index import normalize_embeddings, open_normalized_store
+from rag_system.index_backends import load_search_index, uses_quantized_storage
+from rag_system.law_aggregation import ChunkLawIndex
+from rag_system.lexical_index import load_bm25_index
+from rag_system.metadata_filters import MetadataFilterIndex
+from rag_system.chunk_store import load_chunk_store
+
+logger = logging.getLogger(__name__)
+
+_VERSION_PATTERN = re.compile(r"legal_embeddings_(\w+)\.npy$")
+# Published-version pointer written next to the artifacts (see rag_system/manifest.py)
+LATEST_POINTER = "latest.json"
+
+
+def snapshot_version(embeddings_file: str) -> Optional[str]:
+    """Version (creation timestamp) of a legal_embeddings_<version>.npy file, or None"""
+    match = _VERSION_PATTERN.search(os.path.basename(embeddings_file))
+    return match.group(1) if match else None
+
+
+def snapshot_file_names(version: str) -> Tuple[str, str]:
+    """Embeddings and chunks file names of a version"""
+    return f"legal_embeddings_{version}.npy", f"legal_chunks_{version}.json"
+
+
+def read_latest_version(directory: str) -> Optional[str]:
+    """Version named by a directory's latest.json, or None"""
+    try:
+        with open(os.path.join(directory, LATEST_POINTER), 'r', encoding='utf-8') as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def find_local_snapshot(directories: Iterable[str], version: str = None) -> Optional[Tuple[str, str]]:
+    """
+    Locate a complete snapshot (embeddings and chunks of the same version) on disk
+
+    Args:
+        directories (Iterable[str]): Directories searched, in order of preference
+        version (str): Version to pin (default: the first directory's latest.json
+            pointer, else the newest complete version)
+
+    Returns:
+        Optional[Tuple[str, str]]: (embeddings_file, chunks_file), or None if nothing matches
+    """
+    found = {}
+    for directory in directories:
+        for embeddings_file in glob.glob(os.path.join(directory, "legal_embeddings_*.npy")):
+            file_version = snapshot_version(embeddings_file)
+            if file_version is None or file_version in found:
+                continue
+            chunks_file = os.path.join(directory, snapshot_file_names(file_version)[1])
+            if os.path.exists(chunks_file):
+                found[file_version] = (embeddings_file, chunks_file)
+
+    if version:
+        return found.get(version)
+    for directory in directories:
+        latest = read_latest_version(directory)
+        if latest in found:
+            return found[latest]
+    return found[max(found)] if found else None
+
+
+class IndexSnapshot:
+    """Everything search needs for one corpus version; never modified after loading"""
+
+    def __init__(self, version: str, chunks, embeddings: np.ndarray, index, law_index: ChunkLawIndex,
+                 lexical_index, filter_index: MetadataFilterIndex, quantized: bool):
+        """
+        Initialize the snapshot
+
+        Args:
+            version (str): Corpus version (embeddings file timestamp)
+            chunks: ChunkStore aligned with the vector rows
+            embeddings (np.ndarray): Normalized vectors, or raw memory-mapped rows if `quantized`
+            index: Search index backend over `embeddings`
+            law_index (ChunkLawIndex): Chunk -> law aggregation
+            lexical_index: BM25Index, or None when unavailable
+            filter_index (MetadataFilterIndex): law_type / gazette-date masks
+            quantized (bool): Whether `embeddings` holds raw rows that need normalizing
+        """
+        self.version = version
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.index = index
+        self.law_index = law_index
+        self.lexical_index = lexical_index
+        self.filter_index = filter_index
+        self.quantized = quantized
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, embeddings_file: str, chunks_file: str, backend: str = None) -> "IndexSnapshot":
+        """
+        Open the chunk store, map the vectors and attach the configured indexes
+
+        Args:
+            embeddings_file (str): legal_embeddings_<version>.npy
+            chunks_file (str): legal_chunks_<version>.json
+            backend (str): Index backend (default: Config.RAG_INDEX_BACKEND)
+
+        Returns:
+            IndexSnapshot: Ready-to-search snapshot
+        """
+        chunks = load_chunk_store(chunks_file)
+        filter_index = MetadataFilterIndex(chunks)
+        try:
+            lexical_index = load_bm25_index(chunks_file, chunks)
+        except Exception as e:
+            logger.warning(f"⚠️ Lexical index unavailable ({str(e)}), using vector search only")
+            lexical_index = None
+
+        quantized = uses_quantized_storage(backend)
+        if quantized:
+            # Compressed codes stay in RAM; full rows are paged in from the raw .npy for re-ranking
+            embeddings = np.load(embeddings_file, mmap_mode='r')
+        else:
+            try:
+                # Normalized float32 copy mapped read-only, shared by all worker processes
+                embeddings = open_normalized_store(embeddings_file)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write normalized store ({str(e)}), normalizing in memory")
+                embeddings = normalize_embeddings(np.load(embeddings_file))
+        if len(embeddings) != len(chunks):
+            raise ValueError(f"{embeddings_file} has {len(embeddings)} vectors but {chunks_file} has {len(chunks)} chunks")
+
+        # Chunk -> law id array for law-level aggregation
+        law_index = ChunkLawIndex.from_store(chunks)
+        index = load_search_index(embeddings, embeddings_file, backend=backend, normalized=not quantized)
+
+        version = snapshot_version(embeddings_file) or os.path.basename(embeddings_file)
+        logger.info(f"✅ Snapshot {version} ready: {len(embeddings)} x {embeddings.shape[1]} ({index.backend})")
+        return cls(version, chunks, embeddings, index, law_index, lexical_index, filter_index, quantized)
+
+    def describe(self) -> Dict:
+        """Version and size summary for health checks"""
+        return {
+            'version': self.version,
+            'chunks': len(self.chunks),
+            'backend': self.index.backend,
+            'lexical': self.lexical_index is not None,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.loaded_at)),
+        }
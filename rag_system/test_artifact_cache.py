@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test S3ArtifactCache against a stubbed S3 client (no network or credentials needed)
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+
+# Add project root to path (for running this file as a script)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag_system.artifact_cache import S3ArtifactCache, file_digest
+
+PART_SIZE = 1024 * 1024  # smallest part size the cache accepts
+
+
+class StubBody:
+    def __init__(self, data):
+        self.data = data
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+
+class StubS3:
+    """head_object / ranged get_object over in-memory objects, counting the calls"""
+
+    def __init__(self):
+        self.objects = {}
+        self.get_calls = []
+        self.unreachable = False
+
+    def put(self, key, data, part_size=None, etag=None):
+        """Store an object with the ETag S3 would give it (multipart if part_size is set)"""
+        if etag is None and part_size:
+            digests = [hashlib.md5(data[i:i + part_size]).digest() for i in range(0, len(data), part_size)]
+            etag = f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+        self.objects[key] = (data, etag or hashlib.md5(data).hexdigest())
+
+    def head_object(self, Bucket, Key):
+        if self.unreachable:
+            raise ConnectionError("S3 unreachable")
+        data, etag = self.objects[Key]
+        return {'ETag': f'"{etag}"', 'ContentLength': len(data)}
+
+    def get_object(self, Bucket, Key, Range, IfMatch):
+        data, etag = self.objects[Key]
+        assert IfMatch == etag
+        start, end = (int(x) for x in Range[len("bytes="):].split("-"))
+        self.get_calls.append((Key, start, end))
+        return {'Body': StubBody(data[start:end + 1])}
+
+
+def make_cache(cache_dir, s3=None):
+    return S3ArtifactCache(s3 or StubS3(), "bucket", cache_dir, part_size=PART_SIZE, concurrency=4)
+
+
+def test_ranged_download_with_multipart_etag():
+    data = os.urandom(2 * PART_SIZE + 12345)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = make_cache(cache_dir)
+        cache.s3.put("embeddings/v1/legal.npy", data, part_size=PART_SIZE)
+
+        path = cache.fetch("embeddings/v1/legal.npy")
+
+        assert open(path, 'rb').read() == data
+        assert sorted(start for _, start, _ in cache.s3.get_calls) == [0, PART_SIZE, 2 * PART_SIZE]
+        assert cache.s3.get_calls[-1][2] < len(data)
+
+
+def test_plain_etag_mismatch_is_rejected():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = make_cache(cache_dir)
+        cache.s3.put("embeddings/legal.npy", b"vectors", etag=hashlib.md5(b"other").hexdigest())
+
+        try:
+            cache.fetch("embeddings/legal.npy")
+            assert False, "corrupt download accepted"
+        except IOError as e:
+            assert "Checksum mismatch" in str(e)
+        assert not os.path.exists(cache.local_path("embeddings/legal.npy"))
+
+
+def test_sha256_mismatch_is_rejected():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = make_cache(cache_dir)
+        cache.s3.put("embeddings/legal.npy", b"vectors")
+
+        try:
+            cache.fetch("embeddings/legal.npy", sha256="0" * 64)
+            assert False, "SHA-256 mismatch accepted"
+        except IOError as e:
+            assert "SHA-256 mismatch" in str(e)
+        assert not os.path.exists(cache.local_path("embeddings/legal.npy"))
+
+        sha256 = hashlib.sha256(b"vectors").hexdigest()
+        path = cache.fetch("embeddings/legal.npy", sha256=sha256)
+        assert file_digest(path) == sha256
+
+
+def test_cache_hit_and_etag_change():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        s3 = StubS3()
+        s3.put("embeddings/legal.npy", b"version 1")
+        path = make_cache(cache_dir, s3).fetch("embeddings/legal.npy")
+        downloads = len(s3.get_calls)
+
+        # A new cache object (a restart or another worker) reuses the file
+        assert make_cache(cache_dir, s3).fetch("embeddings/legal.npy") == path
+        assert len(s3.get_calls) == downloads
+
+        # Unreachable S3 falls back to the cached copy
+        s3.unreachable = True
+        assert make_cache(cache_dir, s3).fetch("embeddings/legal.npy") == path
+        s3.unreachable = False
+
+        # A changed object is downloaded again
+        s3.put("embeddings/legal.npy", b"version 2")
+        assert open(make_cache(cache_dir, s3).fetch("embeddings/legal.npy"), 'rb').read() == b"version 2"
+        assert len(s3.get_calls) == downloads + 1
+
+
+def test_same_file_name_under_different_prefixes():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = make_cache(cache_dir)
+        cache.s3.put("embeddings/v1/latest.json", b'{"version": "v1"}')
+        cache.s3.put("embeddings/v2/latest.json", b'{"version": "v2"}')
+
+        first = cache.fetch("embeddings/v1/latest.json")
+        second = cache.fetch("embeddings/v2/latest.json")
+
+        assert first != second
+        assert open(first, 'rb').read() == b'{"version": "v1"}'
+        assert open(second, 'rb').read() == b'{"version": "v2"}'
+        assert cache.local_path("../embeddings/v1/latest.json") == first
+
+
+def main():
+    """Run every test and report the results"""
+    tests = [value for name, value in globals().items() if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
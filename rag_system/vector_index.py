@@ -0,0 +1,175 @@
+"""
+Vector Index
+Exact cosine-similarity search core over pre-normalized float32 embeddings
+"""
+
+import os
+import numpy as np
+from typing import Tuple
+
+
+def normalize_embeddings(embeddings) -> np.ndarray:
+    """
+    L2-normalize embedding rows once and store them as contiguous float32
+
+    Args:
+        embeddings: 2-D array of raw embeddings (any float dtype)
+
+    Returns:
+        np.ndarray: Row-normalized float32 matrix
+    """
+    matrix = np.array(embeddings, dtype=np.float32, order='C', copy=True)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def index_artifact_path(embeddings_file: str, backend: str, extension: str = ".npz") -> str:
+    """Path of an index artifact stored next to its legal_embeddings_<timestamp>.npy file"""
+    directory, file_name = os.path.split(embeddings_file)
+    stem = os.path.splitext(file_name)[0].replace("legal_embeddings_", f"legal_{backend}_")
+    return os.path.join(directory, stem + extension)
+
+
+def open_normalized_store(embeddings_file: str, block_size: int = 16384) -> np.ndarray:
+    """
+    Memory-map the normalized float32 copy of an embeddings file
+
+    The copy is written once next to the source as legal_normalized_<timestamp>.npy
+    and reused while it is newer than the source. Every process that maps it
+    shares the same page-cache pages instead of holding a private matrix.
+
+    Args:
+        embeddings_file (str): Raw legal_embeddings_<timestamp>.npy
+        block_size (int): Rows normalized per step while writing the copy
+
+    Returns:
+        np.ndarray: Read-only memory-mapped float32 matrix
+
+    Raises:
+        OSError: If the copy cannot be written next to the source
+    """
+    store_file = index_artifact_path(embeddings_file, "normalized", ".npy")
+    if not os.path.exists(store_file) or os.path.getmtime(store_file) < os.path.getmtime(embeddings_file):
+        raw = np.load(embeddings_file, mmap_mode='r')
+        # Write under a private name and rename, so concurrent workers never map a partial file
+        temp_file = f"{store_file}.{os.getpid()}.tmp"
+        store = np.lib.format.open_memmap(temp_file, mode='w+', dtype=np.float32, shape=raw.shape)
+        for start in range(0, len(raw), block_size):
+            block = normalize_embeddings(raw[start:start + block_size])
+            store[start:start + len(block)] = block
+        store.flush()
+        del store
+        os.replace(temp_file, store_file)
+
+    return np.load(store_file, mmap_mode='r')
+
+
+def normalize_query(query_embedding) -> np.ndarray:
+    """Convert a single query embedding to a unit-length float32 vector"""
+    query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(query)
+    if norm > 0:
+        query = query / norm
+    return query
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first
+
+    Uses argpartition so only the k winners are sorted instead of the
+    whole score vector.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+class ExactIndex:
+    """Brute-force inner-product index over normalized float32 vectors"""
+
+    backend = "exact"
+    exhaustive = True  # search() sees every chunk, so score() is available
+
+    def __init__(self, embeddings, normalized: bool = False):
+        """
+        Initialize the index
+
+        Args:
+            embeddings: Chunk embedding matrix (n_chunks x dims)
+            normalized (bool): Skip normalization if rows are already unit float32
+        """
+        if normalized:
+            self.vectors = np.asarray(embeddings, dtype=np.float32)
+        else:
+            self.vectors = normalize_embeddings(embeddings)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def dims(self) -> int:
+        return self.vectors.shape[1]
+
+    def score(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of a normalized query against every chunk"""
+        return self.vectors @ query
+
+    def score_batch(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of normalized queries (m x dims) against every chunk, as (m x n_chunks)"""
+        return np.asarray(queries, dtype=np.float32) @ self.vectors.T
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar chunks
+
+        Args:
+            query (np.ndarray): Normalized float32 query vector
+            k (int): Number of chunks to return
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Chunk indices and their similarities, best first
+        """
+        scores = self.score(query)
+        indices = top_k_indices(scores, k)
+        return indices, scores[indices]
+
+
+def recall_at_k(index, exact_index: ExactIndex, queries: np.ndarray, k: int = 10) -> float:
+    """
+    Fraction of the exact top-k neighbours an approximate index returns
+
+    Args:
+        index: Approximate index exposing search(query, k)
+        exact_index (ExactIndex): Brute-force reference index
+        queries (np.ndarray): Normalized float32 query vectors
+        k (int): Neighbourhood size
+
+    Returns:
+        float: Mean recall@k over the queries
+    """
+    hits = 0
+    for query in queries:
+        approx_ids, _ = index.search(query, k)
+        exact_ids, _ = exact_index.search(query, k)
+        hits += len(np.intersect1d(approx_ids, exact_ids))
+    return hits / float(len(queries) * k) if len(queries) else 0.0
+
+
+def sample_queries(vectors: np.ndarray, n: int = 200, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """Perturbed corpus rows used as stand-in queries for recall measurements"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(vectors), size=min(n, len(vectors)), replace=False)
+    queries = np.asarray(vectors[rows], dtype=np.float32)
+    queries = queries + rng.normal(scale=noise / np.sqrt(queries.shape[1]), size=queries.shape).astype(np.float32)
+    return normalize_embeddings(queries)
@@ -8,6 +8,17 @@ import os
 import sys
 import subprocess
 
+# Upper bound of the default worker count (os.cpu_count() is the host's, not the container quota)
+DEFAULT_MAX_WORKERS = 2
+
+def default_workers():
+    """Cores this process may run on, capped at DEFAULT_MAX_WORKERS"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        cores = os.cpu_count() or 1
+    return max(1, min(cores, DEFAULT_MAX_WORKERS))
+
 def main():
     """Main startup function"""
     print("🚀 Starting MevzuatAI deployment...")
@@ -34,15 +45,42 @@ def main():
     
     print(f"✅ Frontend path verified: {frontend_path}")
     
+    # Only the memory-mapped embeddings are shared; every worker still builds its own
+    # BM25 postings, filter masks and law tables, so keep the default low (cores
+    # available to this process, at most DEFAULT_MAX_WORKERS) and let WEB_CONCURRENCY
+    # raise it where memory allows.
+    # No --preload: each worker loads the system in a background thread at boot
+    # and answers /api/live and /api/ready while loading
+    workers = os.environ.get('WEB_CONCURRENCY', str(default_workers()))
+    print(f"👷 Workers: {workers}")
+    
+    # SERVER_MODE=asgi: uvicorn serves /api/ask on the async pipeline, so each
+    # worker keeps many LLM-bound questions in flight instead of one
+    if os.environ.get('SERVER_MODE', 'wsgi').lower() == 'asgi':
+        uvicorn_cmd = [
+            'uvicorn',
+            '--host', '0.0.0.0',
+            '--port', port,
+            '--workers', workers,
+            '--app-dir', 'frontend',
+            'asgi:app'
+        ]
+        print(f"🚀 Starting Uvicorn: {' '.join(uvicorn_cmd)}")
+        try:
+            subprocess.run(uvicorn_cmd, check=True)
+            return
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"❌ Uvicorn failed: {e}")
+            print("🔄 Falling back to Gunicorn...")
+    
     # Build Gunicorn command
     gunicorn_cmd = [
         'gunicorn',
         '--bind', f'0.0.0.0:{port}',
-        '--workers', '1',
+        '--workers', workers,
         '--timeout', '300',
         '--worker-class', 'sync',
         '--max-requests', '1000',
-        '--preload',
         '--chdir', 'frontend',
         'app:app'
     ]
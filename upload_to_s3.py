@@ -5,9 +5,14 @@ Run this ONCE from your local machine
 
 import boto3
 import os
+import sys
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from config.config import Config
+from rag_system.manifest import publish_snapshot
+from rag_system.snapshot import find_local_snapshot, snapshot_version
+
 def upload_embeddings():
     # Load credentials from .env file
     load_dotenv()
@@ -24,45 +29,28 @@ def upload_embeddings():
         region_name='us-east-1'
     )
     
-    # Files to upload (adjust paths if needed)
-    files_to_upload = [
-        {
-            'local_path': 'rag_system/embeddings_output/legal_embeddings_20250730_005323.npy',
-            's3_key': 'embeddings/legal_embeddings_20250730_005323.npy'
-        },
-        {
-            'local_path': 'rag_system/embeddings_output/legal_chunks_20250730_005323.json',
-            's3_key': 'embeddings/legal_chunks_20250730_005323.json'
-        },
-        {
-            'local_path': 'rag_system/embeddings_output/embedding_stats_20250730_005323.json',
-            's3_key': 'embeddings/embedding_stats_20250730_005323.json'
-        }
-    ]
+    # Newest local version (or the one given on the command line), described by its manifest
+    embeddings_dir = 'rag_system/embeddings_output'
+    version = sys.argv[1] if len(sys.argv) > 1 else None
+    files = find_local_snapshot([embeddings_dir], version)
+    if files is None:
+        print(f"❌ No complete embeddings/chunks pair found in {embeddings_dir}")
+        return
+    version = snapshot_version(files[0])
     
-    print("🚀 Starting upload to S3...")
+    print(f"🚀 Starting upload of {version} to S3...")
     
-    for file_info in files_to_upload:
-        local_path = file_info['local_path']
-        s3_key = file_info['s3_key']
-        
-        if not os.path.exists(local_path):
-            print(f"❌ File not found: {local_path}")
-            continue
-            
-        try:
-            # Get file size for progress
-            file_size = os.path.getsize(local_path)
-            print(f"📤 Uploading {os.path.basename(local_path)} ({file_size / 1024 / 1024:.1f} MB)...")
-            
-            # Upload file
-            s3_client.upload_file(local_path, BUCKET_NAME, s3_key)
-            print(f"✅ Successfully uploaded {os.path.basename(local_path)}")
-            
-        except ClientError as e:
-            print(f"❌ Error uploading {local_path}: {e}")
-        except Exception as e:
-            print(f"❌ Unexpected error uploading {local_path}: {e}")
+    try:
+        # Artifacts first (unchanged ones skipped), then the manifest, then latest.json
+        publish_snapshot(s3_client, BUCKET_NAME, embeddings_dir, version, prefix='embeddings/',
+                         part_size=Config.RAG_DOWNLOAD_PART_SIZE_MB * 1024 * 1024,
+                         embedding_model=Config.EMBEDDING_MODEL)
+    except ClientError as e:
+        print(f"❌ Error uploading {version}: {e}")
+        return
+    except Exception as e:
+        print(f"❌ Unexpected error uploading {version}: {e}")
+        return
     
     print("\n🎉 Upload complete! Your embeddings are now in S3.")
     print(f"Bucket: {BUCKET_NAME}")
@@ -74,6 +62,7 @@ if __name__ == "__main__":
     print("2. Replace AWS_SECRET_ACCESS_KEY with your actual secret key") 
     print("3. Replace BUCKET_NAME with your actual bucket name")
     print("4. Make sure you're in the project root directory")
+    print("   (optional: pass a version, e.g. python upload_to_s3.py 20250730_005323)")
     print("\nReady? Press Enter to continue or Ctrl+C to cancel...")
     input()
     
@@ -0,0 +1,63 @@
+"""
+Context Packer
+Splits Agent 3's token budget across laws by relevance and assembles the
+selected articles of each law in one pass
+"""
+
+from typing import List, Sequence
+
+from utils.law_articles import Article
+
+GAP_MARKER = "[...]"
+ARTICLE_SEPARATOR = "\n\n"
+# Separator / gap-marker tokens charged per selected article
+ARTICLE_OVERHEAD_TOKENS = 4
+
+
+def allocate_budget(weights: Sequence[float], demands: Sequence[int], budget: int) -> List[int]:
+    """
+    Split a token budget in proportion to relevance (water-filling)
+
+    A law never gets more than it can use (its demand); what it leaves over is
+    shared among the remaining laws by weight again.
+
+    Args:
+        weights (Sequence[float]): Relevance of each law (negative counts as 0)
+        demands (Sequence[int]): Tokens each law could use at most
+        budget (int): Total tokens
+
+    Returns:
+        List[int]: Tokens allocated to each law
+    """
+    weights = [max(float(w), 0.0) for w in weights]
+    if not any(weights):
+        weights = [1.0] * len(weights)
+    allocation = [0] * len(demands)
+    active = [i for i, demand in enumerate(demands) if demand > 0]
+    remaining = budget
+    while active and remaining > 0:
+        total_weight = sum(weights[i] for i in active) or float(len(active))
+        shares = {i: remaining * (weights[i] or 0.0) / total_weight for i in active}
+        satisfied = [i for i in active if demands[i] - allocation[i] <= shares[i]]
+        if not satisfied:
+            for i in active:
+                allocation[i] += int(shares[i])
+            break
+        for i in satisfied:
+            remaining -= demands[i] - allocation[i]
+            allocation[i] = demands[i]
+            active.remove(i)
+    return allocation
+
+
+def join_articles(text: str, articles: Sequence[Article], chosen: Sequence[int]) -> str:
+    """Selected articles in document order; skipped stretches become GAP_MARKER"""
+    parts, previous = [], -1
+    for row in chosen:
+        if row != previous + 1:
+            parts.append(GAP_MARKER)
+        parts.append(text[articles[row][1]:articles[row][2]].strip())
+        previous = row
+    if chosen and previous != len(articles) - 1:
+        parts.append(GAP_MARKER)
+    return ARTICLE_SEPARATOR.join(parts)
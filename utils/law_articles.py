@@ -0,0 +1,124 @@
+"""
+Law Articles
+Splits a law's full text into its articles (MADDE headings) and scores them
+against a query, so context assembly can send the relevant articles of a law
+instead of its first pages
+"""
+
+import re
+import numpy as np
+from typing import Iterable, List, Sequence, Tuple
+
+from utils.turkish_text import analyze, turkish_casefold
+
+# "MADDE 17 –", "Madde 5/A -", "GEÇİCİ MADDE 1 –", "Ek Madde 3 —"; the dash keeps in-text references out
+_ARTICLE_HEADING = re.compile(
+    r"(?<!\w)(?:(GEÇİCİ|Geçici|EK|Ek)\s+)?(?:MADDE|Madde)\s+(\d+(?:/[A-ZÇĞİÖŞÜa-zçğıöşü])?)\s*[-–—]"
+)
+_PREFIX_LABELS = {"geçici": "GEÇİCİ", "ek": "EK"}
+PREAMBLE_LABEL = ""
+MIN_TERM_LENGTH = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# (label, start, end) character span of one article in the law's full text
+Article = Tuple[str, int, int]
+
+
+def split_articles(text: str) -> List[Article]:
+    """
+    Article spans of a law text in document order
+
+    Text before the first heading (title, enactment details) becomes an article
+    labelled PREAMBLE_LABEL. A text without headings yields one preamble span.
+    """
+    matches = list(_ARTICLE_HEADING.finditer(text))
+    first = matches[0].start() if matches else len(text)
+    articles = [(PREAMBLE_LABEL, 0, first)] if text[:first].strip() else []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        label = f"MADDE {match.group(2)}"
+        if match.group(1):
+            label = f"{_PREFIX_LABELS[turkish_casefold(match.group(1))]} {label}"
+        articles.append((label, match.start(), end))
+    return articles
+
+
+def score_articles(text: str, articles: Sequence[Article], query: str,
+                   cited_articles: Iterable[int] = ()) -> np.ndarray:
+    """
+    BM25 relevance of each article of one law to a query
+
+    Query words are stemmed and matched at word starts in the case-folded
+    article text, so inflected forms count; document frequencies are taken
+    within the law. Articles cited by number ("madde 17") outrank all others.
+
+    Args:
+        text (str): The law's full text
+        articles (Sequence[Article]): Spans from split_articles
+        query (str): Question and/or retrieved passages
+        cited_articles (Iterable[int]): Article numbers cited in the question
+
+    Returns:
+        np.ndarray: One score per article (0 = no query word)
+    """
+    scores = np.zeros(len(articles), dtype=np.float32)
+    terms = sorted({t for t in analyze(query) if len(t) >= MIN_TERM_LENGTH and not t.isdigit()},
+                   key=len, reverse=True)
+    if terms and len(articles):
+        # Longest stems first, so each word is counted for its most specific term
+        pattern = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, terms)) + ")")
+        term_ids = {term: i for i, term in enumerate(terms)}
+        term_freqs = np.zeros((len(articles), len(terms)), dtype=np.float32)
+        lengths = np.empty(len(articles), dtype=np.float32)
+        for row, (_, start, end) in enumerate(articles):
+            folded = turkish_casefold(text[start:end])
+            lengths[row] = max(len(folded), 1)
+            for match in pattern.finditer(folded):
+                term_freqs[row, term_ids[match.group(1)]] += 1
+
+        doc_freqs = (term_freqs > 0).sum(axis=0)
+        # Classic BM25 idf clipped at 0: words in most articles ("madde", the law's name) carry no signal
+        idf = np.maximum(np.log((len(articles) - doc_freqs + 0.5) / (doc_freqs + 0.5)), 0)
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+        scores = (idf * term_freqs * (BM25_K1 + 1) / (term_freqs + length_norm[:, None])).sum(axis=1)
+        scores = scores.astype(np.float32)
+
+    cited_labels = {f"MADDE {number}" for number in cited_articles}
+    if cited_labels:
+        top = float(scores.max()) + 1.0 if len(scores) else 1.0
+        for row, (label, _, _) in enumerate(articles):
+            if label in cited_labels:
+                scores[row] = top
+    return scores
+
+
+def select_articles(scores: np.ndarray, sizes: Sequence[int], budget: int) -> List[int]:
+    """
+    Highest-scoring articles that fit a budget, returned in document order
+
+    Articles are taken best first (ties in document order) and skipped when
+    they do not fit the remaining budget. If no article matches the query, the
+    leading articles are taken instead.
+
+    Args:
+        scores (np.ndarray): Article scores from score_articles
+        sizes (Sequence[int]): Cost of each article in the budget's unit
+        budget (int): Total cost allowed
+
+    Returns:
+        List[int]: Selected article rows, ascending
+    """
+    if not np.any(scores > 0):
+        order = range(len(sizes))
+    else:
+        order = [row for row in np.argsort(-scores, kind='stable') if scores[row] > 0]
+
+    chosen, remaining = [], budget
+    for row in order:
+        if sizes[row] <= remaining:
+            chosen.append(int(row))
+            remaining -= sizes[row]
+        elif not np.any(scores > 0):
+            break  # keep the fallback a contiguous prefix
+    return sorted(chosen)
@@ -1,93 +1,346 @@
 """
 Law Matcher Utility
-Matches law names from RAG results with full text from Excel dataset
+Matches law names from RAG results with full text from the legal dataset
+(a SQLite law store converted once from the Excel file)
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 from config.config import Config
+from utils.turkish_text import turkish_casefold
+from utils.trigram_index import TrigramIndex
+from utils.law_articles import Article, PREAMBLE_LABEL, score_articles, select_articles, split_articles
+from utils.context_packer import ARTICLE_OVERHEAD_TOKENS, allocate_budget, join_articles
+from utils.token_counter import get_token_counter
+from utils.law_store import LawStore, TEXT_COLUMN, convert_dataset, is_store_current, law_store_path
 import os
+import sqlite3
+
+try:
+    from rag_system.lexical_index import parse_citation
+except ImportError:  # numpy-only helper; the matcher works without cited-article boosting
+    parse_citation = None
+
+LAW_FOOTER = "\n" + "="*50
+MIN_LAW_TOKENS = 64  # A law cut to less body than this is dropped instead of sending a fragment
+
+
+def normalize_law_name(name) -> str:
+    """Lookup key for a law name: Turkish case folding with runs of whitespace collapsed"""
+    if name is None or (isinstance(name, float) and name != name):
+        return ""
+    return " ".join(turkish_casefold(str(name)).split())
+
+
+def normalize_law_number(number) -> str:
+    """Lookup key for a mevzuatNo; 5237, 5237.0 and "5237" share one key"""
+    if number is None or (isinstance(number, float) and number != number):
+        return ""
+    if isinstance(number, float) and number.is_integer():
+        number = int(number)
+    return str(number).strip()
+
+
+class ResolvedLaws:
+    """The laws one request asked for, resolved once and shared by summaries and context assembly"""
+    
+    def __init__(self, requested: List[str]):
+        """
+        Initialize an empty resolution
+        
+        Args:
+            requested (List[str]): Names (or other references) as requested, in order
+        """
+        self.requested = list(requested)
+        self.laws = []       # Distinct law records in request order (shared, read-only)
+        self.weights = []    # Relevance of each law: best weight among references to it
+        self.missing = []    # References that did not resolve
+        self._slots = {}
+    
+    def add(self, reference, law: Optional[Dict], weight: float = 1.0):
+        """Record one reference; a law reached twice is kept once at its highest weight"""
+        if law is None:
+            self.missing.append(reference)
+            return
+        slot = self._slots.get(law['law_id'])
+        if slot is None:
+            self._slots[law['law_id']] = len(self.laws)
+            self.laws.append(law)
+            self.weights.append(weight)
+        else:
+            self.weights[slot] = max(self.weights[slot], weight)
+    
+    def __len__(self) -> int:
+        return len(self.laws)
+    
+    def __iter__(self):
+        return iter(self.laws)
+
 
 class LawMatcher:
     def __init__(self, dataset_path: str = None):
         """Initialize Law Matcher"""
         self.dataset_path = dataset_path or os.path.join(Config.DATA_DIR, Config.LEGAL_DATASET)
         self.df = None
+        self.store = None
+        self.name_index = {}
+        self.number_index = {}
+        self.typed_number_index = {}
+        self.indexed_names = []
+        self.name_trigrams = None
+        self.article_offsets = {}
+        # Cross-request LRU of law records (with full text) and their article indexes
+        self.record_cache = OrderedDict()
+        self.cache_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         
         # Load the dataset
         self.load_dataset()
     
     def load_dataset(self):
-        """Load the legal dataset from Excel"""
+        """
+        Load law metadata from the law store; full texts stay on disk until requested
+        
+        The store is converted from the Excel file on first use (or when the Excel
+        file is newer). If it cannot be written, the Excel data is kept in memory.
+        """
         try:
-            self.logger.info(f"Loading dataset from: {self.dataset_path}")
-            self.df = pd.read_excel(self.dataset_path)
+            store_path = law_store_path(self.dataset_path)
+            if not is_store_current(store_path, self.dataset_path):
+                self.logger.info(f"Loading dataset from: {self.dataset_path}")
+                df = pd.read_excel(self.dataset_path)
+                try:
+                    self.logger.info(f"Converting dataset to law store: {store_path}")
+                    convert_dataset(self.dataset_path, store_path, df=df)
+                except (OSError, sqlite3.Error) as e:
+                    self.logger.warning(f"⚠️ Could not write law store ({str(e)}), keeping the dataset in memory")
+                    self.df = df
+            
+            if self.df is None:
+                self.logger.info(f"Opening law store: {store_path}")
+                self.store = LawStore(store_path)
+                self.df = self.store.metadata()
             self.logger.info(f"Loaded {len(self.df)} legal documents")
             
             # Log column names for debugging
             self.logger.info(f"Columns: {list(self.df.columns)}")
             
+            self.build_indexes()
+            
         except Exception as e:
             self.logger.error(f"Error loading dataset: {str(e)}")
             raise
     
+    def build_indexes(self):
+        """Build the normalized-name, mevzuatNo, (law_type, mevzuatNo) and name-trigram lookup tables once per load"""
+        self.name_index = {}
+        self.number_index = {}
+        self.typed_number_index = {}
+        numbers = self.df['mevzuatNo'] if 'mevzuatNo' in self.df.columns else [''] * len(self.df)
+        law_types = self.df['law_type'] if 'law_type' in self.df.columns else [''] * len(self.df)
+        for position, (name, number, law_type) in enumerate(zip(self.df['mevAdi'], numbers, law_types)):
+            key = normalize_law_name(name)
+            if key:
+                # First row wins, as with the previous first-match scan
+                self.name_index.setdefault(key, position)
+            number_key = normalize_law_number(number)
+            if number_key:
+                self.number_index.setdefault(number_key, []).append(position)
+                # Numbers repeat across law types (a Kanun and a Yönetmelik can share one)
+                self.typed_number_index.setdefault((normalize_law_name(law_type), number_key), []).append(position)
+        # Fuzzy matching runs over distinct names; trigram ids index indexed_names
+        self.indexed_names = list(self.name_index)
+        self.name_trigrams = TrigramIndex(self.indexed_names)
+        self.logger.info(f"Indexed {len(self.name_index)} law names and {len(self.number_index)} law numbers")
+    
+    def _full_text(self, position: int) -> str:
+        """Full text of a row, read from the law store unless the dataset is in memory"""
+        if self.store is None:
+            # Same as the store, which is written with fillna('')
+            text = self.df.iloc[position][TEXT_COLUMN]
+            return "" if pd.isna(text) else str(text)
+        return self.store.full_text(self.df.iloc[position]['law_id']) or ""
+    
+    def _law_record(self, position: int) -> Dict:
+        """
+        Law information dictionary for a DataFrame row position
+        
+        Records are cached across requests (Config.LAW_RECORD_CACHE_SIZE most
+        recently used laws) and shared, so callers must not modify them.
+        """
+        with self.cache_lock:
+            record = self.record_cache.get(position)
+            if record is not None:
+                self.record_cache.move_to_end(position)
+                return record
+        
+        record = self._load_record(position)
+        with self.cache_lock:
+            self.record_cache[position] = record
+            while len(self.record_cache) > Config.LAW_RECORD_CACHE_SIZE:
+                evicted, _ = self.record_cache.popitem(last=False)
+                self.article_offsets.pop(evicted, None)
+        return record
+    
+    def _load_record(self, position: int) -> Dict:
+        law_data = self.df.iloc[position]
+        full_text = self._full_text(position)
+        return {
+            'law_id': position,
+            'law_name': law_data['mevAdi'],
+            'law_type': law_data['law_type'],
+            'law_number': law_data.get('mevzuatNo', ''),
+            'acceptance_date': law_data.get('kabulTarih', ''),
+            'gazette_date': law_data.get('resmiGazeteTarihi', ''),
+            'gazette_number': law_data.get('resmiGazeteSayisi', ''),
+            'full_text': full_text,
+            'text_length': law_data.get('text_length', len(full_text)),
+            'detail_url': law_data.get('detail_url', '')
+        }
+    
+    def _name_candidates(self, key: str, limit: int, min_similarity: float = 0.0) -> List[Tuple[int, float]]:
+        """(row position, similarity) of the indexed names closest to a normalized name, best first"""
+        return [
+            (self.name_index[self.indexed_names[name_id]], similarity)
+            for name_id, similarity in self.name_trigrams.search(key, limit, min_similarity)
+        ]
+    
+    def suggest_laws(self, law_name: str, limit: int = None) -> List[Dict]:
+        """
+        Laws whose names are most similar to a (misspelled or paraphrased) name
+        
+        Args:
+            law_name (str): Name to look up
+            limit (int): Maximum number of candidates (default: Config.LAW_NAME_CANDIDATES)
+            
+        Returns:
+            List[Dict]: law_name, law_type, law_number and similarity (0-1), best first
+        """
+        key = normalize_law_name(law_name)
+        if not key:
+            return []
+        suggestions = []
+        for position, similarity in self._name_candidates(key, limit or Config.LAW_NAME_CANDIDATES):
+            law_data = self.df.iloc[position]
+            suggestions.append({
+                'law_name': law_data['mevAdi'],
+                'law_type': law_data['law_type'],
+                'law_number': law_data.get('mevzuatNo', ''),
+                'similarity': round(similarity, 3)
+            })
+        return suggestions
+    
     def find_law_by_name(self, law_name: str) -> Optional[Dict]:
         """
         Find a law's full information by its name
         
         Args:
-            law_name (str): Name of the law to find
+            law_name (str): Name of the law to find (or its mevzuatNo)
             
         Returns:
             Dict: Law information including full text
         """
         try:
-            # Try exact match first
-            exact_match = self.df[self.df['mevAdi'].str.contains(law_name, case=False, na=False)]
+            key = normalize_law_name(law_name)
+            if not key:
+                return None
             
-            if not exact_match.empty:
-                law_data = exact_match.iloc[0]
-                return {
-                    'law_name': law_data['mevAdi'],
-                    'law_type': law_data['law_type'],
-                    'law_number': law_data.get('mevzuatNo', ''),
-                    'acceptance_date': law_data.get('kabulTarih', ''),
-                    'gazette_date': law_data.get('resmiGazeteTarihi', ''),
-                    'gazette_number': law_data.get('resmiGazeteSayisi', ''),
-                    'full_text': law_data['full_text'],
-                    'text_length': law_data.get('text_length', len(law_data['full_text'])),
-                    'detail_url': law_data.get('detail_url', '')
-                }
+            if key in self.number_index:
+                return self._law_record(self.number_index[key][0])
+            position = self.name_index.get(key)
+            if position is not None:
+                return self._law_record(position)
             
-            # If no exact match, try partial match
-            partial_matches = self.df[self.df['mevAdi'].str.contains(
-                law_name.split()[0], case=False, na=False
-            )]
-            
-            if not partial_matches.empty:
-                # Take the first partial match
-                law_data = partial_matches.iloc[0]
-                return {
-                    'law_name': law_data['mevAdi'],
-                    'law_type': law_data['law_type'],
-                    'law_number': law_data.get('mevzuatNo', ''),
-                    'acceptance_date': law_data.get('kabulTarih', ''),
-                    'gazette_date': law_data.get('resmiGazeteTarihi', ''),
-                    'gazette_number': law_data.get('resmiGazeteSayisi', ''),
-                    'full_text': law_data['full_text'],
-                    'text_length': law_data.get('text_length', len(law_data['full_text'])),
-                    'detail_url': law_data.get('detail_url', '')
-                }
+            # No exact key: most similar name by trigrams, if similar enough
+            candidates = self._name_candidates(key, Config.LAW_NAME_CANDIDATES)
+            if candidates and candidates[0][1] >= Config.LAW_NAME_MIN_SIMILARITY:
+                position, similarity = candidates[0]
+                self.logger.info(f"Fuzzy match for '{law_name}': {self.df.iloc[position]['mevAdi']} ({similarity:.2f})")
+                return self._law_record(position)
             
-            self.logger.warning(f"No match found for law: {law_name}")
+            ranked = ", ".join(f"{self.df.iloc[p]['mevAdi']} ({sim:.2f})" for p, sim in candidates)
+            self.logger.warning(f"No match found for law: {law_name}" + (f" - closest: {ranked}" if ranked else ""))
             return None
             
         except Exception as e:
             self.logger.error(f"Error finding law '{law_name}': {str(e)}")
             return None
     
+    def find_law_by_number(self, law_number, law_type: str = None) -> Optional[Dict]:
+        """
+        Find a law by its mevzuatNo
+        
+        Args:
+            law_number: Law number (int, float or string as stored in the dataset)
+            law_type (str): Optional law type to pick between laws sharing a number
+            
+        Returns:
+            Dict: Law information including full text, or None
+        """
+        number_key = normalize_law_number(law_number)
+        positions = self.typed_number_index.get((normalize_law_name(law_type), number_key)) if law_type else None
+        positions = positions or self.number_index.get(number_key, [])
+        return self._law_record(positions[0]) if positions else None
+    
+    def _position_by_number(self, law_type, law_number, law_name: str = None) -> Optional[int]:
+        """
+        Row of a (law_type, mevzuatNo) key
+        
+        Without a typed match, a bare number is accepted only if exactly one law
+        carries it. Several rows under one key are told apart by name.
+        """
+        number_key = normalize_law_number(law_number)
+        if not number_key:
+            return None
+        positions = self.typed_number_index.get((normalize_law_name(law_type), number_key)) if law_type else None
+        if not positions:
+            positions = self.number_index.get(number_key, [])
+            if len(positions) != 1:
+                return None
+        if len(positions) > 1 and law_name:
+            name_key = normalize_law_name(law_name)
+            named = [p for p in positions if normalize_law_name(self.df.iloc[p]['mevAdi']) == name_key]
+            positions = named or positions
+        return positions[0]
+    
+    def get_by_numbers(self, numbers: List[Tuple], fallback_names: List[str] = None,
+                       weights: List[float] = None) -> ResolvedLaws:
+        """
+        Resolve laws by (law_type, mevzuatNo), as carried by RAG results
+        
+        Args:
+            numbers (List[Tuple]): (law_type, law_number) per reference
+            fallback_names (List[str]): Law name per reference, matched by name
+                only when its number does not resolve
+            weights (List[float]): Relevance of each reference; default equal
+            
+        Returns:
+            ResolvedLaws: Distinct laws with their weights
+        """
+        resolved = ResolvedLaws([
+            fallback_names[i] if fallback_names and fallback_names[i] else f"{law_type} {law_number}"
+            for i, (law_type, law_number) in enumerate(numbers)
+        ])
+        by_name = 0
+        for i, (law_type, law_number) in enumerate(numbers):
+            law_name = fallback_names[i] if fallback_names else None
+            position = self._position_by_number(law_type, law_number, law_name)
+            if position is not None:
+                law = self._law_record(position)
+            elif law_name:
+                law = self.find_law_by_name(law_name)
+                by_name += law is not None
+            else:
+                law = None
+            resolved.add(resolved.requested[i], law, weights[i] if weights else 1.0)
+        self.logger.info(f"Found {len(resolved)} out of {len(numbers)} requested laws"
+                         + (f" ({by_name} by name)" if by_name else ""))
+        return resolved
+    
     def find_multiple_laws(self, law_names: List[str]) -> List[Dict]:
         """
         Find multiple laws by their names
@@ -108,20 +361,39 @@ class LawMatcher:
         self.logger.info(f"Found {len(results)} out of {len(law_names)} requested laws")
         return results
     
-    def get_laws_summary(self, law_names: List[str]) -> List[Dict]:
+    def resolve_laws(self, law_names: List[str], weights: List[float] = None) -> ResolvedLaws:
+        """
+        Resolve a request's law names once
+        
+        Args:
+            law_names (List[str]): Law names, e.g. from RAG results
+            weights (List[float]): Relevance of each name (e.g. RAG law scores); default equal
+            
+        Returns:
+            ResolvedLaws: Distinct laws with their weights, for get_laws_summary and get_combined_law_text
+        """
+        resolved = ResolvedLaws(law_names)
+        for i, law_name in enumerate(law_names):
+            resolved.add(law_name, self.find_law_by_name(law_name), weights[i] if weights else 1.0)
+        self.logger.info(f"Found {len(resolved)} out of {len(law_names)} requested laws")
+        return resolved
+    
+    def _as_resolved(self, laws: Union[List[str], ResolvedLaws]) -> ResolvedLaws:
+        return laws if isinstance(laws, ResolvedLaws) else self.resolve_laws(laws)
+    
+    def get_laws_summary(self, laws: Union[List[str], ResolvedLaws]) -> List[Dict]:
         """
         Get a summary of laws without full text (for display purposes)
         
         Args:
-            law_names (List[str]): List of law names
+            laws: List of law names, or laws already resolved by resolve_laws
             
         Returns:
             List[Dict]: List of law summaries
         """
         results = []
         
-        for law_name in law_names:
-            law_data = self.find_law_by_name(law_name)
+        for law_data in self._as_resolved(laws):
             if law_data:
                 summary = {
                     'law_name': law_data['law_name'],
@@ -134,46 +406,99 @@ class LawMatcher:
         
         return results
     
-    def get_combined_law_text(self, law_names: List[str], max_length: int = 15000) -> str:
+    def article_index(self, law: Dict) -> Tuple[List[Article], List[int]]:
         """
-        Get combined text from multiple laws for Agent 3
-        Truncates if too long to fit in context window
+        Article spans and token counts of a law record
+        
+        Read from the law store when it was built with the current encoding,
+        otherwise split and counted; either way remembered with the law's record.
+        """
+        law_id = law['law_id']
+        cached = self.article_offsets.get(law_id)
+        if cached is None:
+            # Unlocked: two threads may build the same index; both results are identical
+            counter = get_token_counter()
+            articles, tokens = self.store.articles(law_id, counter.name) if self.store is not None else (None, None)
+            if articles is None:
+                articles = split_articles(law['full_text'])
+            if tokens is None:
+                tokens = counter.count_many([law['full_text'][start:end] for _, start, end in articles])
+            cached = (articles, tokens)
+            with self.cache_lock:
+                # Kept only while the law's record is cached, so both share the LRU bound
+                if law_id in self.record_cache:
+                    self.article_offsets[law_id] = cached
+        return cached
+    
+    @staticmethod
+    def _law_header(law: Dict) -> str:
+        header = f"\n\n=== {law['law_name']} ===\n"
+        header += f"Kanun No: {law['law_number']}\n"
+        header += f"Kabul Tarihi: {law['acceptance_date']}\n"
+        header += f"Türü: {law['law_type']}\n\n"
+        return header
+    
+    def get_combined_law_text(self, laws: Union[List[str], ResolvedLaws], max_tokens: int = None,
+                              query: str = None, weights: List[float] = None) -> str:
+        """
+        Get combined text from multiple laws for Agent 3, within a token budget
+        
+        The budget is split across laws in proportion to their relevance; a law
+        that needs less than its share passes the rest on. Within a law, the
+        articles most relevant to the query are packed (leading articles when
+        there is no query or no article matches).
         
         Args:
-            law_names (List[str]): List of law names
-            max_length (int): Maximum character length
+            laws: List of law names, or laws already resolved by resolve_laws
+            max_tokens (int): Token budget (default: Config.CONTEXT_MAX_TOKENS)
+            query (str): User question / optimized query used to pick articles
+            weights (List[float]): Relevance of each name when names are given; default equal
             
         Returns:
             str: Combined law text
         """
-        laws = self.find_multiple_laws(law_names)
-        combined_text = ""
-        
-        for law in laws:
-            law_section = f"\n\n=== {law['law_name']} ===\n"
-            law_section += f"Kanun No: {law['law_number']}\n"
-            law_section += f"Kabul Tarihi: {law['acceptance_date']}\n"
-            law_section += f"Türü: {law['law_type']}\n\n"
-            law_section += law['full_text']
-            law_section += "\n" + "="*50
-            
-            # Check if adding this law would exceed the limit
-            if len(combined_text + law_section) > max_length:
-                # Truncate the current law text to fit
-                remaining_space = max_length - len(combined_text) - len(law_section.split('\n\n')[0]) - 100
-                if remaining_space > 200:  # Only add if we have reasonable space
-                    truncated_text = law['full_text'][:remaining_space] + "...\n[Metin kısaltıldı]"
-                    law_section = f"\n\n=== {law['law_name']} ===\n"
-                    law_section += f"Kanun No: {law['law_number']}\n"
-                    law_section += f"Kabul Tarihi: {law['acceptance_date']}\n"
-                    law_section += f"Türü: {law['law_type']}\n\n"
-                    law_section += truncated_text
-                    combined_text += law_section
-                break
-            
-            combined_text += law_section
-        
-        return combined_text
+        max_tokens = max_tokens or Config.CONTEXT_MAX_TOKENS
+        counter = get_token_counter()
+        cited = parse_citation(query)[1] if query and parse_citation else []
+        
+        resolved = laws if isinstance(laws, ResolvedLaws) else self.resolve_laws(laws, weights)
+        
+        plans, demands = [], []
+        for law in resolved:
+            articles, tokens = self.article_index(law)
+            scores = score_articles(law['full_text'], articles, query, cited) if query else np.zeros(len(articles))
+            sizes = [count + ARTICLE_OVERHEAD_TOKENS for count in tokens]
+            header = self._law_header(law)
+            frame_tokens = counter.count(header + LAW_FOOTER)
+            # A law can use at most its matching articles (all of them if none match)
+            wanted = [size for size, score in zip(sizes, scores) if score > 0] or sizes
+            plans.append((law, articles, scores, sizes, header, frame_tokens))
+            demands.append(frame_tokens + sum(wanted))
+        
+        allocation = allocate_budget(resolved.weights, demands, max_tokens)
+        
+        sections = []
+        for (law, articles, scores, sizes, header, frame_tokens), budget, demand in zip(plans, allocation, demands):
+            body_budget = budget - frame_tokens
+            # The floor only drops laws cut short; a fully served short match is always kept
+            if body_budget <= 0 or (budget < demand and body_budget < MIN_LAW_TOKENS):
+                continue
+            chosen = select_articles(scores, sizes, body_budget)
+            best = int(np.argmax(scores)) if len(articles) else 0
+            if chosen and best in chosen:
+                body = join_articles(law['full_text'], articles, chosen)
+            else:
+                # The best (or first) article does not fit: send it truncated rather than lesser ones
+                chosen = [best] if articles else []
+                start, end = articles[best][1:] if articles else (0, len(law['full_text']))
+                body = counter.truncate(law['full_text'][start:end], body_budget - ARTICLE_OVERHEAD_TOKENS)
+                body += "...\n[Metin kısaltıldı]"
+            sections.append(header + body + LAW_FOOTER)
+            labels = [articles[row][0] for row in chosen if articles[row][0] != PREAMBLE_LABEL]
+            self.logger.info(f"{law['law_name']}: {len(chosen)}/{len(articles)} articles in {budget} tokens "
+                             f"({', '.join(labels[:10])})")
+        
+        return "".join(sections)
     
     def test_law_matcher(self):
         """Test the law matcher with sample law names"""
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Law Store
+SQLite copy of the Excel legal dataset: a `laws` metadata table read eagerly,
+a `law_texts` table whose full texts are fetched one law at a time on demand
+and a `law_articles` table of article (MADDE) offsets and token counts
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+# Add project root to path (for running this file as a script)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.law_articles import Article, split_articles
+from utils.token_counter import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMN = "full_text"
+
+
+def law_store_path(dataset_path: str) -> str:
+    """mevzuat_combined_final.sqlite3 stored next to mevzuat_combined_final.xlsx"""
+    return os.path.splitext(dataset_path)[0] + ".sqlite3"
+
+
+def is_store_current(store_path: str, dataset_path: str) -> bool:
+    """The store exists and is not older than the Excel file (if that is present)"""
+    if not os.path.exists(store_path):
+        return False
+    return not os.path.exists(dataset_path) or os.path.getmtime(store_path) >= os.path.getmtime(dataset_path)
+
+
+def _sql_value(value):
+    """Plain Python value for SQLite; NaN/NaT become NULL"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (int, float, str, bytes)):
+        return value
+    return str(value)
+
+
+def convert_dataset(dataset_path: str, store_path: str = None, df: pd.DataFrame = None) -> str:
+    """
+    One-time conversion of the Excel dataset into a law store
+
+    Row order is kept: law_id is the dataset row position.
+
+    Args:
+        dataset_path (str): mevzuat_combined_final.xlsx
+        store_path (str): Output file (default: next to the dataset)
+        df (pd.DataFrame): Already loaded dataset, to skip reading the Excel file again
+
+    Returns:
+        str: Path of the written store
+    """
+    store_path = store_path or law_store_path(dataset_path)
+    if df is None:
+        logger.info(f"Reading {dataset_path}...")
+        df = pd.read_excel(dataset_path)
+    if TEXT_COLUMN not in df.columns:
+        raise ValueError(f"{dataset_path} has no '{TEXT_COLUMN}' column")
+
+    texts = df[TEXT_COLUMN].fillna("").astype(str)
+    metadata = df.drop(columns=[TEXT_COLUMN])
+    if 'text_length' not in metadata.columns:
+        metadata['text_length'] = texts.str.len()
+    columns = list(metadata.columns)
+    quoted = ", ".join(f'"{column}"' for column in columns)
+
+    temp_file = f"{store_path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+    conn = sqlite3.connect(temp_file)
+    try:
+        # Untyped metadata columns keep the values exactly as pandas read them
+        conn.execute(f'CREATE TABLE laws (law_id INTEGER PRIMARY KEY, {quoted})')
+        conn.execute('CREATE TABLE law_texts (law_id INTEGER PRIMARY KEY, full_text TEXT NOT NULL)')
+        conn.execute('''
+            CREATE TABLE law_articles (
+                law_id INTEGER NOT NULL,
+                ordinal INTEGER NOT NULL,
+                label TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                "end" INTEGER NOT NULL,
+                tokens INTEGER NOT NULL,
+                PRIMARY KEY (law_id, ordinal)
+            )
+        ''')
+        conn.executemany(
+            f'INSERT INTO laws (law_id, {quoted}) VALUES ({", ".join("?" * (len(columns) + 1))})',
+            ((law_id, *(_sql_value(v) for v in row)) for law_id, row in enumerate(metadata.itertuples(index=False)))
+        )
+        conn.executemany('INSERT INTO law_texts (law_id, full_text) VALUES (?, ?)', enumerate(texts))
+        conn.execute('CREATE TABLE store_info (key TEXT PRIMARY KEY, value TEXT)')
+
+        # Article token counts are computed here once, in the encoding Agent 3's budget uses
+        counter = get_token_counter()
+        for law_id, text in enumerate(texts):
+            articles = split_articles(text)
+            tokens = counter.count_many([text[start:end] for _, start, end in articles])
+            conn.executemany(
+                'INSERT INTO law_articles (law_id, ordinal, label, start, "end", tokens) VALUES (?, ?, ?, ?, ?, ?)',
+                ((law_id, ordinal, *article, count) for ordinal, (article, count) in enumerate(zip(articles, tokens)))
+            )
+        conn.execute("INSERT INTO store_info (key, value) VALUES ('token_encoding', ?)", (counter.name,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(temp_file, store_path)
+    logger.info(f"✅ Wrote {len(df)} laws to {store_path}")
+    return store_path
+
+
+class LawStore:
+    """Read-only access to a converted dataset"""
+
+    def __init__(self, store_path: str):
+        """
+        Open the store
+
+        Args:
+            store_path (str): SQLite file written by convert_dataset
+        """
+        self.store_path = store_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(f"file:{store_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def metadata(self) -> pd.DataFrame:
+        """Every law's metadata (no full texts), ordered by law_id"""
+        with self.lock:
+            return pd.read_sql_query("SELECT * FROM laws ORDER BY law_id", self.conn)
+
+    def full_text(self, law_id: int) -> Optional[str]:
+        """Full text of one law, or None if the id is unknown"""
+        with self.lock:
+            row = self.conn.execute("SELECT full_text FROM law_texts WHERE law_id = ?", (int(law_id),)).fetchone()
+        return row[0] if row else None
+
+    def articles(self, law_id: int, encoding: str = None) -> Tuple[Optional[List[Article]], Optional[List[int]]]:
+        """
+        Article spans and token counts of one law
+
+        Args:
+            law_id (int): Law row
+            encoding (str): Token encoding the caller budgets in
+
+        Returns:
+            Tuple: (spans, token counts); spans are None if the store has no article
+            table, counts are None if they were computed with another encoding
+        """
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    'SELECT label, start, "end", tokens FROM law_articles WHERE law_id = ? ORDER BY ordinal',
+                    (int(law_id),)
+                ).fetchall()
+                stored = self.conn.execute("SELECT value FROM store_info WHERE key = 'token_encoding'").fetchone()
+            except sqlite3.OperationalError:
+                return None, None
+        articles = [tuple(row[:3]) for row in rows]
+        tokens = [row[3] for row in rows] if stored and stored[0] == encoding else None
+        return articles, tokens
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    # Usage: python utils/law_store.py [dataset.xlsx] [output.sqlite3]
+    from config.config import Config
+
+    logging.basicConfig(level=logging.INFO)
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(Config.DATA_DIR, Config.LEGAL_DATASET)
+    convert_dataset(source, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test LawMatcher.get_combined_law_text packing on a small synthetic law store
+"""
+
+import os
+import sys
+import tempfile
+
+# Add project root to path (for running this file as a script)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils.law_matcher import LawMatcher
+from utils.law_store import convert_dataset
+from utils.token_counter import get_token_counter
+
+FILLER = "Bu Kanunun uygulanmasında idare ilgili usul ve esasları belirler. "
+
+CRIMINAL_CODE = (
+    "TÜRK CEZA KANUNU\n"
+    + "".join(f"MADDE {i} – (1) {FILLER * 6}\n" for i in range(1, 141))
+    + "MADDE 141 – (1) Hırsızlık suçu: başkasına ait taşınır malı alan kişiye hapis cezası verilir.\n"
+    + "".join(f"MADDE {i} – (1) {FILLER * 6}\n" for i in range(142, 160))
+)
+LABOUR_CODE = (
+    "İŞ KANUNU\n"
+    "MADDE 16 – (1) Kısa hüküm.\n"
+    "MADDE 17 – (1) Süreli fesih: fesihten önce bildirim yapılmalıdır.\n"
+)
+
+
+def make_matcher(directory):
+    """LawMatcher over a two-law store (no Excel file needed)"""
+    df = pd.DataFrame({
+        'mevAdi': ["TÜRK CEZA KANUNU", "İŞ KANUNU"],
+        'law_type': "Kanun",
+        'mevzuatNo': [5237, 4857],
+        'kabulTarih': "",
+        'resmiGazeteTarihi': "",
+        'resmiGazeteSayisi': "",
+        'detail_url': "",
+        'full_text': [CRIMINAL_CODE, LABOUR_CODE],
+    })
+    dataset_path = os.path.join(directory, "laws.xlsx")
+    convert_dataset(dataset_path, df=df)
+    return LawMatcher(dataset_path)
+
+
+def test_small_matching_article_is_packed():
+    with tempfile.TemporaryDirectory() as directory:
+        matcher = make_matcher(directory)
+        for query, max_tokens in (("hırsızlık", 6000), ("hırsızlık suçu cezası nedir", 600)):
+            text = matcher.get_combined_law_text(["TÜRK CEZA KANUNU"], max_tokens=max_tokens, query=query)
+            assert "MADDE 141" in text and "Hırsızlık suçu" in text, (query, max_tokens)
+            assert "MADDE 140 " not in text
+        matcher.store.close()
+
+
+def test_short_law_is_kept():
+    with tempfile.TemporaryDirectory() as directory:
+        matcher = make_matcher(directory)
+        text = matcher.get_combined_law_text(["İŞ KANUNU"], max_tokens=6000, query="madde 17 bildirim")
+        assert "Süreli fesih" in text
+        assert "İŞ KANUNU" in matcher.get_combined_law_text(["İŞ KANUNU"], max_tokens=6000)
+        matcher.store.close()
+
+
+def test_budget_is_respected():
+    with tempfile.TemporaryDirectory() as directory:
+        matcher = make_matcher(directory)
+        text = matcher.get_combined_law_text(["TÜRK CEZA KANUNU", "İŞ KANUNU"], max_tokens=300)
+        assert 0 < get_token_counter().count(text) <= 300
+        matcher.store.close()
+
+
+def main():
+    """Run every test and report the results"""
+    tests = [value for name, value in globals().items() if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
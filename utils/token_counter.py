@@ -0,0 +1,81 @@
+"""
+Token Counter
+Prompt token counts with the analyst model's tiktoken encoding, falling back to
+a character-based estimate when the encoding cannot be loaded
+"""
+
+import logging
+import threading
+from typing import List
+
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Characters per token assumed when no tokenizer is available (Turkish legal text)
+ESTIMATED_CHARS_PER_TOKEN = 3
+FALLBACK_ENCODING = "cl100k_base"
+
+
+class TokenCounter:
+    """Counts and truncates text in tokens of one encoding"""
+
+    def __init__(self, encoding_name: str = None):
+        """
+        Load the encoding
+
+        Args:
+            encoding_name (str): tiktoken encoding (default: Config.CONTEXT_TOKEN_ENCODING);
+                cl100k_base is used if it is unknown, a character estimate if tiktoken fails
+        """
+        self.encoding = None
+        self.name = f"chars/{ESTIMATED_CHARS_PER_TOKEN}"
+        try:
+            import tiktoken
+        except ImportError:
+            logger.warning("⚠️ tiktoken not installed, estimating token counts from characters")
+            return
+
+        for name in dict.fromkeys([encoding_name or Config.CONTEXT_TOKEN_ENCODING, FALLBACK_ENCODING]):
+            try:
+                self.encoding = tiktoken.get_encoding(name)
+                self.name = name
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load tiktoken encoding {name} ({str(e)})")
+        logger.warning("⚠️ Estimating token counts from characters")
+
+    def count(self, text: str) -> int:
+        """Number of tokens in a text"""
+        if self.encoding is None:
+            return -(-len(text) // ESTIMATED_CHARS_PER_TOKEN)
+        return len(self.encoding.encode_ordinary(text))
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        """Token counts of several texts (batched across threads by tiktoken)"""
+        if self.encoding is None or len(texts) < 2:
+            return [self.count(text) for text in texts]
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of a text that fits in max_tokens"""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[:max_tokens * ESTIMATED_CHARS_PER_TOKEN]
+        tokens = self.encoding.encode_ordinary(text)
+        return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide TokenCounter for Config.CONTEXT_TOKEN_ENCODING (loaded once)"""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = TokenCounter()
+    return _counter
@@ -0,0 +1,72 @@
+"""
+Trigram Index
+Character-trigram inverted index over short strings (law names) with
+similarity-ranked fuzzy lookup
+"""
+
+import numpy as np
+from typing import Dict, List, Sequence, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded so word starts and ends count ("  iş", " iş ")"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Trigram -> string ids posting lists; similarity = shared / (query + candidate - shared) trigrams"""
+
+    def __init__(self, texts: Sequence[str]):
+        """
+        Build the index
+
+        Args:
+            texts (Sequence[str]): Already normalized strings; position is the id
+        """
+        postings: Dict[str, List[int]] = {}
+        self.gram_counts = np.zeros(len(texts), dtype=np.int32)
+        for text_id, text in enumerate(texts):
+            grams = trigrams(text)
+            self.gram_counts[text_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(text_id)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.gram_counts)
+
+    def search(self, query: str, limit: int = 5, min_similarity: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        Strings most similar to a query
+
+        Args:
+            query (str): Normalized query string
+            limit (int): Maximum number of candidates
+            min_similarity (float): Candidates below this Jaccard similarity are dropped
+
+        Returns:
+            List[Tuple[int, float]]: (string id, similarity), best first
+        """
+        grams = trigrams(query)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits or limit <= 0:
+            return []
+
+        # Only strings sharing at least one trigram are touched
+        shared = np.bincount(np.concatenate(hits), minlength=len(self))
+        candidates = np.flatnonzero(shared)
+        common = shared[candidates]
+        similarity = common / (len(grams) + self.gram_counts[candidates] - common)
+
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        if len(candidates) > limit:
+            top = np.argpartition(-similarity, limit - 1)[:limit]
+            candidates, similarity = candidates[top], similarity[top]
+        # Ties go to the lower id (the earlier row)
+        order = np.lexsort((candidates, -similarity))
+        return [(int(candidates[i]), float(similarity[i])) for i in order]
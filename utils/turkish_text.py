@@ -0,0 +1,63 @@
+"""
+Turkish Text Utilities
+Locale-correct case folding, tokenization and light suffix stripping for
+Turkish legal text
+"""
+
+import re
+from typing import List
+
+# str.lower() maps "I" to "i" and "İ" to "i" + combining dot; Turkish needs I -> ı, İ -> i
+_TURKISH_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_COMBINING_DOT = "̇"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Inflectional endings, longest first; stripped repeatedly while the stem stays long enough
+_SUFFIXES = sorted({
+    "lar", "ler", "ları", "leri", "ların", "lerin", "lara", "lere", "larda", "lerde", "lardan", "lerden",
+    "nın", "nin", "nun", "nün", "ın", "in", "un", "ün",
+    "na", "ne", "ya", "ye",
+    "nda", "nde", "da", "de", "ta", "te",
+    "ndan", "nden", "dan", "den", "tan", "ten",
+    "ndaki", "ndeki", "daki", "deki", "taki", "teki",
+    "sı", "si", "su", "sü", "ı", "i", "u", "ü",
+    "nı", "ni", "nu", "nü", "yı", "yi", "yu", "yü",
+    "ca", "ce", "ça", "çe", "la", "le", "yla", "yle",
+    "lık", "lik", "luk", "lük",
+}, key=len, reverse=True)
+MIN_STEM_LENGTH = 4
+
+
+def turkish_casefold(text: str) -> str:
+    """Lower-case Turkish text (İ -> i, I -> ı) without stray combining dots"""
+    return text.translate(_TURKISH_UPPER).lower().replace(_COMBINING_DOT, "")
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded word and number tokens"""
+    return _TOKEN_PATTERN.findall(turkish_casefold(text))
+
+
+def stem(token: str, max_passes: int = 2) -> str:
+    """
+    Strip common inflectional suffixes from a case-folded token
+
+    Deliberately light: at most `max_passes` suffixes are removed and the stem
+    never gets shorter than MIN_STEM_LENGTH. Numbers are returned unchanged.
+    """
+    if token.isdigit():
+        return token
+    for _ in range(max_passes):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Tokenize and stem text for lexical indexing and querying"""
+    return [stem(token) for token in tokenize(text)]